@@ -0,0 +1,225 @@
+"""
+Armazenamento de arquivos por conteúdo (SHA-256) com deduplicação
+
+Cada conteúdo é gravado uma única vez em ASSET_STORE_FOLDER/blobs/ab/<sha256>.
+Quem usa o arquivo (uploads, avatares, biblioteca de avatares) recebe um
+hardlink com o próprio nome e extensão, então os mesmos bytes enviados de
+novo não ocupam espaço nem sobrescrevem o arquivo de outro usuário.
+
+A contagem de referências é a contagem de links do próprio blob: remover um
+link libera a referência e collect() apaga os blobs que ficaram sem nenhum.
+O hash também serve de chave estável para os caches (ex: image_derivatives).
+"""
+import os
+import re
+import shutil
+import hashlib
+import tempfile
+from pathlib import Path
+from typing import BinaryIO, Union
+
+from cache import TTLCache
+from config import Config
+from utils import get_logger
+
+logger = get_logger(__name__)
+
+_DIGEST = re.compile(r'^[0-9a-f]{64}$')
+
+
+def file_sha256(path: Union[str, Path], chunk_size: int = 1024 * 1024) -> str:
+    """Hash SHA-256 do conteúdo de um arquivo"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def link_or_copy(source: Path, dest: Path):
+    """Cria dest como hardlink de source (cópia se não for possível)"""
+    dest.unlink(missing_ok=True)
+    try:
+        os.link(source, dest)
+    except OSError:
+        shutil.copy2(source, dest)
+
+
+class AssetStore:
+    """Blobs endereçados por SHA-256, referenciados por hardlinks"""
+
+    # Entradas só mudam com o arquivo (a chave inclui tamanho e mtime)
+    CACHE_TTL = 24 * 3600
+
+    def __init__(self, root: Path = None):
+        """
+        Inicializa o armazenamento
+
+        Args:
+            root: Pasta dos blobs (padrão: config); precisa estar no mesmo
+                  disco das pastas que recebem os links
+        """
+        self.root = Path(root or Config.ASSET_STORE_FOLDER)
+        self.blobs_dir = self.root / 'blobs'
+        self.tmp_dir = self.root / 'tmp'
+
+        # (caminho, tamanho, mtime) -> hash: arquivos reusados não são lidos de novo
+        self._digests = TTLCache(ttl=self.CACHE_TTL, name='asset-digest')
+
+    def blob_path(self, digest: str) -> Path:
+        """Caminho do blob de um hash"""
+        return self.blobs_dir / digest[:2] / digest
+
+    def link(self, digest: str, dest: Path) -> Path:
+        """
+        Cria dest como referência (hardlink) ao blob
+
+        Args:
+            digest: Hash de um conteúdo já armazenado
+            dest: Caminho da referência; um arquivo existente é substituído
+
+        Returns:
+            dest
+        """
+        dest = Path(dest)
+        blob = self.blob_path(digest)
+
+        try:
+            if dest.exists() and os.path.samefile(dest, blob):
+                return dest
+        except FileNotFoundError:
+            pass
+
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        # Link temporário + rename: quem lê dest nunca vê o arquivo pela metade
+        tmp_link = dest.with_name(f".{dest.name}.{os.getpid()}.link")
+        tmp_link.unlink(missing_ok=True)
+        try:
+            os.link(blob, tmp_link)
+        except OSError:
+            if not blob.exists():
+                raise
+            # Outro disco: cópia (não conta como referência do blob)
+            shutil.copy2(blob, tmp_link)
+        os.replace(tmp_link, dest)
+        return dest
+
+    def store(
+        self,
+        source: Union[str, Path, BinaryIO],
+        dest_dir: Path,
+        suffix: str = '',
+        name: str = None
+    ) -> Path:
+        """
+        Grava um conteúdo (se ainda não existir) e o referencia em dest_dir
+
+        Sem name, a referência é <sha256><suffix>: o mesmo conteúdo sempre
+        resulta no mesmo caminho e nada é sobrescrito com bytes diferentes.
+
+        Args:
+            source: Caminho de arquivo ou stream binário (ex: upload do Flask)
+            dest_dir: Pasta da referência
+            suffix: Extensão da referência (ex: '.png')
+            name: Nome fixo da referência (ex: ID do avatar)
+
+        Returns:
+            Caminho da referência
+        """
+        digest, tmp_path = self._write_tmp(source)
+        try:
+            self._publish(digest, tmp_path)
+            dest = Path(dest_dir) / (name or f"{digest}{suffix.lower()}")
+            try:
+                return self.link(digest, dest)
+            except FileNotFoundError:
+                # collect() removeu o blob entre a gravação e o link: grava de novo
+                self._publish(digest, tmp_path)
+                return self.link(digest, dest)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+
+    def digest(self, path: Union[str, Path]) -> str:
+        """
+        SHA-256 de um arquivo (chave estável para caches)
+
+        Referências criadas por store() já trazem o hash no nome e não são lidas.
+        """
+        path = Path(path).resolve()
+
+        if _DIGEST.match(path.stem):
+            blob = self.blob_path(path.stem)
+            try:
+                if os.path.samefile(path, blob):
+                    return path.stem
+            except FileNotFoundError:
+                pass
+
+        stat = path.stat()
+        return self._digests.get((str(path), stat.st_size, stat.st_mtime_ns), lambda: file_sha256(path))
+
+    def references(self, digest: str) -> int:
+        """Número de referências (hardlinks) ao blob; 0 se ele não existe"""
+        try:
+            return self.blob_path(digest).stat().st_nlink - 1
+        except FileNotFoundError:
+            return 0
+
+    def collect(self) -> int:
+        """
+        Apaga os blobs sem nenhuma referência
+
+        Returns:
+            Número de blobs apagados
+        """
+        removed = 0
+        if not self.blobs_dir.exists():
+            return 0
+
+        for blob in self.blobs_dir.glob('*/*'):
+            try:
+                if blob.stat().st_nlink == 1:
+                    blob.unlink()
+                    removed += 1
+            except FileNotFoundError:
+                continue
+
+        if removed:
+            logger.info(f"Asset store: {removed} blobs sem referência removidos")
+        return removed
+
+    def _write_tmp(self, source: Union[str, Path, BinaryIO]):
+        """Copia o conteúdo para um temporário calculando o hash"""
+        self.tmp_dir.mkdir(parents=True, exist_ok=True)
+        digest = hashlib.sha256()
+
+        fd, tmp_name = tempfile.mkstemp(dir=self.tmp_dir)
+        try:
+            with os.fdopen(fd, 'wb') as out:
+                stream = open(source, 'rb') if isinstance(source, (str, Path)) else source
+                try:
+                    for chunk in iter(lambda: stream.read(1024 * 1024), b''):
+                        digest.update(chunk)
+                        out.write(chunk)
+                finally:
+                    if stream is not source:
+                        stream.close()
+        except BaseException:
+            os.unlink(tmp_name)
+            raise
+
+        return digest.hexdigest(), Path(tmp_name)
+
+    def _publish(self, digest: str, tmp_path: Path):
+        """Torna o temporário o blob do hash (se outro processo não o fez antes)"""
+        blob = self.blob_path(digest)
+        blob.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            os.link(tmp_path, blob)
+            os.chmod(blob, 0o644)
+        except FileExistsError:
+            pass  # Conteúdo já armazenado: deduplicado
+
+
+# Instância compartilhada pelo processo
+asset_store = AssetStore()
@@ -2,15 +2,27 @@
 Módulo de geração de áudio usando ElevenLabs ou MiniMax API
 """
 from elevenlabs import ElevenLabs
+import hashlib
 import requests
 from pathlib import Path
 from typing import List, Dict, Optional
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from config import Config
 from utils import get_logger, retry_with_backoff
+from cache import TTLCache
+import metrics
+import tracing
 
 logger = get_logger(__name__)
 
+# Cache de vozes compartilhado pelo processo, chaveado por (provedor, hash da api_key):
+# a chave do cache aparece nos logs e nunca deve conter a API key em texto puro
+_voices_cache = TTLCache(
+    ttl=Config.VOICES_CACHE_TTL,
+    stale_ttl=Config.VOICES_CACHE_STALE,
+    name='voices'
+)
+
 
 class MiniMaxClient:
     """Cliente para MiniMax Audio API"""
@@ -23,7 +35,7 @@ class MiniMaxClient:
             api_key: Chave da API MiniMax
         """
         self.api_key = api_key
-        self.base_url = "https://api.minimax.chat/v1/text_to_speech"
+        self.base_url = Config.MINIMAX_BASE_URL
         self.session = requests.Session()
         logger.info("MiniMaxClient inicializado")
 
@@ -160,28 +172,71 @@ class AudioGenerator:
             provider = Config.AUDIO_PROVIDER
 
         self.provider = provider.lower()
-        self.available_voices = None
 
         # Inicializa o cliente apropriado
         if self.provider == 'elevenlabs':
             if not Config.ELEVENLABS_API_KEY:
                 raise ValueError("ELEVENLABS_API_KEY não configurada")
-            self.client = ElevenLabs(api_key=Config.ELEVENLABS_API_KEY)
+            self.api_key = Config.ELEVENLABS_API_KEY
+            self.client = ElevenLabs(
+                api_key=Config.ELEVENLABS_API_KEY,
+                base_url=Config.ELEVENLABS_BASE_URL
+            )
             logger.info("AudioGenerator inicializado com ElevenLabs")
 
         elif self.provider == 'minimax':
             if not Config.MINIMAX_API_KEY:
                 raise ValueError("MINIMAX_API_KEY não configurada")
+            self.api_key = Config.MINIMAX_API_KEY
             self.client = MiniMaxClient(api_key=Config.MINIMAX_API_KEY)
             logger.info("AudioGenerator inicializado com MiniMax")
 
         else:
             raise ValueError(f"Provedor de áudio inválido: {provider}. Use 'elevenlabs' ou 'minimax'")
 
+    def _fetch_voices(self) -> Dict:
+        """
+        Busca vozes na API do provedor e monta o índice nome -> voice_id
+
+        Returns:
+            Dict {'voices': [...], 'by_name': {'rachel': 'xxx', ...}}
+        """
+        logger.info(f"Buscando vozes disponíveis do {self.provider}...")
+
+        if self.provider == 'elevenlabs':
+            voices = self.client.voices.get_all()
+            voice_list = [
+                {
+                    'voice_id': voice.voice_id,
+                    'name': voice.name,
+                    'labels': voice.labels if hasattr(voice, 'labels') else {}
+                }
+                for voice in voices.voices
+            ]
+        else:
+            voice_list = self.client.get_available_voices()
+
+        by_name = {}
+        for voice in voice_list:
+            # Mantém a primeira ocorrência em caso de nomes repetidos
+            by_name.setdefault(voice['name'].lower(), voice['voice_id'])
+
+        logger.info(f"Encontradas {len(voice_list)} vozes disponíveis")
+
+        return {'voices': voice_list, 'by_name': by_name}
+
+    def _get_voice_catalog(self) -> Dict:
+        """Retorna o catálogo de vozes do cache compartilhado (carrega se preciso)"""
+        key_hash = hashlib.sha256((self.api_key or '').encode()).hexdigest()[:16]
+        return _voices_cache.get((self.provider, key_hash), self._fetch_voices)
+
     def get_available_voices(self) -> List[Dict[str, str]]:
         """
         Obtém lista de vozes disponíveis (ElevenLabs ou MiniMax)
 
+        A lista é mantida em um cache de processo com TTL; chamadas simultâneas
+        compartilham uma única busca na API.
+
         Returns:
             Lista de dicts com informações das vozes:
             [
@@ -190,26 +245,7 @@ class AudioGenerator:
             ]
         """
         try:
-            if self.available_voices is None:
-                logger.info(f"Buscando vozes disponíveis do {self.provider}...")
-
-                if self.provider == 'elevenlabs':
-                    voices = self.client.voices.get_all()
-                    self.available_voices = [
-                        {
-                            'voice_id': voice.voice_id,
-                            'name': voice.name,
-                            'labels': voice.labels if hasattr(voice, 'labels') else {}
-                        }
-                        for voice in voices.voices
-                    ]
-
-                elif self.provider == 'minimax':
-                    self.available_voices = self.client.get_available_voices()
-
-                logger.info(f"Encontradas {len(self.available_voices)} vozes disponíveis")
-
-            return self.available_voices
+            return self._get_voice_catalog()['voices']
 
         except Exception as e:
             logger.error(f"Erro ao buscar vozes do {self.provider}: {e}")
@@ -228,13 +264,18 @@ class AudioGenerator:
         Returns:
             voice_id correspondente ou primeiro voice_id disponível
         """
-        voices = self.get_available_voices()
+        try:
+            catalog = self._get_voice_catalog()
+        except Exception as e:
+            logger.error(f"Erro ao buscar vozes do {self.provider}: {e}")
+            return 'default'
 
-        for voice in voices:
-            if voice['name'].lower() == voice_name.lower():
-                return voice['voice_id']
+        voice_id = catalog['by_name'].get(voice_name.lower())
+        if voice_id:
+            return voice_id
 
         # Se não encontrar, retorna a primeira voz disponível
+        voices = catalog['voices']
         if voices:
             logger.warning(f"Voz '{voice_name}' não encontrada. Usando '{voices[0]['name']}'")
             return voices[0]['voice_id']
@@ -267,35 +308,39 @@ class AudioGenerator:
         """
         try:
             logger.info(f"Gerando áudio ({self.provider}) para: {output_path.name}")
+            tracing.current_span().incr('attempts')
 
-            if self.provider == 'elevenlabs':
-                # Gera áudio usando ElevenLabs (sintaxe v3)
-                audio_data = self.client.text_to_speech.convert(
-                    text=text,
-                    voice_id=voice_id,
-                    model_id=model_id,
-                    output_format="mp3_44100_128"
-                )
+            with metrics.track('tts', self.provider):
+                if self.provider == 'elevenlabs':
+                    # Gera áudio usando ElevenLabs (sintaxe v3)
+                    audio_data = self.client.text_to_speech.convert(
+                        text=text,
+                        voice_id=voice_id,
+                        model_id=model_id,
+                        output_format="mp3_44100_128"
+                    )
 
-                # Salva arquivo
-                output_path.parent.mkdir(parents=True, exist_ok=True)
+                    # Salva arquivo
+                    output_path.parent.mkdir(parents=True, exist_ok=True)
 
-                with open(output_path, 'wb') as f:
-                    # audio_data é um iterador de bytes
-                    for chunk in audio_data:
-                        f.write(chunk)
-
-            elif self.provider == 'minimax':
-                # Gera áudio usando MiniMax
-                return self.client.generate_audio(
-                    text=text,
-                    voice_id=voice_id,
-                    output_path=output_path,
-                    speed=1.0,
-                    vol=1.0,
-                    pitch=0,
-                    output_format="mp3"
-                )
+                    with open(output_path, 'wb') as f:
+                        # audio_data é um iterador de bytes
+                        for chunk in audio_data:
+                            f.write(chunk)
+
+                elif self.provider == 'minimax':
+                    # Gera áudio usando MiniMax
+                    output_path = self.client.generate_audio(
+                        text=text,
+                        voice_id=voice_id,
+                        output_path=output_path,
+                        speed=1.0,
+                        vol=1.0,
+                        pitch=0,
+                        output_format="mp3"
+                    )
+
+            metrics.add_bytes('tts', 'in', output_path.stat().st_size)
 
             logger.info(f"Áudio gerado com sucesso: {output_path}")
 
@@ -312,7 +357,8 @@ class AudioGenerator:
         output_dir: Path,
         model_id: str = "eleven_multilingual_v2",
         progress_callback=None,
-        max_workers: int = None
+        max_workers: int = None,
+        reuse_existing: bool = False
     ) -> List[Dict]:
         """
         Gera múltiplos áudios em paralelo
@@ -325,6 +371,8 @@ class AudioGenerator:
             model_id: Modelo ElevenLabs a usar (padrão: eleven_v3)
             progress_callback: Função de callback para progresso
             max_workers: Número máximo de workers paralelos (None = auto)
+            reuse_existing: Se True, áudios já gerados em output_dir não são
+                            sintetizados de novo (retry de job)
 
         Returns:
             Lista de dicts com informações dos áudios gerados
@@ -364,18 +412,30 @@ class AudioGenerator:
             text = text_data['formatted_text']
             audio_path = audio_dir / f'audio_{audio_number}.mp3'
 
+            if reuse_existing and audio_path.exists() and audio_path.stat().st_size > 0:
+                logger.info(f"Áudio {audio_number} reaproveitado de: {audio_path}")
+                return {
+                    'audio_number': audio_number,
+                    'text': text,
+                    'audio_path': audio_path,
+                    'duration': None
+                }
+
             if progress_callback:
                 progress_callback(f"Gerando áudio {audio_number}/{len(texts)}...")
 
             last_error = None
             for attempt in range(max_retries):
                 try:
-                    generated_path = self.generate_audio(
-                        text=text,
-                        voice_id=voice_id,
-                        output_path=audio_path,
-                        model_id=model_id
-                    )
+                    with tracing.span('tts.batch', audio=audio_number, provider=self.provider,
+                                      chars=len(text)) as audio_span:
+                        generated_path = self.generate_audio(
+                            text=text,
+                            voice_id=voice_id,
+                            output_path=audio_path,
+                            model_id=model_id
+                        )
+                        audio_span.set('bytes', generated_path.stat().st_size)
 
                     return {
                         'audio_number': audio_number,
@@ -392,6 +452,7 @@ class AudioGenerator:
                     if '429' in error_str or 'too_many' in error_str or 'rate' in error_str:
                         wait_time = (attempt + 1) * 5  # 5s, 10s, 15s
                         logger.warning(f"Rate limit atingido para áudio {audio_number}. Aguardando {wait_time}s antes de retry {attempt + 1}/{max_retries}")
+                        metrics.RETRIES.inc(operation='generate_audio_rate_limit')
                         time.sleep(wait_time)
                     else:
                         # Para outros erros, não faz retry
@@ -403,7 +464,7 @@ class AudioGenerator:
         # Processa em paralelo com controle de concorrência
         with ThreadPoolExecutor(max_workers=max_workers) as executor:
             futures = {
-                executor.submit(generate_single_audio_with_retry, text_data): text_data
+                executor.submit(tracing.wrap(generate_single_audio_with_retry), text_data): text_data
                 for text_data in texts
             }
 
@@ -0,0 +1,278 @@
+"""
+Microbenchmark da camada de dados (database.Database) em escala
+
+Gera bases sintéticas de projetos, jobs, avatares e tags (10k a 1M registros),
+mede latência por operação com várias threads concorrentes, pico de memória
+por chamada (tracemalloc) e imprime curvas de escala (tempo x tamanho).
+Após as escritas concorrentes verifica se algum registro foi perdido.
+
+Uso:
+    python benchmarks/bench_database.py
+    python benchmarks/bench_database.py --sizes 10000,100000,1000000 --threads 8
+    python benchmarks/bench_database.py --ops get_jobs,update_job --output resultado.json
+"""
+import sys
+import json
+import time
+import random
+import argparse
+import tempfile
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, List
+
+ROOT = Path(__file__).resolve().parent.parent
+
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from bench_utils import latency_summary, scaling_exponent  # noqa: E402
+
+STATUSES = ('processing', 'completed', 'failed')
+WRITE_OPS = ('create_job', 'update_job', 'update_project', 'create_project')
+OPERATIONS = (
+    'get_jobs', 'get_jobs_status', 'get_job', 'get_projects', 'get_projects_tag', 'get_project',
+    'get_avatars', 'get_tags', 'update_job', 'create_job', 'update_project', 'create_project'
+)
+
+
+def synthesize(data_dir: Path, size: int, seed: int) -> Dict[str, List[str]]:
+    """
+    Gera os arquivos JSON da base diretamente (muito mais rápido que via API)
+
+    Args:
+        data_dir: Pasta da base
+        size: Número de jobs e projetos
+        seed: Semente
+
+    Returns:
+        IDs gerados por coleção (para escolher alvos das operações)
+    """
+    rng = random.Random(seed)
+    base = datetime(2024, 1, 1)
+
+    tags = [
+        {"id": f"tag_{i:05d}", "name": f"Tag {i}", "color": "#667eea"}
+        for i in range(max(3, min(size // 100, 1000)))
+    ]
+    tag_ids = [t['id'] for t in tags]
+
+    jobs = []
+    for i in range(size):
+        started = base + timedelta(seconds=rng.randint(0, 365 * 86400))
+        status = rng.choice(STATUSES)
+        jobs.append({
+            "id": f"job_{i:08x}",
+            "type": "video_generation",
+            "status": status,
+            "progress": 100 if status == 'completed' else rng.randint(0, 99),
+            "estimated_time": rng.randint(60, 1800),
+            "started_at": started.isoformat(),
+            "completed_at": (started + timedelta(minutes=10)).isoformat() if status == 'completed' else None,
+            "video_path": f"outputs/job_{i:08x}/final_output.mp4" if status == 'completed' else None,
+            "project_id": f"proj_{rng.randrange(size):08x}",
+            "metadata": {"voice_name": "Rachel", "num_images": rng.randint(1, 20), "text_length": rng.randint(100, 20000)}
+        })
+
+    projects = []
+    for i in range(size):
+        updated = base + timedelta(seconds=rng.randint(0, 365 * 86400))
+        projects.append({
+            "id": f"proj_{i:08x}",
+            "name": f"Projeto {i}",
+            "description": "Projeto sintético de benchmark",
+            "tags": rng.sample(tag_ids, k=min(len(tag_ids), rng.randint(0, 3))),
+            "videos": [
+                {"id": f"vid_{i:08x}_{v}", "path": f"outputs/{i}_{v}.mp4", "name": f"Vídeo {v}",
+                 "duration": rng.randint(10, 600), "created_at": updated.isoformat()}
+                for v in range(rng.randint(0, 3))
+            ],
+            "created_at": updated.isoformat(),
+            "updated_at": updated.isoformat()
+        })
+
+    avatars = [
+        {"id": f"avatar_{i:08x}", "name": f"Avatar {i}", "image_path": f"data/avatars/{i}.jpg",
+         "thumbnail_path": f"data/avatars/thumbnails/{i}.jpg",
+         "created_at": (base + timedelta(seconds=i)).isoformat()}
+        for i in range(max(1, size // 10))
+    ]
+
+    # Mesmo formato que Database._save_json grava
+    for name, records in (('jobs', jobs), ('projects', projects), ('avatars', avatars), ('tags', tags)):
+        with open(data_dir / f"{name}.json", 'w', encoding='utf-8') as f:
+            json.dump(records, f, indent=2, ensure_ascii=False)
+
+    return {
+        'jobs': [j['id'] for j in jobs],
+        'projects': [p['id'] for p in projects],
+        'tags': tag_ids,
+    }
+
+
+def build_operations(db, ids: Dict[str, List[str]], rng: random.Random) -> Dict[str, Callable[[], None]]:
+    """Operações medidas (cada uma escolhe um alvo aleatório)"""
+    # Leituras primeiro: escritas concorrentes podem corromper os arquivos
+    return {
+        'get_jobs': lambda: db.get_jobs(),
+        'get_jobs_status': lambda: db.get_jobs(status='processing'),
+        'get_job': lambda: db.get_job(rng.choice(ids['jobs'])),
+        'get_projects': lambda: db.get_projects(),
+        'get_projects_tag': lambda: db.get_projects(tag_filter=rng.choice(ids['tags'])),
+        'get_project': lambda: db.get_project(rng.choice(ids['projects'])),
+        'get_avatars': lambda: db.get_avatars(),
+        'get_tags': lambda: db.get_tags(),
+        'update_job': lambda: db.update_job(rng.choice(ids['jobs']), {'progress': rng.randint(0, 99)}),
+        'create_job': lambda: db.create_job({'metadata': {'bench': True}}),
+        'update_project': lambda: db.update_project(rng.choice(ids['projects']), {'description': 'editado'}),
+        'create_project': lambda: db.create_project('Benchmark', tags=[rng.choice(ids['tags'])]),
+    }
+
+
+def measure_memory(operation: Callable[[], None]) -> float:
+    """Pico de memória alocada (MB) por uma chamada"""
+    tracemalloc.start()
+    try:
+        operation()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / (1024 * 1024)
+
+
+def measure_latency(operation: Callable[[], None], iterations: int, threads: int) -> Dict:
+    """Executa a operação `iterations` vezes em `threads` threads"""
+    samples: List[float] = []
+    errors = 0
+
+    def call():
+        start = time.perf_counter()
+        operation()
+        return time.perf_counter() - start
+
+    wall_start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        futures = [executor.submit(call) for _ in range(iterations)]
+        for future in futures:
+            try:
+                samples.append(future.result())
+            except Exception:
+                errors += 1
+    wall = time.perf_counter() - wall_start
+
+    result = latency_summary(samples)
+    result['errors'] = errors
+    result['ops_per_s'] = round(len(samples) / wall, 2) if wall else 0.0
+    return result
+
+
+def run_size(size: int, args) -> Dict:
+    """Gera a base de um tamanho e mede todas as operações"""
+    from database import Database
+
+    with tempfile.TemporaryDirectory(prefix='lipsync_dbbench_') as tmp:
+        data_dir = Path(tmp)
+
+        start = time.perf_counter()
+        ids = synthesize(data_dir, size, args.seed)
+        files_mb = sum(f.stat().st_size for f in data_dir.glob('*.json')) / (1024 * 1024)
+        print(f"\n📦 {size:,} registros gerados em {time.perf_counter() - start:.1f}s ({files_mb:.1f} MB)")
+
+        db = Database(str(data_dir))
+        rng = random.Random(args.seed)
+        operations = build_operations(db, ids, rng)
+        selected = [name for name in operations if not args.ops or name in args.ops]
+
+        results = {}
+        created_jobs = 0
+        created_projects = 0
+
+        for name in selected:
+            operation = operations[name]
+            memory_mb = measure_memory(operation)
+            stats = measure_latency(operation, args.iterations, args.threads)
+            stats['peak_memory_mb'] = round(memory_mb, 2)
+            results[name] = stats
+
+            if name == 'create_job':
+                created_jobs += 1 + stats['count']
+            if name == 'create_project':
+                created_projects += 1 + stats['count']
+
+            print(f"  {name:<18} p50={stats['p50_ms']:10.2f}ms  p95={stats['p95_ms']:10.2f}ms  "
+                  f"{stats['ops_per_s']:9.2f} ops/s  mem={stats['peak_memory_mb']:8.2f}MB  erros={stats['errors']}")
+
+        # Escritas concorrentes reescrevem o arquivo inteiro sem lock:
+        # confere se algum registro se perdeu
+        integrity = {}
+        if any(name in WRITE_OPS for name in selected):
+            expected_jobs = size + created_jobs
+            expected_projects = size + created_projects
+            found_jobs = len(db._load_json(db.jobs_file))
+            found_projects = len(db._load_json(db.projects_file))
+            integrity = {
+                'jobs_expected': expected_jobs,
+                'jobs_found': found_jobs,
+                'projects_expected': expected_projects,
+                'projects_found': found_projects,
+            }
+            if found_jobs != expected_jobs or found_projects != expected_projects:
+                print(f"  ⚠️  Registros perdidos: jobs {found_jobs}/{expected_jobs}, "
+                      f"projetos {found_projects}/{expected_projects}")
+
+        return {'size': size, 'files_mb': round(files_mb, 2), 'operations': results, 'integrity': integrity}
+
+
+def print_scaling(runs: List[Dict]):
+    """Imprime a curva de escala (p50 por tamanho) de cada operação"""
+    sizes = [run['size'] for run in runs]
+    operations = list(runs[0]['operations'])
+
+    print("\n" + "=" * 80)
+    print("CURVAS DE ESCALA (p50 em ms)")
+    print("=" * 80)
+    header = f"{'operação':<18}" + ''.join(f"{size:>14,}" for size in sizes) + f"{'expoente':>10}"
+    print(header)
+
+    for name in operations:
+        values = [run['operations'][name]['p50_ms'] for run in runs]
+        exponent = scaling_exponent(sizes, values)
+        print(f"{name:<18}" + ''.join(f"{v:>14.2f}" for v in values) + f"{exponent:>10.2f}")
+
+    print("\nexpoente ~0 = constante, ~1 = linear no tamanho da base")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Microbenchmark da camada de dados')
+    parser.add_argument('--sizes', default='10000,100000', help='Tamanhos (registros), separados por vírgula')
+    parser.add_argument('--iterations', type=int, default=20, help='Chamadas por operação')
+    parser.add_argument('--threads', type=int, default=4, help='Threads concorrentes')
+    parser.add_argument('--ops', help='Operações (separadas por vírgula); padrão: todas')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='Grava os resultados em JSON')
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(',') if s.strip()]
+    args.ops = [op.strip() for op in args.ops.split(',')] if args.ops else None
+
+    unknown = set(args.ops or []) - set(OPERATIONS)
+    if unknown:
+        raise SystemExit(f"Operações desconhecidas: {', '.join(sorted(unknown))}")
+
+    print(f"Operações: {args.iterations} chamadas cada, {args.threads} threads")
+
+    runs = [run_size(size, args) for size in sizes]
+    print_scaling(runs)
+
+    if args.output:
+        Path(args.output).write_text(
+            json.dumps({'config': vars(args), 'runs': runs}, indent=2, ensure_ascii=False),
+            encoding='utf-8'
+        )
+        print(f"\n💾 Resultados gravados em {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,263 @@
+"""
+Benchmark ponta a ponta do pipeline contra provedores simulados
+
+Sobe os stubs locais (benchmarks/stub_providers.py), aponta o pipeline para
+eles via variáveis de ambiente e executa N jobs reais (JobManager.process_job)
+com concorrência C. Reporta throughput, latência p50/p95 dos jobs e o tempo
+por etapa (a partir do trace.json de cada job). Os resultados podem ser
+gravados como baseline e comparados em execuções futuras.
+
+Uso:
+    python benchmarks/bench_pipeline.py --jobs 8 --concurrency 4
+    python benchmarks/bench_pipeline.py --save-baseline default
+    python benchmarks/bench_pipeline.py --compare default --tolerance 0.15
+    python benchmarks/bench_pipeline.py --latency gemini=lognormal:0.3,0.4 \\
+        --rate-429 elevenlabs=0.1 --failure wavespeed=0.05 --render uniform:1,3
+"""
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import tempfile
+import statistics
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Dict, List
+
+ROOT = Path(__file__).resolve().parent.parent
+BASELINES_DIR = Path(__file__).resolve().parent / 'baselines'
+
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from stub_providers import StubProviders, ProviderProfile, LatencyModel, PROVIDERS  # noqa: E402
+from bench_utils import percentile  # noqa: E402
+
+# Texto padrão: 6 parágrafos = 2 batches com BATCH_SIZE=3
+DEFAULT_TEXT = '\n\n'.join(
+    f"Parágrafo {i} do roteiro de benchmark, com texto suficiente para uma fala curta."
+    for i in range(1, 7)
+)
+
+# Métricas comparadas com o baseline (maior = pior)
+COMPARED = ('job_p50_s', 'job_p95_s', 'wall_s')
+
+
+def parse_assignments(items: List[str]) -> Dict[str, str]:
+    """Converte ['provedor=valor', ...] em dict, validando o provedor"""
+    result = {}
+    for item in items or []:
+        name, _, value = item.partition('=')
+        if name not in PROVIDERS:
+            raise SystemExit(f"Provedor desconhecido: {name} (use: {', '.join(PROVIDERS)})")
+        result[name] = value
+    return result
+
+
+def build_profiles(args) -> Dict[str, ProviderProfile]:
+    """Monta os perfis dos provedores a partir dos argumentos"""
+    latencies = parse_assignments(args.latency)
+    rates_429 = parse_assignments(args.rate_429)
+    failures = parse_assignments(args.failure)
+
+    profiles = {}
+    for name in PROVIDERS:
+        profiles[name] = ProviderProfile(
+            latency=LatencyModel(latencies.get(name, args.default_latency)),
+            rate_429=float(rates_429.get(name, 0)),
+            failure_rate=float(failures.get(name, 0))
+        )
+    return profiles
+
+
+def make_image(path: Path):
+    """Gera uma imagem de teste"""
+    from PIL import Image
+    Image.new('RGB', (512, 512), (40, 90, 160)).save(path, 'JPEG')
+
+
+def run_jobs(args, work_dir: Path) -> Dict:
+    """Executa os jobs e coleta os resultados"""
+    # Importa o pipeline só depois de configurar o ambiente
+    from job_manager import JobManager
+
+    if not args.verbose:
+        logging.getLogger().setLevel(logging.WARNING)
+
+    image_path = work_dir / 'face.jpg'
+    make_image(image_path)
+
+    manager = JobManager(audio_provider=args.provider)
+    voice = 'Stub Voice'
+
+    def run_one(index: int) -> Dict:
+        job, error = manager.create_job(DEFAULT_TEXT, voice, [str(image_path)])
+        if error:
+            return {'ok': False, 'error': error, 'duration': 0.0, 'stages': {}}
+
+        start = time.perf_counter()
+        try:
+            manager.process_job(job, max_workers_video=args.video_workers)
+            ok, error = True, None
+        except Exception as e:
+            ok, error = False, str(e)
+        duration = time.perf_counter() - start
+
+        stages = {}
+        trace_file = job.job_dir / 'trace.json'
+        if trace_file.exists():
+            stages = json.loads(trace_file.read_text(encoding='utf-8')).get('stages', {})
+
+        return {'ok': ok, 'error': error, 'duration': duration, 'stages': stages}
+
+    results = []
+    wall_start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        futures = [executor.submit(run_one, i) for i in range(args.jobs)]
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            status = 'ok' if result['ok'] else f"FALHOU: {result['error']}"
+            print(f"  job {len(results)}/{args.jobs}: {result['duration']:.2f}s {status}")
+    wall = time.perf_counter() - wall_start
+
+    return summarize(results, wall)
+
+
+def summarize(results: List[Dict], wall: float) -> Dict:
+    """Agrega os resultados dos jobs"""
+    succeeded = [r for r in results if r['ok']]
+    durations = [r['duration'] for r in succeeded]
+
+    stage_totals: Dict[str, List[float]] = {}
+    for result in succeeded:
+        for stage, ms in result['stages'].items():
+            stage_totals.setdefault(stage, []).append(ms / 1000)
+
+    return {
+        'jobs': len(results),
+        'succeeded': len(succeeded),
+        'failed': len(results) - len(succeeded),
+        'wall_s': round(wall, 3),
+        'throughput_jobs_per_min': round(len(succeeded) / wall * 60, 2) if wall else 0.0,
+        'job_p50_s': round(percentile(durations, 50), 3),
+        'job_p95_s': round(percentile(durations, 95), 3),
+        'job_mean_s': round(statistics.mean(durations), 3) if durations else 0.0,
+        'stages_mean_s': {
+            stage: round(statistics.mean(values), 3) for stage, values in sorted(stage_totals.items())
+        }
+    }
+
+
+def print_report(summary: Dict, stubs: StubProviders):
+    """Imprime o relatório"""
+    print("\n" + "=" * 60)
+    print("RESULTADO")
+    print("=" * 60)
+    print(f"Jobs: {summary['succeeded']}/{summary['jobs']} ok ({summary['failed']} falharam)")
+    print(f"Tempo total: {summary['wall_s']:.2f}s")
+    print(f"Throughput: {summary['throughput_jobs_per_min']:.2f} jobs/min")
+    print(f"Latência por job: p50={summary['job_p50_s']:.2f}s  p95={summary['job_p95_s']:.2f}s  "
+          f"média={summary['job_mean_s']:.2f}s")
+
+    print("\nTempo médio por etapa:")
+    for stage, seconds in summary['stages_mean_s'].items():
+        print(f"  {stage:<10} {seconds:8.2f}s")
+
+    print("\nRequisições aos stubs:")
+    for key, value in sorted(stubs.stats.items()):
+        print(f"  {key:<28} {value}")
+
+
+def compare_baseline(summary: Dict, name: str, tolerance: float) -> bool:
+    """
+    Compara com um baseline salvo
+
+    Returns:
+        True se não houve regressão além da tolerância
+    """
+    path = BASELINES_DIR / f"{name}.json"
+    if not path.exists():
+        print(f"\n❌ Baseline não encontrado: {path}")
+        return False
+
+    baseline = json.loads(path.read_text(encoding='utf-8'))['summary']
+    ok = True
+
+    print(f"\nComparação com baseline '{name}' (tolerância {tolerance:.0%}):")
+    for key in COMPARED:
+        old, new = baseline.get(key, 0.0), summary.get(key, 0.0)
+        change = (new - old) / old if old else 0.0
+        regressed = change > tolerance
+        ok = ok and not regressed
+        flag = '❌ REGRESSÃO' if regressed else '✅'
+        print(f"  {key:<12} {old:8.2f}s -> {new:8.2f}s ({change:+.1%}) {flag}")
+
+    if summary['failed'] > baseline.get('failed', 0):
+        print(f"  falhas       {baseline.get('failed', 0)} -> {summary['failed']} ❌ REGRESSÃO")
+        ok = False
+
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark do pipeline contra provedores simulados')
+    parser.add_argument('--jobs', type=int, default=4, help='Número de jobs')
+    parser.add_argument('--concurrency', type=int, default=2, help='Jobs simultâneos')
+    parser.add_argument('--video-workers', type=int, default=3, help='max_workers_video por job')
+    parser.add_argument('--provider', choices=['elevenlabs', 'minimax'], default='elevenlabs')
+    parser.add_argument('--default-latency', default='fixed:0.05', help='Latência padrão dos stubs')
+    parser.add_argument('--latency', action='append', metavar='PROVEDOR=SPEC', help='Latência por provedor')
+    parser.add_argument('--rate-429', action='append', metavar='PROVEDOR=TAXA', help='Taxa de 429 por provedor')
+    parser.add_argument('--failure', action='append', metavar='PROVEDOR=TAXA', help='Taxa de falhas por provedor')
+    parser.add_argument('--render', default='uniform:0.5,1.5', help='Tempo de render das tarefas WaveSpeed')
+    parser.add_argument('--poll-interval', type=float, default=0.2, help='POLL_INTERVAL durante o benchmark')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--verbose', action='store_true', help='Mostra os logs do pipeline')
+    parser.add_argument('--save-baseline', metavar='NOME', help='Grava o resultado como baseline')
+    parser.add_argument('--compare', metavar='NOME', help='Compara com um baseline salvo')
+    parser.add_argument('--tolerance', type=float, default=0.15, help='Regressão tolerada (fração)')
+    args = parser.parse_args()
+
+    stubs = StubProviders(build_profiles(args), LatencyModel(args.render), seed=args.seed)
+    stubs.start()
+
+    with tempfile.TemporaryDirectory(prefix='lipsync_bench_') as tmp:
+        work_dir = Path(tmp)
+
+        # Precisa estar no ambiente antes de importar config/job_manager
+        os.environ.update(stubs.env())
+        os.environ.update({
+            'AUDIO_PROVIDER': args.provider,
+            'TEMP_FOLDER': str(work_dir / 'temp'),
+            'IMAGE_CACHE_FOLDER': str(work_dir / 'image_cache'),
+            'POLL_INTERVAL': str(args.poll_interval),
+            'POLL_INITIAL_DELAY': str(args.poll_interval),
+            'STATE_WRITE_DELAY': '0.5',
+        })
+
+        print(f"Stubs em {stubs.base_url}")
+        print(f"Executando {args.jobs} jobs (concorrência {args.concurrency})...")
+
+        try:
+            summary = run_jobs(args, work_dir)
+        finally:
+            stubs.stop()
+
+    print_report(summary, stubs)
+
+    if args.save_baseline:
+        BASELINES_DIR.mkdir(parents=True, exist_ok=True)
+        path = BASELINES_DIR / f"{args.save_baseline}.json"
+        config = {k: v for k, v in vars(args).items() if k not in ('save_baseline', 'compare', 'tolerance')}
+        path.write_text(json.dumps({'config': config, 'summary': summary}, indent=2), encoding='utf-8')
+        print(f"\n💾 Baseline gravado em {path}")
+
+    if args.compare and not compare_baseline(summary, args.compare, args.tolerance):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
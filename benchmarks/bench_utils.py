@@ -0,0 +1,38 @@
+"""
+Funções comuns aos benchmarks
+"""
+import math
+from typing import Dict, List
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Percentil com interpolação linear"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    k = (len(ordered) - 1) * pct / 100
+    low = int(k)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (k - low)
+
+
+def latency_summary(samples: List[float]) -> Dict[str, float]:
+    """Resumo (ms) de uma lista de latências em segundos"""
+    return {
+        'count': len(samples),
+        'p50_ms': round(percentile(samples, 50) * 1000, 3),
+        'p95_ms': round(percentile(samples, 95) * 1000, 3),
+        'p99_ms': round(percentile(samples, 99) * 1000, 3),
+        'max_ms': round(max(samples) * 1000, 3) if samples else 0.0,
+    }
+
+
+def scaling_exponent(sizes: List[int], values: List[float]) -> float:
+    """
+    Expoente de crescimento entre o menor e o maior tamanho (log-log)
+
+    ~0 = constante, ~1 = linear, ~2 = quadrático
+    """
+    if len(sizes) < 2 or values[0] <= 0 or values[-1] <= 0 or sizes[0] == sizes[-1]:
+        return 0.0
+    return math.log(values[-1] / values[0]) / math.log(sizes[-1] / sizes[0])
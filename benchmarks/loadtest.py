@@ -0,0 +1,309 @@
+"""
+Teste de carga HTTP da API Flask com mistura de requisições
+
+Sobe o servidor web (web_server.py) em um processo separado, em uma pasta de
+trabalho temporária e com os provedores apontados para os stubs locais, e
+dispara uma mistura configurável de requisições com N usuários simultâneos.
+Reporta RPS, percentis de latência e taxa de erros por endpoint.
+
+Uso:
+    python benchmarks/loadtest.py --users 20 --duration 30
+    python benchmarks/loadtest.py --mix jobs=50,voices=20,stream=30 --stream-mb 20
+    python benchmarks/loadtest.py --url http://127.0.0.1:5000 --users 50   # servidor já rodando
+"""
+import io
+import os
+import sys
+import json
+import time
+import random
+import socket
+import argparse
+import tempfile
+import threading
+import subprocess
+from collections import defaultdict
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+from urllib.parse import quote
+
+import requests
+
+ROOT = Path(__file__).resolve().parent.parent
+
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from stub_providers import StubProviders  # noqa: E402
+from bench_utils import latency_summary  # noqa: E402
+
+DEFAULT_MIX = 'jobs=40,voices=20,upload=10,stream=20,preview=10'
+
+PREVIEW_TEXT = '\n---\n'.join(
+    '\n\n'.join(f"Roteiro {s}, parágrafo {p}: texto de exemplo para o preview." for p in range(1, 10))
+    for s in range(1, 4)
+)
+
+# Código que sobe o servidor no processo filho (sem o reloader do modo debug).
+# As rotas de vídeo recebem caminhos relativos ao diretório atual e o Flask os
+# resolve a partir de root_path; em produção os dois são a raiz do projeto,
+# aqui ambos apontam para a pasta de trabalho temporária.
+SERVER_BOOTSTRAP = (
+    "import os, sys; sys.path.insert(0, {root!r}); "
+    "import web_server; "
+    "web_server.app.root_path = os.getcwd(); "
+    "web_server.app.run(host='127.0.0.1', port={port}, debug=False, threaded=True)"
+)
+
+
+def parse_mix(spec: str) -> List[Tuple[str, float]]:
+    """Converte 'jobs=40,voices=20' em [(nome, peso), ...]"""
+    mix = []
+    for item in spec.split(','):
+        name, _, weight = item.partition('=')
+        name = name.strip()
+        if name not in SCENARIOS:
+            raise SystemExit(f"Cenário desconhecido: {name} (use: {', '.join(SCENARIOS)})")
+        mix.append((name, float(weight or 1)))
+    return mix
+
+
+# ============================================================================
+# CENÁRIOS
+# ============================================================================
+
+def scenario_jobs(session: requests.Session, base_url: str, ctx: Dict) -> requests.Response:
+    return session.get(f"{base_url}/api/jobs", timeout=30)
+
+
+def scenario_voices(session: requests.Session, base_url: str, ctx: Dict) -> requests.Response:
+    return session.get(f"{base_url}/api/voices/elevenlabs", timeout=30)
+
+
+def scenario_upload(session: requests.Session, base_url: str, ctx: Dict) -> requests.Response:
+    name = f"load_{random.randrange(1_000_000)}.jpg"
+    files = [('images', (name, io.BytesIO(ctx['image']), 'image/jpeg'))]
+    return session.post(f"{base_url}/api/upload/images", files=files, timeout=60)
+
+
+def scenario_stream(session: requests.Session, base_url: str, ctx: Dict) -> requests.Response:
+    # Mesmo formato do frontend: caminho inteiro codificado (encodeURIComponent)
+    path = quote(ctx['stream_path'], safe='')
+    response = session.get(f"{base_url}/api/stream/{path}", stream=True, timeout=60)
+    # Consome o corpo inteiro, como um player faria
+    for _ in response.iter_content(chunk_size=256 * 1024):
+        pass
+    return response
+
+
+def scenario_preview(session: requests.Session, base_url: str, ctx: Dict) -> requests.Response:
+    return session.post(f"{base_url}/api/preview", json={'scripts_text': PREVIEW_TEXT, 'batch_size': 3}, timeout=30)
+
+
+SCENARIOS: Dict[str, Callable] = {
+    'jobs': scenario_jobs,
+    'voices': scenario_voices,
+    'upload': scenario_upload,
+    'stream': scenario_stream,
+    'preview': scenario_preview,
+}
+
+
+# ============================================================================
+# SERVIDOR
+# ============================================================================
+
+def free_port() -> int:
+    """Porta TCP livre em 127.0.0.1"""
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_server(work_dir: Path, env: Dict[str, str]) -> Tuple[subprocess.Popen, str]:
+    """Inicia o servidor web no processo filho e espera ficar pronto"""
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+
+    process = subprocess.Popen(
+        [sys.executable, '-c', SERVER_BOOTSTRAP.format(root=str(ROOT), port=port)],
+        cwd=str(work_dir),
+        env={**os.environ, **env},
+        stdout=subprocess.DEVNULL,
+        stderr=open(work_dir / 'server.log', 'wb')
+    )
+
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise SystemExit(f"Servidor encerrou ao iniciar; veja {work_dir / 'server.log'}")
+        try:
+            requests.get(f"{base_url}/api/jobs", timeout=1)
+            return process, base_url
+        except requests.RequestException:
+            time.sleep(0.2)
+
+    process.terminate()
+    raise SystemExit("Servidor não respondeu em 30s")
+
+
+def prepare_context(work_dir: Path, stream_mb: float) -> Dict:
+    """Arquivos usados pelos cenários (imagem de upload e vídeo de stream)"""
+    from PIL import Image
+
+    buffer = io.BytesIO()
+    Image.new('RGB', (1024, 1024), (120, 80, 40)).save(buffer, 'JPEG', quality=90)
+
+    # Caminho relativo à pasta de trabalho do servidor, como os vídeos em temp/
+    stream_path = Path('outputs') / 'loadtest.mp4'
+    (work_dir / stream_path).parent.mkdir(parents=True, exist_ok=True)
+    (work_dir / stream_path).write_bytes(os.urandom(int(stream_mb * 1024 * 1024)))
+
+    # Arquivos estáticos continuam disponíveis com root_path na pasta de trabalho
+    (work_dir / 'static').symlink_to(ROOT / 'static', target_is_directory=True)
+
+    return {'image': buffer.getvalue(), 'stream_path': stream_path.as_posix()}
+
+
+# ============================================================================
+# CARGA
+# ============================================================================
+
+def run_load(base_url: str, mix: List[Tuple[str, float]], ctx: Dict, args) -> Dict:
+    """Executa a carga em modo fechado (cada usuário espera a resposta)"""
+    names = [name for name, _ in mix]
+    weights = [weight for _, weight in mix]
+
+    samples: Dict[str, List[float]] = defaultdict(list)
+    errors: Dict[str, int] = defaultdict(int)
+    statuses: Dict[str, Dict[int, int]] = defaultdict(lambda: defaultdict(int))
+    lock = threading.Lock()
+
+    stop_at = time.perf_counter() + args.duration
+    counter = {'sent': 0}
+
+    def user(index: int):
+        rng = random.Random(args.seed + index)
+        session = requests.Session()
+
+        while time.perf_counter() < stop_at:
+            with lock:
+                if args.requests and counter['sent'] >= args.requests:
+                    return
+                counter['sent'] += 1
+
+            name = rng.choices(names, weights)[0]
+            start = time.perf_counter()
+            try:
+                response = SCENARIOS[name](session, base_url, ctx)
+                status = response.status_code
+            except requests.RequestException:
+                status = 0
+            elapsed = time.perf_counter() - start
+
+            with lock:
+                samples[name].append(elapsed)
+                statuses[name][status] += 1
+                if not 200 <= status < 400:
+                    errors[name] += 1
+
+            if args.think:
+                time.sleep(rng.uniform(0, args.think * 2))
+
+    threads = [threading.Thread(target=user, args=(i,), daemon=True) for i in range(args.users)]
+    wall_start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - wall_start
+
+    endpoints = {}
+    for name in names:
+        stats = latency_summary(samples[name])
+        stats['rps'] = round(len(samples[name]) / wall, 2) if wall else 0.0
+        stats['errors'] = errors[name]
+        stats['error_rate'] = round(errors[name] / len(samples[name]), 4) if samples[name] else 0.0
+        stats['statuses'] = dict(statuses[name])
+        endpoints[name] = stats
+
+    all_samples = [s for values in samples.values() for s in values]
+    total = latency_summary(all_samples)
+    total['rps'] = round(len(all_samples) / wall, 2) if wall else 0.0
+    total['errors'] = sum(errors.values())
+    total['error_rate'] = round(total['errors'] / len(all_samples), 4) if all_samples else 0.0
+
+    return {'wall_s': round(wall, 2), 'total': total, 'endpoints': endpoints}
+
+
+def print_report(result: Dict, args):
+    """Imprime o relatório"""
+    print("\n" + "=" * 86)
+    print(f"RESULTADO ({args.users} usuários, {result['wall_s']:.1f}s)")
+    print("=" * 86)
+    print(f"{'endpoint':<10}{'reqs':>8}{'rps':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+          f"{'max ms':>10}{'erros':>8}{'taxa':>9}")
+
+    rows = list(result['endpoints'].items()) + [('TOTAL', result['total'])]
+    for name, stats in rows:
+        print(f"{name:<10}{stats['count']:>8}{stats['rps']:>9.1f}{stats['p50_ms']:>10.1f}"
+              f"{stats['p95_ms']:>10.1f}{stats['p99_ms']:>10.1f}{stats['max_ms']:>10.1f}"
+              f"{stats['errors']:>8}{stats['error_rate']:>9.2%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Teste de carga da API Flask')
+    parser.add_argument('--url', help='Servidor já em execução (não sobe servidor nem stubs)')
+    parser.add_argument('--users', type=int, default=10, help='Usuários simultâneos')
+    parser.add_argument('--duration', type=float, default=20.0, help='Duração em segundos')
+    parser.add_argument('--requests', type=int, default=0, help='Limite total de requisições (0 = sem limite)')
+    parser.add_argument('--mix', default=DEFAULT_MIX, help=f'Pesos dos cenários (padrão: {DEFAULT_MIX})')
+    parser.add_argument('--think', type=float, default=0.0, help='Pausa média entre requisições por usuário (s)')
+    parser.add_argument('--stream-mb', type=float, default=5.0, help='Tamanho do vídeo servido em /api/stream')
+    parser.add_argument('--stream-path', help='Vídeo existente no servidor (com --url)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='Grava os resultados em JSON')
+    args = parser.parse_args()
+
+    mix = parse_mix(args.mix)
+
+    with tempfile.TemporaryDirectory(prefix='lipsync_load_') as tmp:
+        work_dir = Path(tmp)
+        ctx = prepare_context(work_dir, args.stream_mb)
+
+        stubs = None
+        process = None
+
+        if args.url:
+            base_url = args.url.rstrip('/')
+            if args.stream_path:
+                ctx['stream_path'] = args.stream_path
+        else:
+            stubs = StubProviders()
+            stubs.start()
+            process, base_url = start_server(work_dir, {**stubs.env(), 'TEMP_FOLDER': str(work_dir / 'temp')})
+
+        print(f"Servidor: {base_url}")
+        print(f"Carga: {args.users} usuários por {args.duration:.0f}s, mistura {args.mix}")
+
+        try:
+            result = run_load(base_url, mix, ctx, args)
+        finally:
+            if process:
+                process.terminate()
+                process.wait(timeout=10)
+            if stubs:
+                stubs.stop()
+
+    print_report(result, args)
+
+    if args.output:
+        Path(args.output).write_text(
+            json.dumps({'config': vars(args), 'result': result}, indent=2, ensure_ascii=False),
+            encoding='utf-8'
+        )
+        print(f"\n💾 Resultados gravados em {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,386 @@
+"""
+Servidor HTTP local que simula os provedores externos do pipeline
+
+Simula Gemini (REST generateContent), ElevenLabs (vozes + TTS), MiniMax (TTS),
+os hosts de arquivos (0x0.st / tmpfiles.org) e a WaveSpeed (submit, polling e
+download dos clipes), com latência configurável, taxa de 429 e falhas
+injetadas. Usado pelos benchmarks para exercitar o pipeline real sem API keys.
+
+Especificação de latência (segundos):
+    fixed:0.2            sempre 0.2s
+    uniform:0.1,0.5      uniforme entre 0.1s e 0.5s
+    normal:1.0,0.2       normal (média, desvio), truncada em 0
+    lognormal:1.0,0.5    log-normal (mediana, sigma)
+"""
+import json
+import math
+import random
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+
+class LatencyModel:
+    """Distribuição de latência a partir de uma especificação em texto"""
+
+    def __init__(self, spec: str = 'fixed:0'):
+        """
+        Args:
+            spec: Especificação (ver docstring do módulo)
+        """
+        self.spec = spec
+        kind, _, args = spec.partition(':')
+        self.kind = kind.strip().lower()
+        self.args = [float(a) for a in args.split(',') if a.strip()] or [0.0]
+
+        if self.kind not in ('fixed', 'uniform', 'normal', 'lognormal'):
+            raise ValueError(f"Distribuição de latência inválida: {spec}")
+
+    def sample(self, rng: random.Random = random) -> float:
+        """Sorteia uma latência em segundos"""
+        if self.kind == 'fixed':
+            return max(0.0, self.args[0])
+        if self.kind == 'uniform':
+            low, high = self.args[0], self.args[-1]
+            return rng.uniform(low, high)
+        if self.kind == 'normal':
+            mean, std = self.args[0], self.args[1] if len(self.args) > 1 else 0.0
+            return max(0.0, rng.gauss(mean, std))
+        # lognormal: mediana e sigma
+        median, sigma = self.args[0], self.args[1] if len(self.args) > 1 else 0.5
+        return rng.lognormvariate(math.log(max(median, 1e-6)), sigma)
+
+    def __repr__(self):
+        return f"LatencyModel({self.spec!r})"
+
+
+@dataclass
+class ProviderProfile:
+    """Comportamento simulado de um provedor"""
+
+    latency: LatencyModel = field(default_factory=LatencyModel)
+    rate_429: float = 0.0       # fração de respostas 429
+    failure_rate: float = 0.0   # fração de falhas (HTTP 500 ou tarefa "failed")
+
+
+# Provedores configuráveis
+PROVIDERS = ('gemini', 'elevenlabs', 'minimax', 'uploads', 'wavespeed', 'download')
+
+
+def _make_media(media_dir: Path) -> Dict[str, bytes]:
+    """
+    Gera um clipe MP4 e um MP3 curtos válidos com FFmpeg (se disponível)
+
+    Returns:
+        Dict {'mp4': bytes, 'mp3': bytes, 'png': bytes}
+    """
+    media = {
+        'mp4': b'\x00' * 1024,
+        'mp3': b'ID3' + b'\x00' * 1024,
+    }
+
+    if shutil.which('ffmpeg'):
+        mp4 = media_dir / 'clip.mp4'
+        mp3 = media_dir / 'audio.mp3'
+        subprocess.run(
+            ['ffmpeg', '-y', '-v', 'error',
+             '-f', 'lavfi', '-i', 'testsrc=size=320x240:rate=25:duration=1',
+             '-f', 'lavfi', '-i', 'sine=frequency=440:duration=1',
+             '-c:v', 'libx264', '-pix_fmt', 'yuv420p', '-g', '25',
+             '-c:a', 'aac', '-shortest', str(mp4)],
+            capture_output=True, timeout=60
+        )
+        subprocess.run(
+            ['ffmpeg', '-y', '-v', 'error',
+             '-f', 'lavfi', '-i', 'sine=frequency=440:duration=1',
+             '-c:a', 'libmp3lame', str(mp3)],
+            capture_output=True, timeout=60
+        )
+        if mp4.exists():
+            media['mp4'] = mp4.read_bytes()
+        if mp3.exists():
+            media['mp3'] = mp3.read_bytes()
+
+    return media
+
+
+class StubProviders:
+    """Servidor de stubs com perfis por provedor"""
+
+    def __init__(
+        self,
+        profiles: Dict[str, ProviderProfile] = None,
+        render_time: LatencyModel = None,
+        seed: Optional[int] = None
+    ):
+        """
+        Args:
+            profiles: Perfil por provedor (ver PROVIDERS); ausentes = sem latência
+            render_time: Tempo de render de cada tarefa WaveSpeed
+            seed: Semente para resultados reproduzíveis
+        """
+        self.profiles = {name: ProviderProfile() for name in PROVIDERS}
+        self.profiles.update(profiles or {})
+        self.render_time = render_time or LatencyModel('fixed:0.5')
+        self.rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+
+        self._tmp = tempfile.TemporaryDirectory(prefix='lipsync_stubs_')
+        self.media = _make_media(Path(self._tmp.name))
+
+        self.tasks: Dict[str, Dict] = {}
+        self.stats: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+        self.base_url = ''
+
+    # ------------------------------------------------------------------ helpers
+
+    def _random(self) -> float:
+        with self._rng_lock:
+            return self.rng.random()
+
+    def _sample(self, model: LatencyModel) -> float:
+        with self._rng_lock:
+            return model.sample(self.rng)
+
+    def count(self, key: str):
+        """Incrementa um contador de estatísticas"""
+        with self._lock:
+            self.stats[key] = self.stats.get(key, 0) + 1
+
+    def inject(self, provider: str) -> Optional[int]:
+        """
+        Aplica latência e decide se a resposta deve falhar
+
+        Returns:
+            Código HTTP de erro a devolver (429/500) ou None
+        """
+        profile = self.profiles[provider]
+        time.sleep(self._sample(profile.latency))
+        self.count(f'{provider}_requests')
+
+        if profile.rate_429 and self._random() < profile.rate_429:
+            self.count(f'{provider}_429')
+            return 429
+        if provider != 'wavespeed' and profile.failure_rate and self._random() < profile.failure_rate:
+            self.count(f'{provider}_500')
+            return 500
+        return None
+
+    def new_task(self) -> str:
+        """Cria uma tarefa WaveSpeed com tempo de render sorteado"""
+        task_id = uuid.uuid4().hex
+        now = time.time()
+        queue_wait = self._sample(self.render_time) * 0.1
+        failed = self._random() < self.profiles['wavespeed'].failure_rate
+
+        with self._lock:
+            self.tasks[task_id] = {
+                'created': now,
+                'processing_at': now + queue_wait,
+                'done_at': now + queue_wait + self._sample(self.render_time),
+                'failed': failed
+            }
+        return task_id
+
+    # ------------------------------------------------------------------ ciclo
+
+    def start(self) -> str:
+        """Inicia o servidor em uma thread e retorna a URL base"""
+        stubs = self
+
+        class Handler(_StubHandler):
+            server_stubs = stubs
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self._server.daemon_threads = True
+        host, port = self._server.server_address
+        self.base_url = f"http://{host}:{port}"
+
+        self._thread = threading.Thread(target=self._server.serve_forever, name='stub-providers', daemon=True)
+        self._thread.start()
+        return self.base_url
+
+    def stop(self):
+        """Para o servidor e remove arquivos temporários"""
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+        self._tmp.cleanup()
+
+    def env(self) -> Dict[str, str]:
+        """Variáveis de ambiente que apontam o pipeline para os stubs"""
+        return {
+            'GEMINI_API_KEY': 'stub',
+            'ELEVENLABS_API_KEY': 'stub',
+            'MINIMAX_API_KEY': 'stub',
+            'WAVESPEED_API_KEY': 'stub',
+            'GEMINI_API_ENDPOINT': self.base_url,
+            'ELEVENLABS_BASE_URL': f"{self.base_url}/elevenlabs",
+            'MINIMAX_BASE_URL': f"{self.base_url}/minimax",
+            'WAVESPEED_BASE_URL': f"{self.base_url}/wavespeed/api/v3",
+            'UPLOAD_0X0_URL': f"{self.base_url}/0x0",
+            'UPLOAD_TMPFILES_URL': f"{self.base_url}/tmpfiles/api/v1/upload",
+        }
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    """Rotas dos provedores simulados"""
+
+    server_stubs: StubProviders = None
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        # Silencia o log de acesso padrão
+        pass
+
+    # ------------------------------------------------------------------ respostas
+
+    def _body(self) -> bytes:
+        length = int(self.headers.get('Content-Length') or 0)
+        return self.rfile.read(length) if length else b''
+
+    def _send(self, status: int, body: bytes = b'', content_type: str = 'application/json'):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(body)
+
+    def _json(self, data, status: int = 200):
+        self._send(status, json.dumps(data).encode('utf-8'))
+
+    def _error(self, status: int):
+        self._json({'error': {'code': status, 'message': 'stub injected error', 'status': 'ERROR'}}, status)
+
+    # ------------------------------------------------------------------ rotas
+
+    def do_HEAD(self):
+        self.do_GET()
+
+    def do_GET(self):
+        stubs = self.server_stubs
+        path = urlparse(self.path).path
+
+        if path.startswith('/files/'):
+            return self._send(200, b'stub file', 'application/octet-stream')
+
+        if path.startswith('/clips/'):
+            error = stubs.inject('download')
+            if error:
+                return self._error(error)
+            return self._send(200, stubs.media['mp4'], 'video/mp4')
+
+        if path.startswith('/elevenlabs/') and path.endswith('/voices'):
+            error = stubs.inject('elevenlabs')
+            if error:
+                return self._error(error)
+            return self._json({'voices': [
+                {'voice_id': 'stub-voice-1', 'name': 'Stub Voice', 'labels': {}},
+                {'voice_id': 'stub-voice-2', 'name': 'Rachel', 'labels': {}},
+            ]})
+
+        if path.startswith('/wavespeed/') and path.endswith('/result'):
+            error = stubs.inject('wavespeed')
+            if error:
+                return self._error(error)
+
+            task_id = path.rstrip('/').split('/')[-2]
+            task = stubs.tasks.get(task_id)
+            if task is None:
+                return self._error(404)
+
+            now = time.time()
+            if now >= task['done_at']:
+                if task['failed']:
+                    stubs.count('wavespeed_task_failed')
+                    data = {'id': task_id, 'status': 'failed', 'error': 'stub render failure'}
+                else:
+                    data = {'id': task_id, 'status': 'completed',
+                            'outputs': [f"{stubs.base_url}/clips/{task_id}.mp4"]}
+            elif now >= task['processing_at']:
+                data = {'id': task_id, 'status': 'processing'}
+            else:
+                data = {'id': task_id, 'status': 'created'}
+
+            return self._json({'code': 200, 'message': 'success', 'data': data})
+
+        self._error(404)
+
+    def do_POST(self):
+        stubs = self.server_stubs
+        path = urlparse(self.path).path
+        body = self._body()
+
+        if ':generateContent' in path:
+            error = stubs.inject('gemini')
+            if error:
+                return self._error(error)
+
+            prompt = json.loads(body or b'{}')['contents'][0]['parts'][0]['text']
+            # Devolve o próprio texto do batch como "formatado"
+            text = prompt.split(':\n', 1)[-1].split('\n\nINSTRUÇÕES', 1)[0].strip() or 'Texto formatado.'
+            return self._json({
+                'candidates': [{
+                    'content': {'parts': [{'text': text}], 'role': 'model'},
+                    'finishReason': 'STOP',
+                    'index': 0
+                }]
+            })
+
+        if path.startswith('/elevenlabs/') and '/text-to-speech/' in path:
+            error = stubs.inject('elevenlabs')
+            if error:
+                return self._error(error)
+            return self._send(200, stubs.media['mp3'], 'audio/mpeg')
+
+        if path.startswith('/minimax'):
+            error = stubs.inject('minimax')
+            if error:
+                return self._error(error)
+            return self._json({
+                'base_resp': {'status_code': 0, 'status_msg': 'success'},
+                'data': {'audio': stubs.media['mp3'].hex()}
+            })
+
+        if path.startswith('/0x0'):
+            error = stubs.inject('uploads')
+            if error:
+                return self._error(error)
+            url = f"{stubs.base_url}/files/{uuid.uuid4().hex}"
+            return self._send(200, url.encode('utf-8'), 'text/plain')
+
+        if path.startswith('/tmpfiles/'):
+            error = stubs.inject('uploads')
+            if error:
+                return self._error(error)
+            url = f"{stubs.base_url}/files/{uuid.uuid4().hex}"
+            return self._json({'status': 'success', 'data': {'url': url}})
+
+        if path.startswith('/wavespeed/') and path.endswith('/speech-to-video'):
+            error = stubs.inject('wavespeed')
+            if error:
+                return self._error(error)
+            task_id = stubs.new_task()
+            return self._json({'code': 200, 'message': 'success', 'data': {'id': task_id, 'status': 'created'}})
+
+        self._error(404)
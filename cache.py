@@ -0,0 +1,178 @@
+"""
+Cache em memória com TTL, stale-while-revalidate e single-flight
+
+Usado para respostas de APIs externas que mudam pouco (ex: lista de vozes).
+- Dentro do TTL o valor é servido direto da memória
+- Após o TTL (até o limite de "stale") o valor antigo é servido e uma única
+  thread em background busca o novo valor
+- Várias threads pedindo a mesma chave ausente aguardam uma única busca
+- O número de chaves é limitado (max_entries): ao inserir num cache cheio,
+  saem primeiro os valores vencidos e depois os menos usados (LRU)
+"""
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from utils import get_logger
+
+logger = get_logger(__name__)
+
+
+class _Entry:
+    """Entrada do cache"""
+
+    __slots__ = ('value', 'loaded_at')
+
+    def __init__(self, value: Any, loaded_at: float):
+        self.value = value
+        self.loaded_at = loaded_at
+
+
+class _Flight:
+    """Busca em andamento de uma chave (compartilhada pelas threads em espera)"""
+
+    __slots__ = ('done', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.error: Optional[BaseException] = None
+
+
+class TTLCache:
+    """Cache thread-safe com TTL, stale-while-revalidate e coalescência de buscas"""
+
+    def __init__(self, ttl: float, stale_ttl: float = 0.0, name: str = 'cache', max_entries: int = 1024):
+        """
+        Inicializa o cache
+
+        Args:
+            ttl: Tempo (s) em que um valor é considerado fresco
+            stale_ttl: Tempo extra (s) em que um valor vencido ainda pode ser
+                       servido enquanto é revalidado em background
+            name: Nome usado nos logs
+            max_entries: Número máximo de chaves em memória
+        """
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.name = name
+        self.max_entries = max_entries
+
+        self._lock = threading.Lock()
+        # Ordem de uso: a primeira chave é a menos usada recentemente
+        self._entries: Dict[Hashable, _Entry] = OrderedDict()
+        self._inflight: Dict[Hashable, _Flight] = {}
+
+    def get(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """
+        Retorna o valor da chave, carregando-o com `loader` se necessário
+
+        Args:
+            key: Chave do cache
+            loader: Função sem argumentos que busca o valor na origem
+
+        Returns:
+            Valor em cache (fresco ou, dentro da janela stale, antigo)
+
+        Raises:
+            Exception: Erro do loader quando não há valor (ou ele passou da janela stale)
+        """
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is not None:
+                age = now - entry.loaded_at
+
+                if age < self.ttl:
+                    self._entries.move_to_end(key)
+                    return entry.value
+
+                if age < self.ttl + self.stale_ttl:
+                    # Serve valor antigo e revalida em background (uma vez só)
+                    self._entries.move_to_end(key)
+                    if key not in self._inflight:
+                        flight = _Flight()
+                        self._inflight[key] = flight
+                        threading.Thread(
+                            target=self._load,
+                            args=(key, loader, flight),
+                            name=f"{self.name}-refresh",
+                            daemon=True
+                        ).start()
+                    return entry.value
+
+                # Passou da janela stale: o valor não pode mais ser servido,
+                # nem se a nova busca falhar
+                del self._entries[key]
+
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = _Flight()
+                self._inflight[key] = flight
+
+        if leader:
+            self._load(key, loader, flight)
+        else:
+            flight.done.wait()
+
+        with self._lock:
+            entry = self._entries.get(key)
+
+        if entry is None:
+            raise flight.error or Exception(f"[{self.name}] Valor indisponível para {key!r}")
+
+        # Se a origem falhou dentro da janela stale, o valor antigo continua sendo servido
+        return entry.value
+
+    def _load(self, key: Hashable, loader: Callable[[], Any], flight: _Flight):
+        """Executa o loader e publica o resultado para as threads em espera"""
+        try:
+            value = loader()
+            with self._lock:
+                self._entries[key] = _Entry(value, time.monotonic())
+                self._entries.move_to_end(key)
+                self._evict()
+        except Exception as e:
+            logger.warning(f"[{self.name}] Falha ao carregar {key!r}: {e}")
+            flight.error = e
+        finally:
+            with self._lock:
+                if self._inflight.get(key) is flight:
+                    del self._inflight[key]
+            flight.done.set()
+
+    def _evict(self):
+        """Mantém o cache dentro de max_entries (chamar com o lock)"""
+        if len(self._entries) <= self.max_entries:
+            return
+
+        # Primeiro os valores que nem na janela stale podem mais ser servidos
+        now = time.monotonic()
+        limit = self.ttl + self.stale_ttl
+        for key in [k for k, e in self._entries.items() if now - e.loaded_at >= limit]:
+            del self._entries[key]
+
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def peek(self, key: Hashable) -> Optional[Any]:
+        """Retorna o valor em cache sem disparar carga (ou None)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry.value if entry is not None else None
+
+    def invalidate(self, key: Hashable = None):
+        """
+        Remove uma chave (ou todas) do cache
+
+        Args:
+            key: Chave a remover (None = limpa tudo)
+        """
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
@@ -0,0 +1,147 @@
+"""
+Registro de clientes dos provedores - instâncias compartilhadas por processo
+
+Cada cliente (Gemini, ElevenLabs/MiniMax, WaveSpeed, FFmpeg) é criado uma única
+vez por provedor e API key e reutilizado entre requisições, mantendo os pools
+de conexão HTTP abertos. O registro só é reconstruído quando uma key muda.
+"""
+import threading
+from typing import Dict, Callable, Any
+
+from config import Config
+from utils import get_logger
+
+logger = get_logger(__name__)
+
+
+class ClientRegistry:
+    """Cria sob demanda e mantém instâncias compartilhadas dos clientes"""
+
+    def __init__(self):
+        """Inicializa o registro vazio"""
+        self._lock = threading.RLock()
+        self._clients: Dict[tuple, Any] = {}
+
+    def _get_or_create(self, key: tuple, factory: Callable[[], Any]) -> Any:
+        """
+        Retorna a instância registrada para a chave, criando-a se necessário
+
+        Args:
+            key: Chave (tipo, provedor, api_key)
+            factory: Função que constrói a instância
+
+        Returns:
+            Instância compartilhada
+        """
+        client = self._clients.get(key)
+        if client is not None:
+            return client
+
+        with self._lock:
+            # Outra thread pode ter criado enquanto aguardávamos o lock
+            client = self._clients.get(key)
+            if client is None:
+                client = factory()
+                self._clients[key] = client
+                logger.info(f"Cliente registrado: {key[0]} ({key[1]})")
+            return client
+
+    def get_text_processor(self):
+        """Retorna o TextProcessor compartilhado (Gemini)"""
+        from text_processor import TextProcessor
+
+        return self._get_or_create(
+            ('text_processor', 'gemini', Config.GEMINI_API_KEY),
+            TextProcessor
+        )
+
+    def get_audio_generator(self, provider: str = None):
+        """
+        Retorna o AudioGenerator compartilhado do provedor
+
+        Args:
+            provider: 'elevenlabs' ou 'minimax' (padrão: config)
+        """
+        from audio_generator import AudioGenerator
+
+        provider = (provider or Config.AUDIO_PROVIDER).lower()
+
+        if provider == 'elevenlabs':
+            api_key = Config.ELEVENLABS_API_KEY
+        elif provider == 'minimax':
+            api_key = Config.MINIMAX_API_KEY
+        else:
+            api_key = None
+
+        return self._get_or_create(
+            ('audio_generator', provider, api_key),
+            lambda: AudioGenerator(provider=provider)
+        )
+
+    def get_video_generator(self):
+        """Retorna o VideoGenerator compartilhado (WaveSpeed)"""
+        from video_generator import VideoGenerator
+
+        return self._get_or_create(
+            ('video_generator', 'wavespeed', Config.WAVESPEED_API_KEY),
+            VideoGenerator
+        )
+
+    def get_video_concatenator(self):
+        """Retorna o VideoConcatenator compartilhado (FFmpeg verificado uma vez)"""
+        from video_concatenator import VideoConcatenator
+
+        return self._get_or_create(
+            ('video_concatenator', 'ffmpeg', None),
+            VideoConcatenator
+        )
+
+    def get_job_manager(self, audio_provider: str = None):
+        """
+        Retorna um JobManager montado com os clientes compartilhados
+
+        Args:
+            audio_provider: 'elevenlabs' ou 'minimax' (padrão: config)
+        """
+        from job_manager import JobManager
+
+        audio_generator = self.get_audio_generator(audio_provider)
+
+        return self._get_or_create(
+            ('job_manager', audio_generator.provider, id(audio_generator)),
+            lambda: JobManager(
+                text_processor=self.get_text_processor(),
+                audio_generator=audio_generator,
+                video_generator=self.get_video_generator(),
+                video_concatenator=self.get_video_concatenator()
+            )
+        )
+
+    def reload_api_keys(self, force: bool = False) -> bool:
+        """
+        Aplica as API keys salvas no .env (por este ou outro processo)
+
+        Os clientes são descartados apenas se alguma key mudou; jobs em
+        andamento terminam com os clientes que já têm.
+
+        Args:
+            force: Relê o .env mesmo sem mudança no arquivo
+
+        Returns:
+            True se alguma key mudou
+        """
+        if not Config.reload_api_keys(force=force):
+            return False
+        self.invalidate()
+        return True
+
+    def invalidate(self):
+        """Descarta todos os clientes (chamado quando as API keys mudam)"""
+        with self._lock:
+            count = len(self._clients)
+            self._clients = {}
+        logger.info(f"Registro de clientes invalidado ({count} instâncias descartadas)")
+
+
+# Instância global do registro
+registry = ClientRegistry()
@@ -2,12 +2,30 @@
 Configurações e validações do sistema
 """
 import os
+import threading
 from pathlib import Path
-from dotenv import load_dotenv
+from dotenv import load_dotenv, dotenv_values
 
 # Carrega variáveis de ambiente
 load_dotenv()
 
+# .env gravado pela interface (/api/config/keys) e as keys relidas dele
+ENV_FILE = Path('.env')
+API_KEY_NAMES = ('ELEVENLABS_API_KEY', 'MINIMAX_API_KEY', 'GEMINI_API_KEY', 'WAVESPEED_API_KEY')
+
+
+def _env_signature():
+    """(mtime, tamanho) do .env, ou None se ele não existe"""
+    try:
+        stat = ENV_FILE.stat()
+        return stat.st_mtime_ns, stat.st_size
+    except FileNotFoundError:
+        return None
+
+
+_env_lock = threading.Lock()
+_env_seen = {'signature': _env_signature()}
+
 class Config:
     """Configurações centralizadas do sistema"""
 
@@ -17,6 +35,14 @@ class Config:
     GEMINI_API_KEY = os.getenv('GEMINI_API_KEY')
     WAVESPEED_API_KEY = os.getenv('WAVESPEED_API_KEY')
 
+    # Endpoints dos provedores (sobrescreva apenas para testes/benchmarks com stubs locais)
+    GEMINI_API_ENDPOINT = os.getenv('GEMINI_API_ENDPOINT') or None
+    ELEVENLABS_BASE_URL = os.getenv('ELEVENLABS_BASE_URL') or None
+    MINIMAX_BASE_URL = os.getenv('MINIMAX_BASE_URL', 'https://api.minimax.chat/v1/text_to_speech')
+    WAVESPEED_BASE_URL = os.getenv('WAVESPEED_BASE_URL', 'https://api.wavespeed.ai/api/v3')
+    UPLOAD_0X0_URL = os.getenv('UPLOAD_0X0_URL', 'https://0x0.st')
+    UPLOAD_TMPFILES_URL = os.getenv('UPLOAD_TMPFILES_URL', 'https://tmpfiles.org/api/v1/upload')
+
     # Audio Provider (elevenlabs ou minimax)
     AUDIO_PROVIDER = os.getenv('AUDIO_PROVIDER', 'elevenlabs')
 
@@ -29,10 +55,102 @@ class Config:
     BATCH_SIZE = int(os.getenv('BATCH_SIZE', 3))
     POLL_INTERVAL = float(os.getenv('POLL_INTERVAL', 10.0))  # 10 segundos entre polls
     POLL_TIMEOUT = float(os.getenv('POLL_TIMEOUT', 900.0))   # 15 minutos timeout total
+    POLL_INITIAL_DELAY = float(os.getenv('POLL_INITIAL_DELAY', 15.0))  # espera antes do primeiro poll
+
+    # Polling adaptativo: com POLL_MIN_SAMPLES renders no histórico (por resolução),
+    # o primeiro poll acontece perto da conclusão prevista pela duração do áudio,
+    # os seguintes são densos na janela prevista e espaçam depois dela.
+    # Sem histórico valem POLL_INITIAL_DELAY e POLL_INTERVAL
+    POLL_ADAPTIVE = os.getenv('POLL_ADAPTIVE', 'true').lower() in ('1', 'true', 'yes')
+    POLL_MIN_SAMPLES = int(os.getenv('POLL_MIN_SAMPLES', 5))
+    POLL_MIN_INTERVAL = float(os.getenv('POLL_MIN_INTERVAL', 2.0))
+    POLL_MAX_INTERVAL = float(os.getenv('POLL_MAX_INTERVAL', 30.0))
+    STATE_WRITE_DELAY = float(os.getenv('STATE_WRITE_DELAY', 0.5))  # janela de coalescência do state.json
+
+    # Download dos clipes renderizados: tentativas (retomando com HTTP Range),
+    # espera base do backoff e timeout de leitura (s)
+    DOWNLOAD_MAX_ATTEMPTS = int(os.getenv('DOWNLOAD_MAX_ATTEMPTS', 5))
+    DOWNLOAD_RETRY_DELAY = float(os.getenv('DOWNLOAD_RETRY_DELAY', 1.0))
+    DOWNLOAD_TIMEOUT = float(os.getenv('DOWNLOAD_TIMEOUT', 60.0))
+
+    # Hedging de renders lentos: passado o percentil HEDGE_PERCENTILE do tempo
+    # de render (por segundo de áudio), uma tarefa duplicada é submetida e vale
+    # a primeira que terminar. HEDGE_BUDGET limita as duplicatas (fração das tarefas).
+    # Opcional (desligado por padrão): cada duplicata é um render pago
+    HEDGE_ENABLED = os.getenv('HEDGE_ENABLED', 'false').lower() in ('1', 'true', 'yes')
+    HEDGE_PERCENTILE = float(os.getenv('HEDGE_PERCENTILE', 95))
+    HEDGE_BUDGET = float(os.getenv('HEDGE_BUDGET', 0.1))
+    HEDGE_MIN_SAMPLES = int(os.getenv('HEDGE_MIN_SAMPLES', 20))
+    HEDGE_MIN_DELAY = float(os.getenv('HEDGE_MIN_DELAY', 60.0))
+
+    # Execução do pipeline: 'inline' (na thread da requisição) ou 'queue'
+    # (fila em disco consumida por pipeline_worker.py em processos separados)
+    PIPELINE_MODE = os.getenv('PIPELINE_MODE', 'inline')
+    PIPELINE_WORKERS = int(os.getenv('PIPELINE_WORKERS', 2))  # jobs simultâneos no modo queue
+    QUEUE_FOLDER = Path(os.getenv('QUEUE_FOLDER', './data/queue'))
+    QUEUE_POLL_INTERVAL = float(os.getenv('QUEUE_POLL_INTERVAL', 1.0))
+    EVENT_LOG_FOLDER = Path(os.getenv('EVENT_LOG_FOLDER', './data/events'))  # eventos entre processos
+    # Métricas entre processos: cada processo grava um snapshot nesta pasta e o
+    # /metrics soma todos (gunicorn com vários workers e/ou modo queue)
+    METRICS_FOLDER = Path(os.getenv('METRICS_FOLDER', './data/metrics'))
+    METRICS_SNAPSHOT_INTERVAL = float(os.getenv('METRICS_SNAPSHOT_INTERVAL', 5.0))
+
+    # Entrega de vídeos (/api/download e /api/stream): apenas arquivos dentro
+    # de MEDIA_ROOTS são servidos. Com MEDIA_ACCEL_REDIRECT o Flask só autoriza
+    # e o Nginx envia o arquivo (X-Accel-Redirect para MEDIA_ACCEL_PREFIX, um
+    # location internal com alias para MEDIA_ACCEL_ROOT)
+    MEDIA_ROOTS = [Path(p.strip()) for p in os.getenv('MEDIA_ROOTS', './temp,./projects').split(',') if p.strip()]
+    MEDIA_ACCEL_REDIRECT = os.getenv('MEDIA_ACCEL_REDIRECT', 'false').lower() in ('1', 'true', 'yes')
+    MEDIA_ACCEL_PREFIX = os.getenv('MEDIA_ACCEL_PREFIX', '/_media/')
+    MEDIA_ACCEL_ROOT = Path(os.getenv('MEDIA_ACCEL_ROOT', '.'))
+
+    # Cache de vozes (segundos): fresco por TTL, servido "stale" enquanto revalida
+    VOICES_CACHE_TTL = float(os.getenv('VOICES_CACHE_TTL', 600.0))
+    VOICES_CACHE_STALE = float(os.getenv('VOICES_CACHE_STALE', 3600.0))
 
     # Configurações de Vídeo
     DEFAULT_RESOLUTION = os.getenv('DEFAULT_RESOLUTION', '480p')
+
+    # Rascunho local (imagem + áudio, FFmpeg) gerado antes dos renders quando o
+    # vídeo é pedido com draft=true: altura em pixels
+    DRAFT_HEIGHT = int(os.getenv('DRAFT_HEIGHT', 360))
+
+    # Derivados das imagens de avatar (tamanho da resolução, EXIF aplicado,
+    # JPEG): criados uma vez por (conteúdo, resolução) e ligados aos jobs
+    IMAGE_CACHE_FOLDER = Path(os.getenv('IMAGE_CACHE_FOLDER', './data/image_cache'))
+    IMAGE_JPEG_QUALITY = int(os.getenv('IMAGE_JPEG_QUALITY', 90))
+
+    # Armazenamento por conteúdo (SHA-256) de uploads e avatares: cada conteúdo
+    # é gravado uma vez e referenciado por hardlinks (mesmo disco de temp/ e data/)
+    ASSET_STORE_FOLDER = Path(os.getenv('ASSET_STORE_FOLDER', './data/assets'))
+
+    # Miniaturas dos avatares (galeria/seletores): lado menor em pixels de cada
+    # tamanho, gerados em WebP e JPEG por um pool de processos
+    THUMBNAIL_SIZES = tuple(int(s) for s in os.getenv('THUMBNAIL_SIZES', '160,320,640').split(',') if s.strip())
+    THUMBNAIL_QUALITY = int(os.getenv('THUMBNAIL_QUALITY', 80))
+    THUMBNAIL_WORKERS = int(os.getenv('THUMBNAIL_WORKERS', 2))
+    THUMBNAIL_IDLE_SECONDS = float(os.getenv('THUMBNAIL_IDLE_SECONDS', 60.0))  # encerra o pool ocioso
     VIDEO_QUALITY = os.getenv('VIDEO_QUALITY', 'high')
+    # Layout do MP4 final: 'faststart' (índice moov no início, reproduz sem
+    # baixar o fim do arquivo), 'fragmented' (fMP4, reproduz enquanto baixa)
+    # ou 'default' (muxing padrão do FFmpeg)
+    MP4_LAYOUT = os.getenv('MP4_LAYOUT', 'faststart')
+
+    # Prévia HLS ao vivo: clipes prontos viram segmentos de uma playlist
+    # (temp/job_<id>/preview/index.m3u8) antes do vídeo final existir
+    LIVE_PREVIEW = os.getenv('LIVE_PREVIEW', 'true').lower() in ('1', 'true', 'yes')
+    PREVIEW_SEGMENT_SECONDS = float(os.getenv('PREVIEW_SEGMENT_SECONDS', 4.0))
+    # Segundos até apagar a prévia depois que o job termina (o player troca para o vídeo final)
+    PREVIEW_RETAIN_SECONDS = float(os.getenv('PREVIEW_RETAIN_SECONDS', 60.0))
+
+    # Concatenação incremental: cada clipe é anexado ao vídeo final assim que
+    # o anterior estiver pronto (fallback para a concatenação normal)
+    INCREMENTAL_CONCAT = os.getenv('INCREMENTAL_CONCAT', 'true').lower() in ('1', 'true', 'yes')
+
+    # Transições de fade entre clipes: só as emendas são re-encodadas
+    # (desativa a concatenação incremental, que apenas copia os clipes)
+    VIDEO_TRANSITIONS = os.getenv('VIDEO_TRANSITIONS', 'false').lower() in ('1', 'true', 'yes')
+    TRANSITION_DURATION = float(os.getenv('TRANSITION_DURATION', 0.5))
 
     # Formatos suportados
     SUPPORTED_IMAGE_FORMATS = {'.png', '.jpg', '.jpeg'}
@@ -61,6 +179,12 @@ class Config:
         if not cls.MINIMAX_API_KEY:
             warnings.append("MINIMAX_API_KEY não configurada - MiniMax não estará disponível")
 
+        if cls.MP4_LAYOUT not in ('faststart', 'fragmented', 'default'):
+            errors.append(f"MP4_LAYOUT inválido: {cls.MP4_LAYOUT} (use 'faststart', 'fragmented' ou 'default')")
+
+        if cls.PIPELINE_MODE not in ('inline', 'queue'):
+            errors.append(f"PIPELINE_MODE inválido: {cls.PIPELINE_MODE} (use 'inline' ou 'queue')")
+
         if not cls.GEMINI_API_KEY:
             errors.append("GEMINI_API_KEY não configurada")
 
@@ -83,5 +207,38 @@ class Config:
 
         return True
 
+    @classmethod
+    def reload_api_keys(cls, force: bool = False) -> bool:
+        """
+        Relê as API keys do .env se o arquivo mudou desde a última leitura
+
+        Com vários processos (workers do gunicorn, pipeline workers), as keys
+        salvas pela interface em um deles chegam aos demais por aqui. Keys
+        ausentes no .env mantêm o valor atual (ex: vindo do ambiente).
+
+        Args:
+            force: Relê mesmo sem mudança no arquivo
+
+        Returns:
+            True se alguma key mudou
+        """
+        signature = _env_signature()
+
+        with _env_lock:
+            if not force and signature == _env_seen['signature']:
+                return False
+            _env_seen['signature'] = signature
+
+            values = dotenv_values(ENV_FILE) if signature else {}
+            changed = False
+            for name in API_KEY_NAMES:
+                value = values.get(name)
+                if value and value != getattr(cls, name):
+                    os.environ[name] = value
+                    setattr(cls, name, value)
+                    changed = True
+
+        return changed
+
 # Valida configurações ao importar
 Config.validate()
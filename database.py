@@ -3,11 +3,31 @@ Database Layer - JSON-based storage for projects, avatars, and jobs
 Simple, lightweight, and sufficient for the application needs
 """
 import json
+import threading
+from contextlib import contextmanager
+from functools import wraps
 from pathlib import Path
 from typing import List, Dict, Any, Optional
 from datetime import datetime
 import uuid
 
+from utils import write_json_atomic
+
+try:
+    import fcntl
+except ImportError:  # Windows: only in-process locking
+    fcntl = None
+
+
+def _synchronized(method):
+    """Run a read-modify-write method under the database lock"""
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._locked():
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
 class Database:
     """Simple JSON-based database"""
     
@@ -20,6 +40,10 @@ class Database:
         self.avatars_file = self.data_dir / "avatars.json"
         self.jobs_file = self.data_dir / "jobs.json"
         self.tags_file = self.data_dir / "tags.json"
+
+        # Serializes writes across threads and processes (API + pipeline workers)
+        self.lock_file = self.data_dir / ".db.lock"
+        self._thread_lock = threading.RLock()
         
         # Avatar storage directories
         self.avatars_dir = self.data_dir / "avatars"
@@ -59,14 +83,29 @@ class Database:
             return [] if file_path.suffix == '.json' else {}
     
     def _save_json(self, file_path: Path, data: Any):
-        """Save JSON file"""
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        """Save JSON file atomically (readers never see a partial file)"""
+        write_json_atomic(file_path, data, indent=2)
+
+    @contextmanager
+    def _locked(self):
+        """Exclusive lock for read-modify-write cycles"""
+        with self._thread_lock:
+            if fcntl is None:
+                yield
+                return
+
+            with open(self.lock_file, 'a') as lock:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock, fcntl.LOCK_UN)
     
     # ========================================================================
     # PROJECTS
     # ========================================================================
     
+    @_synchronized
     def create_project(self, name: str, description: str = "", tags: List[str] = None) -> Dict:
         """Create a new project"""
         projects = self._load_json(self.projects_file)
@@ -108,6 +147,7 @@ class Database:
         
         return None
     
+    @_synchronized
     def update_project(self, project_id: str, updates: Dict) -> Optional[Dict]:
         """Update a project"""
         projects = self._load_json(self.projects_file)
@@ -122,6 +162,7 @@ class Database:
         
         return None
     
+    @_synchronized
     def delete_project(self, project_id: str) -> bool:
         """Delete a project"""
         projects = self._load_json(self.projects_file)
@@ -131,6 +172,7 @@ class Database:
         
         return True
     
+    @_synchronized
     def add_video_to_project(self, project_id: str, video_data: Dict) -> bool:
         """Add a video to a project"""
         projects = self._load_json(self.projects_file)
@@ -145,6 +187,9 @@ class Database:
                     "path": video_data.get('path'),
                     "name": video_data.get('name', 'Untitled'),
                     "duration": video_data.get('duration', 0),
+                    "width": video_data.get('width'),
+                    "height": video_data.get('height'),
+                    "bitrate": video_data.get('bitrate'),
                     "created_at": datetime.now().isoformat()
                 }
                 
@@ -161,6 +206,7 @@ class Database:
     # AVATARS
     # ========================================================================
     
+    @_synchronized
     def create_avatar(self, name: str, image_path: str, thumbnail_path: str = None) -> Dict:
         """Create a new avatar entry"""
         avatars = self._load_json(self.avatars_file)
@@ -194,21 +240,26 @@ class Database:
         
         return None
     
+    @_synchronized
     def delete_avatar(self, avatar_id: str) -> bool:
         """Delete an avatar"""
         avatars = self._load_json(self.avatars_file)
         
+        remaining = [a for a in avatars if a['id'] != avatar_id]
+        # Avatars with the same content share files: keep those still referenced
+        in_use = {a['image_path'] for a in remaining} | {a.get('thumbnail_path') for a in remaining}
+        
         # Find and delete avatar files
         for avatar in avatars:
             if avatar['id'] == avatar_id:
                 try:
-                    Path(avatar['image_path']).unlink(missing_ok=True)
-                    if avatar.get('thumbnail_path'):
-                        Path(avatar['thumbnail_path']).unlink(missing_ok=True)
+                    for path in {avatar['image_path'], avatar.get('thumbnail_path')}:
+                        if path and path not in in_use:
+                            Path(path).unlink(missing_ok=True)
                 except Exception as e:
                     print(f"Error deleting avatar files: {e}")
         
-        avatars = [a for a in avatars if a['id'] != avatar_id]
+        avatars = remaining
         self._save_json(self.avatars_file, avatars)
         
         return True
@@ -217,6 +268,7 @@ class Database:
     # JOBS
     # ========================================================================
     
+    @_synchronized
     def create_job(self, job_data: Dict) -> Dict:
         """Create a job entry"""
         jobs = self._load_json(self.jobs_file)
@@ -224,7 +276,7 @@ class Database:
         job = {
             "id": job_data.get('id', f"job_{uuid.uuid4().hex[:8]}"),
             "type": job_data.get('type', 'video_generation'),
-            "status": "processing",  # processing, completed, failed
+            "status": "processing",  # processing, draft_ready, completed, failed
             "progress": 0,
             "estimated_time": job_data.get('estimated_time', 0),
             "started_at": datetime.now().isoformat(),
@@ -239,6 +291,7 @@ class Database:
         
         return job
     
+    @_synchronized
     def update_job(self, job_id: str, updates: Dict) -> Optional[Dict]:
         """Update a job"""
         jobs = self._load_json(self.jobs_file)
@@ -256,6 +309,29 @@ class Database:
                 return job
         
         return None
+
+    @_synchronized
+    def transition_job(self, job_id: str, expected: str, updates: Dict) -> bool:
+        """
+        Apply updates only if the job is still in the expected status
+
+        Compare-and-set under the database lock: of several concurrent
+        requests for the same transition, only one succeeds.
+
+        Returns:
+            False if the job doesn't exist or its status changed
+        """
+        jobs = self._load_json(self.jobs_file)
+
+        for job in jobs:
+            if job['id'] == job_id:
+                if job.get('status') != expected:
+                    return False
+                job.update(updates)
+                self._save_json(self.jobs_file, jobs)
+                return True
+
+        return False
     
     def get_jobs(self, status: str = None, limit: int = 50) -> List[Dict]:
         """Get jobs, optionally filtered by status"""
@@ -279,6 +355,7 @@ class Database:
         
         return None
     
+    @_synchronized
     def delete_job(self, job_id: str) -> bool:
         """Delete a job"""
         jobs = self._load_json(self.jobs_file)
@@ -290,6 +367,7 @@ class Database:
     # TAGS
     # ========================================================================
     
+    @_synchronized
     def create_tag(self, name: str, color: str = "#667eea") -> Dict:
         """Create a new tag"""
         tags = self._load_json(self.tags_file)
@@ -311,6 +389,7 @@ class Database:
         tags.sort(key=lambda x: x.get('name', ''))
         return tags
     
+    @_synchronized
     def delete_tag(self, tag_id: str) -> bool:
         """Delete a tag"""
         tags = self._load_json(self.tags_file)
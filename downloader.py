@@ -0,0 +1,159 @@
+"""
+Download resiliente dos clipes renderizados
+
+Um clipe pago não pode ser perdido por uma conexão que caiu no meio:
+- O arquivo é gravado em <destino>.part e só vira o destino depois de
+  verificado
+- Se a conexão cair, a próxima tentativa continua do byte onde parou
+  (HTTP Range); servidores sem suporte a Range recomeçam do zero
+- O tamanho recebido é conferido com Content-Length/Content-Range
+- O arquivo completo passa por uma validação rápida (ex: verify_mp4); se
+  estiver corrompido é baixado de novo, sem re-renderizar
+"""
+import os
+import re
+import time
+from pathlib import Path
+from typing import Callable, Optional
+
+import requests
+
+from config import Config
+from utils import get_logger
+import metrics
+
+logger = get_logger(__name__)
+
+# Erros HTTP que valem nova tentativa (os demais 4xx são definitivos)
+RETRYABLE_STATUS = {408, 425, 429, 500, 502, 503, 504}
+
+
+class DownloadError(Exception):
+    """Download não concluído após todas as tentativas"""
+
+
+class _Retry(Exception):
+    """Falha transitória: tenta de novo (recomeçando do zero se restart=True)"""
+
+    def __init__(self, message: str, restart: bool = False):
+        super().__init__(message)
+        self.restart = restart
+
+
+def download_file(
+    url: str,
+    output_path: Path,
+    session: Optional[requests.Session] = None,
+    validate: Optional[Callable[[Path], None]] = None,
+    max_attempts: int = None,
+    retry_delay: float = None,
+    timeout: float = None
+) -> int:
+    """
+    Baixa url em output_path com retomada, retry e verificação
+
+    Args:
+        url: URL do arquivo
+        output_path: Destino final
+        session: Sessão HTTP (padrão: requests)
+        validate: Verificação do arquivo completo; deve levantar ValueError se inválido
+        max_attempts: Tentativas (padrão: config)
+        retry_delay: Espera base do backoff exponencial (padrão: config)
+        timeout: Timeout de conexão/leitura em segundos (padrão: config)
+
+    Returns:
+        Tamanho do arquivo baixado em bytes
+
+    Raises:
+        DownloadError: Se não foi possível obter um arquivo válido
+    """
+    output_path = Path(output_path)
+    part_path = output_path.with_name(output_path.name + '.part')
+    max_attempts = max_attempts or Config.DOWNLOAD_MAX_ATTEMPTS
+    retry_delay = Config.DOWNLOAD_RETRY_DELAY if retry_delay is None else retry_delay
+    timeout = timeout or Config.DOWNLOAD_TIMEOUT
+    http = session or requests
+
+    last_error = None
+    for attempt in range(1, max_attempts + 1):
+        try:
+            _fetch(http, url, part_path, timeout)
+
+            if validate:
+                try:
+                    validate(part_path)
+                except ValueError as e:
+                    raise _Retry(f"arquivo inválido: {e}", restart=True)
+
+            size = part_path.stat().st_size
+            os.replace(part_path, output_path)
+            return size
+
+        except (_Retry, requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError) as e:
+            last_error = e
+            if getattr(e, 'restart', False):
+                part_path.unlink(missing_ok=True)
+
+            if attempt == max_attempts:
+                break
+
+            delay = retry_delay * (2 ** (attempt - 1))
+            resumed = part_path.stat().st_size if part_path.exists() else 0
+            logger.warning(
+                f"Download de {output_path.name}: tentativa {attempt}/{max_attempts} falhou ({e}); "
+                f"nova tentativa em {delay:.1f}s" + (f" a partir do byte {resumed}" if resumed else "")
+            )
+            metrics.RETRIES.inc(operation='download')
+            time.sleep(delay)
+
+    part_path.unlink(missing_ok=True)
+    raise DownloadError(f"Falha ao baixar {output_path.name} após {max_attempts} tentativas: {last_error}")
+
+
+def _fetch(http, url: str, part_path: Path, timeout: float):
+    """Uma tentativa: continua part_path de onde parou até o fim do arquivo"""
+    offset = part_path.stat().st_size if part_path.exists() else 0
+
+    # identity: o tamanho recebido precisa bater com Content-Length/Range
+    headers = {'Accept-Encoding': 'identity'}
+    if offset:
+        headers['Range'] = f'bytes={offset}-'
+
+    with http.get(url, headers=headers, stream=True, timeout=(10, timeout)) as response:
+        if response.status_code == 416 and offset:
+            # Range além do fim: o .part já está completo (ou é maior que o original)
+            total = _content_range_total(response.headers.get('Content-Range'))
+            if total == offset:
+                return
+            raise _Retry("arquivo parcial maior que o original", restart=True)
+
+        if response.status_code in RETRYABLE_STATUS:
+            raise _Retry(f"HTTP {response.status_code}")
+        response.raise_for_status()
+
+        if response.status_code == 206:
+            match = re.match(r'bytes (\d+)-\d+/(\d+|\*)', response.headers.get('Content-Range', ''))
+            if not match or int(match.group(1)) != offset:
+                raise _Retry("Content-Range inesperado", restart=True)
+            expected = _content_range_total(response.headers['Content-Range'])
+            mode = 'ab'
+        else:
+            # Servidor ignorou o Range: recomeça do zero
+            expected = int(response.headers['Content-Length']) if 'Content-Length' in response.headers else None
+            mode = 'wb'
+
+        with open(part_path, mode) as f:
+            # Blocos pequenos: ao cair a conexão perde-se no máximo um bloco
+            for chunk in response.iter_content(chunk_size=64 * 1024):
+                f.write(chunk)
+
+    size = part_path.stat().st_size
+    if expected is not None and size != expected:
+        # Menor: conexão caiu (retoma); maior: dados inconsistentes (recomeça)
+        raise _Retry(f"recebidos {size} de {expected} bytes", restart=size > expected)
+
+
+def _content_range_total(value: Optional[str]) -> Optional[int]:
+    """Tamanho total de um Content-Range ("bytes 0-99/1234" ou "bytes */1234")"""
+    match = re.search(r'/(\d+)$', value or '')
+    return int(match.group(1)) if match else None
@@ -0,0 +1,122 @@
+"""
+Rascunho local do vídeo para aprovação antes dos renders finais
+
+Cada clipe do rascunho é a imagem que será animada no WaveSpeed com o áudio
+do batch, montada pelo FFmpeg em baixa resolução: leva segundos e não gasta
+créditos. Os renders de lip-sync só começam quando o rascunho é aprovado
+(POST /api/jobs/<id>/approve), reaproveitando textos e áudios.
+"""
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List
+
+from config import Config
+from utils import get_logger
+from video_concatenator import VideoConcatenator
+import metrics
+import tracing
+
+logger = get_logger(__name__)
+
+
+class DraftRenderer:
+    """Monta o rascunho (imagem estática + áudio) de um job"""
+
+    # Imagem parada: poucos quadros por segundo bastam
+    FPS = 10
+
+    def __init__(self, height: int = None, max_workers: int = 4, video_concatenator: VideoConcatenator = None):
+        """
+        Inicializa o renderizador
+
+        Args:
+            height: Altura do rascunho em pixels (padrão: config)
+            max_workers: Clipes montados em paralelo
+            video_concatenator: VideoConcatenator já criado (opcional)
+        """
+        self.height = height or Config.DRAFT_HEIGHT
+        self.max_workers = max_workers
+        self.video_concatenator = video_concatenator or VideoConcatenator()
+
+    def render(
+        self,
+        audios: List[Dict],
+        images: Dict[int, Path],
+        output_dir: Path,
+        progress_callback=None
+    ) -> Path:
+        """
+        Gera o rascunho do job
+
+        Clipes de rascunho mais novos que o seu áudio são reaproveitados: ao
+        revisar um batch, só ele é montado de novo.
+
+        Args:
+            audios: Lista de dicts dos áudios ({'audio_number', 'audio_path'})
+            images: Imagem de cada clipe (VideoGenerator.assign_images)
+            output_dir: Diretório do job
+            progress_callback: Função de callback para progresso
+
+        Returns:
+            Path do rascunho (output_dir/draft/draft.mp4)
+
+        Raises:
+            Exception: Se algum clipe ou a concatenação falhar
+        """
+        draft_dir = output_dir / 'draft'
+        draft_dir.mkdir(parents=True, exist_ok=True)
+
+        if progress_callback:
+            progress_callback(f"Montando rascunho de {len(audios)} clipes...")
+
+        def render_clip(audio_data: Dict) -> Path:
+            number = audio_data['audio_number']
+            audio_path = Path(audio_data['audio_path'])
+            clip_path = draft_dir / f'draft_{number}.mp4'
+
+            if clip_path.exists() and clip_path.stat().st_mtime >= audio_path.stat().st_mtime:
+                return clip_path
+
+            with tracing.span('draft.clip', clip=number):
+                self._render_clip(images[number], audio_path, clip_path)
+            return clip_path
+
+        ordered = sorted(audios, key=lambda a: a['audio_number'])
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(ordered)) or 1) as executor:
+            clip_paths = list(executor.map(tracing.wrap(render_clip), ordered))
+
+        draft_path = draft_dir / 'draft.mp4'
+        return self.video_concatenator.concatenate_videos(
+            video_paths=clip_paths,
+            output_path=draft_path,
+            add_transitions=False,
+            progress_callback=progress_callback
+        )
+
+    def _render_clip(self, image_path: Path, audio_path: Path, output_path: Path):
+        """Monta um clipe: imagem parada durante todo o áudio"""
+        cmd = [
+            'ffmpeg',
+            '-loop', '1',
+            '-framerate', str(self.FPS),
+            '-i', str(image_path),
+            '-i', str(audio_path),
+            '-vf', f'scale=-2:{self.height},format=yuv420p',
+            '-c:v', 'libx264',
+            '-preset', 'ultrafast',
+            '-tune', 'stillimage',
+            '-c:a', 'aac',
+            '-b:a', '96k',
+            '-ar', '44100',
+            '-shortest',
+            '-y',
+            str(output_path)
+        ]
+
+        with metrics.track('draft', 'ffmpeg'):
+            result = subprocess.run(cmd, capture_output=True, text=True, timeout=300)
+
+        if result.returncode != 0:
+            output_path.unlink(missing_ok=True)
+            raise Exception(f"FFmpeg falhou no rascunho: {result.stderr[-500:]}")
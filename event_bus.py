@@ -0,0 +1,273 @@
+"""
+Barramento de eventos em processo (pub/sub) para progresso de jobs
+
+Publicadores (Job, rotas de geração) enviam eventos por job_id; assinantes
+(endpoints SSE) recebem os eventos de um job específico ou de todos os jobs.
+
+No modo PIPELINE_MODE=queue os jobs rodam em outros processos: com o log
+compartilhado ativo, cada evento também é anexado a um arquivo JSON lines e
+cada processo da API acompanha esse arquivo, republicando localmente os
+eventos vindos de outros processos.
+"""
+import os
+import json
+import time
+import queue
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from utils import get_logger
+
+logger = get_logger(__name__)
+
+# Tópico que recebe eventos de todos os jobs
+ALL_JOBS = '*'
+
+
+class Subscription:
+    """Assinatura de um tópico (fila limitada de eventos)"""
+
+    def __init__(self, bus: 'EventBus', topic: str, max_queue: int):
+        self.bus = bus
+        self.topic = topic
+        self.queue: queue.Queue = queue.Queue(maxsize=max_queue)
+
+    def get(self, timeout: float = None) -> Optional[Dict]:
+        """
+        Aguarda o próximo evento
+
+        Args:
+            timeout: Tempo máximo de espera em segundos
+
+        Returns:
+            Evento ou None se o timeout expirar
+        """
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        """Cancela a assinatura"""
+        self.bus.unsubscribe(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class SharedEventLog:
+    """Log de eventos em disco (um arquivo JSON lines por dia) entre processos"""
+
+    def __init__(self, folder: Path, retain_days: int = 2, poll_interval: float = 0.25):
+        """
+        Inicializa o log
+
+        Args:
+            folder: Pasta dos arquivos events-AAAAMMDD.jsonl
+            retain_days: Dias de arquivos mantidos por cleanup()
+            poll_interval: Intervalo de leitura do follow()
+        """
+        self.folder = Path(folder)
+        self.folder.mkdir(parents=True, exist_ok=True)
+        self.retain_days = retain_days
+        self.poll_interval = poll_interval
+
+    def _path(self, day: datetime = None) -> Path:
+        return self.folder / f"events-{(day or datetime.now()):%Y%m%d}.jsonl"
+
+    def append(self, event: Dict):
+        """Anexa um evento (uma única escrita com O_APPEND, atômica entre processos)"""
+        line = json.dumps({**event, 'origin': os.getpid()}, ensure_ascii=False) + '\n'
+        fd = os.open(self._path(), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, line.encode('utf-8'))
+        finally:
+            os.close(fd)
+
+    def follow(self, callback: Callable[[Dict], None]) -> threading.Thread:
+        """
+        Acompanha o log em uma thread e entrega eventos de outros processos
+
+        Args:
+            callback: Função chamada com cada evento (sem o campo 'origin')
+
+        Returns:
+            Thread (daemon) iniciada
+        """
+        def run():
+            path = self._path()
+            offset = path.stat().st_size if path.exists() else 0
+            buffer = b''
+
+            while True:
+                try:
+                    if path.exists():
+                        with open(path, 'rb') as f:
+                            f.seek(offset)
+                            chunk = f.read()
+                        offset += len(chunk)
+                        buffer += chunk
+
+                        *lines, buffer = buffer.split(b'\n')
+                        for line in lines:
+                            if line.strip():
+                                self._dispatch(line, callback)
+
+                    # Virada do dia: o arquivo antigo já foi lido até o fim
+                    today = self._path()
+                    if today != path:
+                        path, offset, buffer = today, 0, b''
+                except Exception as e:
+                    logger.error(f"Erro ao ler log de eventos: {e}")
+
+                time.sleep(self.poll_interval)
+
+        thread = threading.Thread(target=run, name='event-log-follower', daemon=True)
+        thread.start()
+        return thread
+
+    @staticmethod
+    def _dispatch(line: bytes, callback: Callable[[Dict], None]):
+        try:
+            event = json.loads(line)
+        except ValueError:
+            return
+        if event.pop('origin', None) == os.getpid():
+            return
+        callback(event)
+
+    def cleanup(self):
+        """Remove arquivos mais antigos que retain_days"""
+        keep = {self._path(datetime.now() - timedelta(days=d)).name for d in range(self.retain_days)}
+        for path in self.folder.glob('events-*.jsonl'):
+            if path.name not in keep:
+                path.unlink(missing_ok=True)
+
+
+class EventBus:
+    """Pub/sub thread-safe com último evento retido por job"""
+
+    def __init__(self, max_queue: int = 1000, retain_jobs: int = 500):
+        """
+        Inicializa o barramento
+
+        Args:
+            max_queue: Tamanho máximo da fila de cada assinante
+            retain_jobs: Quantos jobs manter com o último evento em memória
+        """
+        self.max_queue = max_queue
+        self.retain_jobs = retain_jobs
+
+        self._lock = threading.Lock()
+        self._subscribers: Dict[str, List[Subscription]] = {}
+        self._last_events: Dict[str, Dict] = {}
+        self._shared_log: Optional[SharedEventLog] = None
+
+    def enable_shared_log(self, folder: Path, follow: bool = True):
+        """
+        Compartilha eventos com outros processos (API <-> pipeline workers)
+
+        Args:
+            folder: Pasta do log de eventos
+            follow: Se True, republica aqui os eventos publicados por outros processos
+        """
+        if self._shared_log is not None:
+            return
+        self._shared_log = SharedEventLog(folder)
+        if follow:
+            self._shared_log.follow(self._deliver)
+
+    def subscribe(self, topic: str = ALL_JOBS) -> Subscription:
+        """
+        Assina os eventos de um job (ou de todos, com ALL_JOBS)
+
+        Args:
+            topic: job_id ou ALL_JOBS
+
+        Returns:
+            Subscription - use como context manager ou chame close()
+        """
+        subscription = Subscription(self, topic, self.max_queue)
+
+        with self._lock:
+            self._subscribers.setdefault(topic, []).append(subscription)
+
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        """Remove uma assinatura"""
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.topic, [])
+            if subscription in subscribers:
+                subscribers.remove(subscription)
+            if not subscribers:
+                self._subscribers.pop(subscription.topic, None)
+
+    def publish(self, job_id: str, event_type: str, **data) -> Dict:
+        """
+        Publica um evento de um job
+
+        Args:
+            job_id: ID do job
+            event_type: Tipo do evento (progress, status, completed, failed...)
+            **data: Campos adicionais (message, percent, status...)
+
+        Returns:
+            Evento publicado
+        """
+        event = {
+            'job_id': job_id,
+            'type': event_type,
+            'timestamp': time.time(),
+            **data
+        }
+
+        self._deliver(event)
+
+        if self._shared_log is not None:
+            try:
+                self._shared_log.append(event)
+            except Exception as e:
+                logger.error(f"Erro ao gravar evento no log compartilhado: {e}")
+
+        return event
+
+    def _deliver(self, event: Dict):
+        """Retém e entrega um evento aos assinantes deste processo"""
+        job_id = event.get('job_id')
+
+        with self._lock:
+            self._last_events.pop(job_id, None)
+            self._last_events[job_id] = event
+
+            # Descarta jobs mais antigos (dict mantém ordem de inserção)
+            while len(self._last_events) > self.retain_jobs:
+                self._last_events.pop(next(iter(self._last_events)))
+
+            targets = list(self._subscribers.get(job_id, [])) + list(self._subscribers.get(ALL_JOBS, []))
+
+        for subscription in targets:
+            try:
+                subscription.queue.put_nowait(event)
+            except queue.Full:
+                # Cliente lento: descarta em vez de bloquear o pipeline
+                logger.debug(f"Fila do assinante cheia, evento descartado ({job_id})")
+
+    def last_event(self, job_id: str) -> Optional[Dict]:
+        """Retorna o último evento conhecido de um job"""
+        with self._lock:
+            return self._last_events.get(job_id)
+
+    def snapshot(self) -> List[Dict]:
+        """Retorna o último evento de cada job retido"""
+        with self._lock:
+            return list(self._last_events.values())
+
+
+# Instância global do barramento
+bus = EventBus()
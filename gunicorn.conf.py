@@ -0,0 +1,26 @@
+"""
+Configuração do Gunicorn (produção)
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Workers "gthread": cada processo atende várias requisições em threads, o que
+comporta conexões longas de SSE (/api/jobs/events) sem bloquear a API.
+"""
+import os
+import multiprocessing
+
+bind = f"{os.getenv('FLASK_HOST', '127.0.0.1')}:{os.getenv('FLASK_PORT', '5000')}"
+
+workers = int(os.getenv('WEB_WORKERS', min(multiprocessing.cpu_count() * 2 + 1, 8)))
+# Os workers dividem recursos por processo (ex: pool de miniaturas) por este número
+os.environ['WEB_WORKERS'] = str(workers)
+worker_class = 'gthread'
+threads = int(os.getenv('WEB_THREADS', 32))
+
+timeout = int(os.getenv('WEB_TIMEOUT', 120))
+graceful_timeout = 30
+keepalive = 5
+
+accesslog = '-'
+errorlog = '-'
+loglevel = os.getenv('LOG_LEVEL', 'info').lower()
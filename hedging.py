@@ -0,0 +1,82 @@
+"""
+Hedging de tarefas WaveSpeed lentas (stragglers)
+
+Uma tarefa que fica em "processing" muito além das demais segura o job
+inteiro. Quando uma tarefa passa do percentil configurado do tempo de
+render previsto para o seu áudio (render_model), uma tarefa duplicada é
+submetida e vale a primeira que terminar (ver WaveSpeedClient.process_video).
+
+O orçamento limita o custo extra: no máximo HEDGE_BUDGET duplicatas por
+tarefa submetida (ex: 0.1 = até 10% a mais de renders).
+"""
+import threading
+from typing import Optional
+
+from config import Config
+from render_model import RenderTimeModel, render_model
+from utils import get_logger
+
+logger = get_logger(__name__)
+
+
+class HedgePolicy:
+    """Limiar de demora e orçamento de duplicatas (thread-safe)"""
+
+    def __init__(
+        self,
+        percentile: float = None,
+        budget: float = None,
+        min_samples: int = None,
+        min_delay: float = None,
+        model: RenderTimeModel = None
+    ):
+        """
+        Inicializa a política
+
+        Args:
+            percentile: Percentil do tempo de render que dispara a duplicata
+            budget: Fração máxima de duplicatas sobre as tarefas submetidas
+            min_samples: Amostras necessárias antes de duplicar qualquer tarefa
+            min_delay: Espera mínima (s) antes de duplicar
+            model: Histórico de renders (padrão: o do processo)
+        """
+        self.percentile = Config.HEDGE_PERCENTILE if percentile is None else percentile
+        self.budget = Config.HEDGE_BUDGET if budget is None else budget
+        self.min_samples = Config.HEDGE_MIN_SAMPLES if min_samples is None else min_samples
+        self.min_delay = Config.HEDGE_MIN_DELAY if min_delay is None else min_delay
+        self.model = model or render_model
+
+        self._lock = threading.Lock()
+        self._submitted = 0
+        self._hedged = 0
+
+    def threshold(self, audio_seconds: Optional[float], resolution: Optional[str] = None) -> Optional[float]:
+        """
+        Registra uma tarefa submetida e retorna após quanto tempo duplicá-la
+
+        Args:
+            audio_seconds: Duração do áudio da tarefa (None se desconhecida)
+            resolution: Resolução do vídeo
+
+        Returns:
+            Segundos desde a submissão, ou None se ainda não há amostras suficientes
+        """
+        with self._lock:
+            self._submitted += 1
+
+        estimate = self.model.estimate(self.percentile, audio_seconds, resolution, self.min_samples)
+        if estimate is None:
+            return None
+        return max(self.min_delay, estimate)
+
+    def try_acquire(self) -> bool:
+        """Reserva uma duplicata no orçamento; False se ele estiver esgotado"""
+        with self._lock:
+            if self._hedged + 1 > self.budget * self._submitted:
+                return False
+            self._hedged += 1
+            return True
+
+
+# Instância compartilhada pelo processo (o orçamento vale para todos os jobs)
+hedge_policy = HedgePolicy()
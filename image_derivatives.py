@@ -0,0 +1,143 @@
+"""
+Derivados das imagens de avatar no tamanho da resolução de destino
+
+As imagens enviadas pelo usuário podem ter dezenas de MB e milhares de
+pixels, mas o WaveSpeed renderiza em 480p/720p/1080p. Cada imagem é
+convertida uma única vez por (conteúdo, resolução): orientação EXIF
+aplicada, metadados removidos, lado menor reduzido à altura da resolução e
+recomprimida em JPEG. O derivado fica em IMAGE_CACHE_FOLDER e entra em cada
+job por hardlink (cópia só se a pasta estiver em outro disco).
+
+Menos bytes enviados a cada clipe, uploads mais rápidos e a mesma imagem
+não ocupa espaço de novo em cada job.
+"""
+import os
+import shutil
+import threading
+from pathlib import Path
+from typing import Hashable, Union
+
+from PIL import Image, ImageOps
+
+from asset_store import asset_store, link_or_copy
+from cache import TTLCache
+from config import Config
+from utils import get_logger
+
+logger = get_logger(__name__)
+
+# Lado menor (px) do derivado para cada resolução do WaveSpeed
+RESOLUTION_SHORT_EDGE = {'480p': 480, '720p': 720, '1080p': 1080}
+
+
+class ImageDerivativeCache:
+    """Derivados de imagens por (hash do conteúdo, resolução), em disco e em memória"""
+
+    # Derivados nunca mudam (a chave é o hash do conteúdo)
+    CACHE_TTL = 24 * 3600
+
+    def __init__(self, cache_dir: Path = None, quality: int = None):
+        """
+        Inicializa o cache
+
+        Args:
+            cache_dir: Pasta dos derivados (padrão: config)
+            quality: Qualidade JPEG dos derivados (padrão: config)
+        """
+        self.cache_dir = Path(cache_dir or Config.IMAGE_CACHE_FOLDER)
+        self.quality = quality or Config.IMAGE_JPEG_QUALITY
+
+        # (hash, resolução) -> derivado; coalesce conversões simultâneas da mesma imagem
+        self._derivatives = TTLCache(ttl=self.CACHE_TTL, name='image-derivative')
+
+    def get(self, image_path: Union[str, Path], resolution: str = None) -> Path:
+        """
+        Derivado de uma imagem para a resolução, criado se ainda não existir
+
+        Args:
+            image_path: Imagem original
+            resolution: Resolução de destino (padrão: DEFAULT_RESOLUTION)
+
+        Returns:
+            Caminho do derivado em cache_dir (não alterar: é compartilhado)
+        """
+        path = Path(image_path).resolve()
+        resolution = resolution or Config.DEFAULT_RESOLUTION
+
+        # Imagens do asset_store já trazem o hash no nome; as demais são lidas uma vez
+        digest = asset_store.digest(path)
+
+        return self._derivatives.get((digest, resolution), lambda: self._load(path, digest, resolution))
+
+    def link(self, image_path: Union[str, Path], dest: Path, resolution: str = None) -> Path:
+        """
+        Coloca o derivado da imagem em dest (hardlink)
+
+        Args:
+            image_path: Imagem original
+            dest: Destino (ex: pasta de imagens do job); a extensão é trocada pela do derivado
+            resolution: Resolução de destino (padrão: DEFAULT_RESOLUTION)
+
+        Returns:
+            Caminho final em dest
+        """
+        derivative = self.get(image_path, resolution)
+        dest = Path(dest).with_suffix(derivative.suffix)
+        link_or_copy(derivative, dest)
+        return dest
+
+    def _load(self, source: Path, digest: str, resolution: Hashable) -> Path:
+        """Derivado em disco (de uma execução anterior) ou convertido agora"""
+        target = self.cache_dir / digest[:2] / f"{digest}_{resolution}.jpg"
+        if target.exists():
+            return target
+
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = target.with_name(f"{target.name}.{threading.get_ident()}.tmp")
+
+        try:
+            self._convert(source, tmp_path, RESOLUTION_SHORT_EDGE.get(resolution))
+            os.replace(tmp_path, target)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+
+        logger.info(
+            f"Derivado {resolution} de {source.name}: "
+            f"{source.stat().st_size / 1024:.0f} KB -> {target.stat().st_size / 1024:.0f} KB"
+        )
+        return target
+
+    def _convert(self, source: Path, output_path: Path, short_edge: int = None):
+        """Aplica a orientação EXIF, reduz (nunca amplia) e grava em JPEG sem metadados"""
+        with Image.open(source) as original:
+            # Orientação (0x0112) diferente de 1 ou qualquer metadado exige regravar
+            transformed = (
+                original.format != 'JPEG'
+                or original.getexif().get(0x0112, 1) != 1
+                or 'exif' in original.info
+            )
+            image = ImageOps.exif_transpose(original)
+
+            if short_edge and min(image.size) > short_edge:
+                scale = short_edge / min(image.size)
+                size = (max(1, round(image.width * scale)), max(1, round(image.height * scale)))
+                image = image.resize(size, Image.LANCZOS)
+                transformed = True
+
+            if image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info):
+                # JPEG não tem transparência: compõe sobre fundo branco
+                rgba = image.convert('RGBA')
+                image = Image.new('RGB', rgba.size, (255, 255, 255))
+                image.paste(rgba, mask=rgba.getchannel('A'))
+            elif image.mode != 'RGB':
+                image = image.convert('RGB')
+
+            image.save(output_path, 'JPEG', quality=self.quality, optimize=True)
+
+        if not transformed and output_path.stat().st_size >= source.stat().st_size:
+            # JPEG já pequeno e sem metadados: recomprimir só perderia qualidade
+            shutil.copyfile(source, output_path)
+
+
+# Instância compartilhada pelo processo
+image_derivatives = ImageDerivativeCache()
@@ -0,0 +1,252 @@
+"""
+Concatenação incremental: o vídeo final cresce conforme os clipes chegam
+
+Cada clipe é remuxado (-c copy) para MP4 fragmentado e seus fragmentos
+(moof + mdat) são anexados, em ordem, a um único arquivo fMP4. Os tempos de
+decodificação (tfdt) de cada fragmento são deslocados pela duração dos
+clipes anteriores, como o concat demuxer do FFmpeg faria. Ao terminar o
+último clipe resta apenas um remux rápido para o layout final.
+
+Clipes com parâmetros de stream diferentes do primeiro (codec, resolução,
+timescale) não podem ser anexados: a concatenação incremental desiste e o
+job usa a concatenação normal (VideoConcatenator.concatenate_videos).
+"""
+import io
+import os
+import struct
+import threading
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import BinaryIO, Dict, List, Optional, Tuple
+
+from config import Config
+from utils import get_logger
+from video_concatenator import MP4_MOVFLAGS
+from mp4_boxes import iter_boxes, read_tracks, movie_duration
+import metrics
+
+logger = get_logger(__name__)
+
+
+class IncrementalConcatenator:
+    """Anexa clipes em ordem a um MP4 fragmentado enquanto o job renderiza"""
+
+    def __init__(self, work_path: Path, clip_numbers: List[int]):
+        """
+        Inicializa o concatenador
+
+        Args:
+            work_path: Arquivo fMP4 que cresce a cada clipe (ex: job_dir/concat_stream.mp4)
+            clip_numbers: Números dos clipes na ordem final
+        """
+        self.work_path = Path(work_path)
+        self.clip_numbers = sorted(clip_numbers)
+
+        self._lock = threading.Lock()
+        self._ready: Dict[int, Optional[Path]] = {}
+        self._next = 0  # índice em clip_numbers do próximo clipe a anexar
+        self._failed: Optional[str] = None
+
+        # Estado do arquivo em crescimento
+        self._tracks: Optional[Dict[int, Tuple[int, bytes]]] = None
+        self._offset = 0.0  # duração acumulada (s) dos clipes já anexados
+        self._sequence = 0  # mfhd.sequence_number contínuo
+
+        self.work_path.unlink(missing_ok=True)
+
+        # Anexar é sequencial por natureza: uma thread basta
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='incremental-concat')
+
+    def add_clip(self, clip_number: int, video_path: Optional[Path]):
+        """
+        Informa que um clipe terminou (não bloqueia; qualquer ordem)
+
+        Args:
+            clip_number: Número do clipe
+            video_path: Caminho do clipe, ou None se ele falhou
+        """
+        with self._lock:
+            self._ready[clip_number] = Path(video_path) if video_path else None
+        self._executor.submit(self._advance)
+
+    def close(self):
+        """Aguarda os anexos pendentes"""
+        self._executor.shutdown(wait=True)
+
+    def discard(self):
+        """Desiste da concatenação incremental e apaga o arquivo parcial"""
+        with self._lock:
+            self._failed = self._failed or 'descartada'
+        self.close()
+        self.work_path.unlink(missing_ok=True)
+
+    def finish(self, output_path: Path) -> Optional[Path]:
+        """
+        Gera o vídeo final a partir do arquivo incremental
+
+        Args:
+            output_path: Path do vídeo final
+
+        Returns:
+            output_path, ou None se a concatenação incremental não pôde ser
+            concluída (use a concatenação normal)
+        """
+        self.close()
+
+        if self._failed or self._next < len(self.clip_numbers):
+            logger.warning(f"Concatenação incremental indisponível: {self._failed or 'clipes faltando'}")
+            self.work_path.unlink(missing_ok=True)
+            return None
+
+        if Config.MP4_LAYOUT == 'fragmented':
+            os.replace(self.work_path, output_path)
+            return output_path
+
+        # Só reorganiza o índice: todos os dados já estão no lugar
+        cmd = [
+            'ffmpeg',
+            '-i', str(self.work_path),
+            '-map', '0',
+            '-c', 'copy',
+            *MP4_MOVFLAGS.get(Config.MP4_LAYOUT, []),
+            '-y',
+            str(output_path)
+        ]
+
+        with metrics.track('concat', 'ffmpeg'):
+            result = subprocess.run(cmd, capture_output=True, text=True, timeout=300)
+
+        self.work_path.unlink(missing_ok=True)
+
+        if result.returncode != 0:
+            logger.warning(f"Remux final da concatenação incremental falhou: {result.stderr[-500:]}")
+            return None
+
+        return output_path
+
+    def _advance(self):
+        """Anexa todos os clipes disponíveis em sequência"""
+        while True:
+            with self._lock:
+                if self._failed or self._next >= len(self.clip_numbers):
+                    return
+                number = self.clip_numbers[self._next]
+                if number not in self._ready:
+                    return
+                video_path = self._ready[number]
+
+            if video_path is None:
+                # Um buraco no meio: o vídeo final não será gerado de qualquer forma
+                with self._lock:
+                    self._failed = f"clipe {number} falhou"
+                return
+
+            try:
+                self._append(number, video_path)
+            except Exception as e:
+                with self._lock:
+                    self._failed = f"clipe {number}: {e}"
+                logger.warning(f"Concatenação incremental interrompida no clipe {number}: {e}")
+                return
+
+            with self._lock:
+                self._next += 1
+
+    def _append(self, number: int, video_path: Path):
+        """Remuxa um clipe para fMP4 e anexa seus fragmentos ao arquivo final"""
+        fragment_path = self.work_path.with_name(f"{self.work_path.stem}.clip{number}.mp4")
+
+        cmd = [
+            'ffmpeg',
+            '-i', str(video_path),
+            '-map', '0:v:0?',
+            '-map', '0:a:0?',
+            '-c', 'copy',
+            '-movflags', '+frag_keyframe+empty_moov+default_base_moof',
+            '-f', 'mp4',
+            '-y',
+            str(fragment_path)
+        ]
+
+        with metrics.track('concat', 'ffmpeg'):
+            result = subprocess.run(cmd, capture_output=True, text=True, timeout=120)
+
+        try:
+            if result.returncode != 0:
+                raise Exception(f"FFmpeg falhou: {result.stderr[-500:]}")
+
+            duration = movie_duration(video_path)
+            first = self._tracks is None
+
+            with open(fragment_path, 'rb') as src, open(self.work_path, 'ab') as dst:
+                end = os.fstat(src.fileno()).st_size
+
+                for kind, start, size, header in list(iter_boxes(src, 0, end)):
+                    if kind in (b'ftyp', b'moov'):
+                        src.seek(start)
+                        data = src.read(size)
+                        if kind == b'moov':
+                            tracks = read_tracks(data)
+                            if self._tracks is None:
+                                self._tracks = tracks
+                            elif tracks != self._tracks:
+                                raise Exception("parâmetros de stream diferentes do primeiro clipe")
+                        if first:
+                            # Cabeçalho (ftyp + moov) só do primeiro clipe
+                            dst.write(data)
+                    elif kind == b'moof':
+                        src.seek(start)
+                        dst.write(self._shift_fragment(bytearray(src.read(size))))
+                    elif kind == b'mdat':
+                        src.seek(start)
+                        _copy_range(src, dst, size)
+                    # mfra (índice de acesso aleatório do clipe) não se aplica ao arquivo final
+
+            self._offset += duration
+            logger.info(f"Concatenação incremental: clipe {number} anexado ({self._offset:.1f}s)")
+
+        finally:
+            fragment_path.unlink(missing_ok=True)
+
+    def _shift_fragment(self, moof: bytearray) -> bytes:
+        """Renumera o fragmento e desloca seus tfdt pela duração já anexada"""
+        f = io.BytesIO(moof)
+        track_id = None
+
+        stack = [(8, len(moof))]
+        while stack:
+            box_start, box_end = stack.pop()
+            for kind, start, size, header in list(iter_boxes(f, box_start, box_end)):
+                body = start + header
+                if kind == b'mfhd':
+                    self._sequence += 1
+                    struct.pack_into('>I', moof, body + 4, self._sequence)
+                elif kind == b'traf':
+                    track_id = None
+                    stack.append((body, start + size))
+                elif kind == b'tfhd':
+                    track_id = struct.unpack_from('>I', moof, body + 4)[0]
+                elif kind == b'tfdt':
+                    timescale = self._tracks[track_id][0]
+                    shift = round(self._offset * timescale)
+                    if moof[body] == 1:
+                        value = struct.unpack_from('>Q', moof, body + 4)[0]
+                        struct.pack_into('>Q', moof, body + 4, value + shift)
+                    else:
+                        value = struct.unpack_from('>I', moof, body + 4)[0] + shift
+                        if value > 0xFFFFFFFF:
+                            raise Exception("tfdt de 32 bits estourou")
+                        struct.pack_into('>I', moof, body + 4, value)
+
+        return bytes(moof)
+
+
+def _copy_range(src: BinaryIO, dst: BinaryIO, length: int, chunk_size: int = 1024 * 1024):
+    """Copia length bytes da posição atual de src para dst"""
+    while length > 0:
+        chunk = src.read(min(chunk_size, length))
+        if not chunk:
+            raise Exception("Arquivo truncado durante a cópia")
+        dst.write(chunk)
+        length -= len(chunk)
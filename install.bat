@@ -90,6 +90,11 @@ if errorlevel 1 (
 echo ✅ Dependencias instaladas com sucesso
 echo.
 
+REM Player da previa ao vivo (hls.js) servido pelo proprio app
+python scripts\vendor_hls.py
+if errorlevel 1 echo ⚠️  Previa ao vivo so funcionara no Safari (rode depois: python scripts\vendor_hls.py)
+echo.
+
 REM Verifica se .env existe
 echo 🔑 Verificando configuracao...
 if not exist ".env" (
@@ -60,6 +60,11 @@ else
 fi
 echo ""
 
+# Player da prévia ao vivo (hls.js) servido pelo próprio app
+echo "🎞️  Obtendo hls.js..."
+python scripts/vendor_hls.py || echo "⚠️  Prévia ao vivo só funcionará no Safari (rode depois: python scripts/vendor_hls.py)"
+echo ""
+
 # Verifica se .env existe
 echo "🔑 Verificando configuração..."
 if [ ! -f ".env" ]; then
@@ -3,6 +3,7 @@ Gerenciador de Jobs - Orquestra todo o pipeline de geração de vídeos
 """
 import json
 import uuid
+import threading
 from pathlib import Path
 from datetime import datetime
 from typing import List, Dict, Callable, Optional
@@ -14,6 +15,13 @@ from text_processor import TextProcessor
 from audio_generator import AudioGenerator
 from video_generator import VideoGenerator
 from video_concatenator import VideoConcatenator
+from draft_renderer import DraftRenderer
+from live_preview import LivePreview, discard_preview
+from incremental_concat import IncrementalConcatenator
+from event_bus import bus
+from state_writer import StateWriter
+import metrics
+import tracing
 
 logger = get_logger(__name__)
 
@@ -22,6 +30,8 @@ class JobStatus(Enum):
     CREATED = "created"
     PROCESSING_TEXT = "processing_text"
     GENERATING_AUDIO = "generating_audio"
+    RENDERING_DRAFT = "rendering_draft"
+    DRAFT_READY = "draft_ready"
     GENERATING_VIDEO = "generating_video"
     CONCATENATING = "concatenating"
     COMPLETED = "completed"
@@ -49,6 +59,7 @@ class Job:
 
         self.status = JobStatus.CREATED
         self.created_at = datetime.now()
+        self.started_at = None  # início da execução atual (process_job); created_at é só histórico
         self.completed_at = None
         self.error = None
 
@@ -56,36 +67,92 @@ class Job:
         self.job_dir = Config.TEMP_FOLDER / f'job_{job_id}'
         self.job_dir.mkdir(parents=True, exist_ok=True)
 
+        # Estado persistido de forma coalescida (threads não bloqueiam em I/O)
+        self._lock = threading.Lock()
+        self._state_writer = StateWriter(self.job_dir / 'state.json')
+
         # Resultados de cada etapa
         self.formatted_texts = []
         self.audios = []
         self.videos = []
+        self.draft_video_path = None
         self.final_video_path = None
 
         # Progresso
         self.progress_message = "Job criado"
         self.progress_percent = 0
 
+        # Eventos de progresso (event_bus): campos extras e job "pai" (ex: lote)
+        self.event_context: Dict = {}
+        self.parent_job_id: Optional[str] = None
+
         logger.info(f"Job {job_id} criado")
 
-    def save_state(self):
-        """Salva estado atual do job em JSON"""
-        state_file = self.job_dir / 'state.json'
+    def publish_event(self, event_type: str, **data):
+        """
+        Publica um evento do job no barramento (e no job pai, se houver)
 
-        state = {
-            'job_id': self.job_id,
+        Args:
+            event_type: Tipo do evento (progress, status, completed, failed)
+            **data: Campos adicionais do evento
+        """
+        payload = {
             'status': self.status.value,
-            'created_at': self.created_at.isoformat(),
-            'completed_at': self.completed_at.isoformat() if self.completed_at else None,
-            'error': self.error,
-            'voice_name': self.voice_name,
-            'progress_message': self.progress_message,
-            'progress_percent': self.progress_percent,
-            'final_video_path': str(self.final_video_path) if self.final_video_path else None
+            'message': self.progress_message,
+            'percent': self.progress_percent,
+            **self.event_context,
+            **data
         }
 
-        with open(state_file, 'w') as f:
-            json.dump(state, f, indent=2)
+        bus.publish(self.job_id, event_type, **payload)
+
+        if self.parent_job_id:
+            bus.publish(self.parent_job_id, event_type, pipeline_job_id=self.job_id, **payload)
+
+    def set_status(self, status: JobStatus):
+        """
+        Muda a etapa do job, salva o estado e notifica os assinantes
+
+        Args:
+            status: Nova etapa
+        """
+        self.status = status
+        self.save_state()
+        self.publish_event('status')
+
+    def save_state(self, immediate: bool = False):
+        """
+        Salva estado atual do job em JSON
+
+        A gravação é agendada e coalescida com outras atualizações próximas;
+        use immediate=True para estados finais.
+
+        Args:
+            immediate: Se True, grava de forma síncrona
+        """
+        with self._lock:
+            state = {
+                'job_id': self.job_id,
+                'status': self.status.value,
+                'created_at': self.created_at.isoformat(),
+                'started_at': self.started_at.isoformat() if self.started_at else None,
+                'completed_at': self.completed_at.isoformat() if self.completed_at else None,
+                'error': self.error,
+                'voice_name': self.voice_name,
+                # Entradas do job: permitem reprocessá-lo (retry) a partir da pasta
+                'input_text': self.input_text,
+                'model_id': self.model_id,
+                'image_paths': [str(p) for p in self.image_paths],
+                'progress_message': self.progress_message,
+                'progress_percent': self.progress_percent,
+                'draft_video_path': str(self.draft_video_path) if self.draft_video_path else None,
+                'final_video_path': str(self.final_video_path) if self.final_video_path else None
+            }
+
+        self._state_writer.submit(state)
+
+        if immediate:
+            self._state_writer.flush()
 
         logger.debug(f"Estado do job {self.job_id} salvo")
 
@@ -97,11 +164,25 @@ class Job:
             message: Mensagem de progresso
             percent: Percentual de conclusão (0-100)
         """
-        self.progress_message = message
-        self.progress_percent = min(100, max(0, percent))
+        with self._lock:
+            self.progress_message = message
+            self.progress_percent = min(100, max(0, percent))
         self.save_state()
+        self.publish_event('progress')
         logger.info(f"Job {self.job_id}: {message} ({percent}%)")
 
+    @property
+    def duration(self) -> Optional[float]:
+        """
+        Duração (s) da última execução
+
+        Não conta o tempo entre execuções (um retry ou a revisão de um
+        rascunho), que created_at incluiria.
+        """
+        if not self.started_at or not self.completed_at:
+            return None
+        return (self.completed_at - self.started_at).total_seconds()
+
     def mark_completed(self, final_video_path: Path):
         """
         Marca job como concluído
@@ -113,8 +194,31 @@ class Job:
         self.completed_at = datetime.now()
         self.final_video_path = final_video_path
         self.update_progress("Concluído com sucesso!", 100)
+        self.save_state(immediate=True)
+        self.publish_event('completed', video_path=str(final_video_path))
         logger.info(f"Job {self.job_id} concluído: {final_video_path}")
 
+    def mark_draft_ready(self, draft_video_path: Path):
+        """
+        Marca o rascunho como pronto: o job aguarda aprovação para os renders finais
+
+        Args:
+            draft_video_path: Caminho do rascunho
+        """
+        self.status = JobStatus.DRAFT_READY
+        self.draft_video_path = draft_video_path
+        self.update_progress("Rascunho pronto para aprovação", 50)
+        self.save_state(immediate=True)
+        self.publish_event(
+            'draft',
+            video_path=str(draft_video_path),
+            batches=[
+                {'batch_number': t['batch_number'], 'text': t['formatted_text']}
+                for t in self.formatted_texts
+            ]
+        )
+        logger.info(f"Job {self.job_id}: rascunho pronto em {draft_video_path}")
+
     def mark_failed(self, error: str):
         """
         Marca job como falho
@@ -125,23 +229,38 @@ class Job:
         self.status = JobStatus.FAILED
         self.completed_at = datetime.now()
         self.error = error
-        self.save_state()
+        self.save_state(immediate=True)
+        self.publish_event('failed', error=error)
         logger.error(f"Job {self.job_id} falhou: {error}")
 
 class JobManager:
     """Gerencia a execução de jobs de geração de vídeo"""
 
-    def __init__(self, audio_provider: str = None):
+    def __init__(
+        self,
+        audio_provider: str = None,
+        text_processor: TextProcessor = None,
+        audio_generator: AudioGenerator = None,
+        video_generator: VideoGenerator = None,
+        video_concatenator: VideoConcatenator = None,
+        draft_renderer: DraftRenderer = None
+    ):
         """
         Inicializa o gerenciador de jobs
 
         Args:
             audio_provider: 'elevenlabs' ou 'minimax' (padrão: config)
+            text_processor: TextProcessor já criado (opcional, ex: do client_registry)
+            audio_generator: AudioGenerator já criado (opcional)
+            video_generator: VideoGenerator já criado (opcional)
+            video_concatenator: VideoConcatenator já criado (opcional)
+            draft_renderer: DraftRenderer já criado (opcional)
         """
-        self.text_processor = TextProcessor()
-        self.audio_generator = AudioGenerator(provider=audio_provider)
-        self.video_generator = VideoGenerator()
-        self.video_concatenator = VideoConcatenator()
+        self.text_processor = text_processor or TextProcessor()
+        self.audio_generator = audio_generator or AudioGenerator(provider=audio_provider)
+        self.video_generator = video_generator or VideoGenerator()
+        self.video_concatenator = video_concatenator or VideoConcatenator()
+        self.draft_renderer = draft_renderer or DraftRenderer(video_concatenator=self.video_concatenator)
 
         logger.info(f"JobManager inicializado (audio: {self.audio_generator.provider})")
 
@@ -150,7 +269,8 @@ class JobManager:
         input_text: str,
         voice_name: str,
         image_paths: List[str],
-        model_id: str = "eleven_multilingual_v3"
+        model_id: str = "eleven_multilingual_v3",
+        job_id: str = None
     ) -> tuple[Optional[Job], Optional[str]]:
         """
         Cria um novo job após validações
@@ -160,6 +280,7 @@ class JobManager:
             voice_name: Nome da voz ElevenLabs
             image_paths: Lista de caminhos das imagens
             model_id: Modelo ElevenLabs a usar
+            job_id: ID já reservado (ex: job enfileirado pela API); padrão: novo UUID
 
         Returns:
             (Job, erro) - Job criado ou None com mensagem de erro
@@ -175,125 +296,296 @@ class JobManager:
             return None, error
 
         # Cria job
-        job_id = str(uuid.uuid4())
+        job_id = job_id or str(uuid.uuid4())
         job = Job(job_id, input_text, voice_name, image_paths, model_id)
 
         logger.info(f"Job criado: {job_id}")
 
         return job, None
 
-    def process_job(
-        self,
-        job: Job,
-        progress_callback: Optional[Callable[[str, int], None]] = None,
-        max_workers_video: int = 3
-    ) -> Path:
+    def load_job(self, job_id: str) -> Optional[Job]:
         """
-        Processa um job completo
+        Recria um job a partir do state.json da sua pasta (para retry)
+
+        Os artefatos já gerados (textos, áudios, clipes) continuam na pasta e
+        são reaproveitados por process_job(resume=True).
 
         Args:
-            job: Job a processar
-            progress_callback: Função de callback para progresso (message, percent)
-            max_workers_video: Número máximo de vídeos processados simultaneamente no WaveSpeed (padrão: 3)
+            job_id: ID do job
 
         Returns:
-            Path do vídeo final gerado
-
-        Raises:
-            Exception: Se o processamento falhar
+            Job (status CREATED) ou None se a pasta/estado não existir ou for
+            anterior ao registro das entradas
         """
-        try:
-            def update_progress(message: str, percent: int):
-                """Helper para atualizar progresso"""
-                job.update_progress(message, percent)
-                if progress_callback:
-                    progress_callback(message, percent)
+        state_file = Config.TEMP_FOLDER / f'job_{job_id}' / 'state.json'
+        if not state_file.exists():
+            return None
 
-            logger.info(f"Iniciando processamento do job {job.job_id}")
+        with open(state_file, 'r', encoding='utf-8') as f:
+            state = json.load(f)
 
-            # ETAPA 1: Processar texto com Gemini
-            update_progress("Formatando texto com IA...", 5)
-            job.status = JobStatus.PROCESSING_TEXT
-            job.save_state()
+        if not state.get('input_text'):
+            return None
 
-            job.formatted_texts = self.text_processor.process_text(
-                full_text=job.input_text,
-                output_dir=job.job_dir,
-                progress_callback=lambda msg: update_progress(msg, 10)
-            )
+        job = Job(
+            job_id,
+            state['input_text'],
+            state['voice_name'],
+            state.get('image_paths', []),
+            state.get('model_id', 'eleven_multilingual_v3')
+        )
 
-            update_progress(f"Texto formatado em {len(job.formatted_texts)} batches", 20)
+        # Mantém a data de criação original; a conclusão anterior não vale mais
+        if state.get('created_at'):
+            job.created_at = datetime.fromisoformat(state['created_at'])
+        job.completed_at = None
 
-            # ETAPA 2: Gerar áudios com ElevenLabs
-            update_progress("Gerando áudios com síntese de voz...", 25)
-            job.status = JobStatus.GENERATING_AUDIO
-            job.save_state()
+        logger.info(f"Job {job_id} recarregado para reprocessamento")
 
-            voice_id = self.audio_generator.get_voice_id_by_name(job.voice_name)
+        return job
 
-            job.audios = self.audio_generator.generate_audios_batch(
-                texts=job.formatted_texts,
-                voice_id=voice_id,
-                output_dir=job.job_dir,
-                model_id=job.model_id,
-                progress_callback=lambda msg: update_progress(msg, 30)
-            )
+    def apply_edits(self, job: Job, edits: Dict[int, str]):
+        """
+        Substitui o texto formatado de batches revisados no rascunho
 
-            # Verifica se todos os áudios foram gerados
-            failed_audios = [a for a in job.audios if a.get('error')]
-            if failed_audios:
-                raise Exception(f"{len(failed_audios)} áudios falharam ao gerar")
+        O áudio e o clipe desses batches são descartados e gerados de novo na
+        próxima execução (process_job com resume=True); os demais são
+        reaproveitados.
 
-            update_progress(f"{len(job.audios)} áudios gerados com sucesso", 50)
+        Args:
+            job: Job recarregado (load_job)
+            edits: Dict número do batch -> novo texto
 
-            # ETAPA 3: Gerar vídeos com lip-sync (WaveSpeed)
-            update_progress(f"Gerando {len(job.audios)} vídeos com lip-sync em paralelo...", 55)
-            job.status = JobStatus.GENERATING_VIDEO
-            job.save_state()
+        Raises:
+            ValueError: Se um batch não existir ou o texto estiver vazio
+        """
+        for batch_number, text in edits.items():
+            text_file = job.job_dir / 'formatted_text' / f'batch_{int(batch_number)}.txt'
+            if not text_file.exists():
+                raise ValueError(f"Batch {batch_number} não existe neste job")
+            if not text or not text.strip():
+                raise ValueError(f"Texto do batch {batch_number} está vazio")
+
+        for batch_number, text in edits.items():
+            batch_number = int(batch_number)
+            (job.job_dir / 'formatted_text' / f'batch_{batch_number}.txt').write_text(text.strip(), encoding='utf-8')
+            (job.job_dir / 'audios' / f'audio_{batch_number}.mp3').unlink(missing_ok=True)
+            (job.job_dir / 'videos' / f'video_{batch_number}.mp4').unlink(missing_ok=True)
+            logger.info(f"Job {job.job_id}: batch {batch_number} editado")
+
+    def _start_preview(self, job: Job) -> LivePreview:
+        """
+        Cria a prévia HLS do job (clipes entram na playlist conforme terminam)
 
-            job.videos = self.video_generator.generate_videos_batch(
-                audios=job.audios,
-                image_paths=job.image_paths,
-                output_dir=job.job_dir,
-                progress_callback=lambda msg: update_progress(msg, 60),
-                max_workers=max_workers_video
+        Cada vez que a playlist cresce é publicado um evento 'preview' com a URL.
+        """
+        preview_url = f"/api/jobs/{job.job_id}/preview/index.m3u8"
+
+        def on_update(clips_ready: int):
+            job.publish_event(
+                'preview',
+                preview_url=preview_url,
+                clips_ready=clips_ready,
+                total_clips=len(job.audios)
             )
 
-            # Verifica se todos os vídeos foram gerados
-            failed_videos = [v for v in job.videos if v.get('error')]
-            if failed_videos:
-                raise Exception(f"{len(failed_videos)} vídeos falharam ao gerar")
-
-            update_progress(f"{len(job.videos)} vídeos gerados com sucesso", 85)
-
-            # ETAPA 4: Concatenar vídeos
-            update_progress("Concatenando vídeos finais...", 90)
-            job.status = JobStatus.CONCATENATING
-            job.save_state()
-
-            video_paths = [v['video_path'] for v in job.videos if v.get('video_path')]
+        return LivePreview(
+            preview_dir=job.job_dir / 'preview',
+            clip_numbers=[audio['audio_number'] for audio in job.audios],
+            on_update=on_update
+        )
 
-            final_video_path = job.job_dir / 'final_output.mp4'
-
-            final_video_path = self.video_concatenator.concatenate_videos(
-                video_paths=video_paths,
-                output_path=final_video_path,
-                add_transitions=False,  # Pode ativar se desejar transições
-                progress_callback=lambda msg: update_progress(msg, 95)
-            )
-
-            # Marca job como concluído
-            job.mark_completed(final_video_path)
+    def process_job(
+        self,
+        job: Job,
+        progress_callback: Optional[Callable[[str, int], None]] = None,
+        max_workers_video: int = 3,
+        resume: bool = False,
+        draft: bool = False
+    ) -> Path:
+        """
+        Processa um job completo
 
-            logger.info(f"Job {job.job_id} processado com sucesso!")
+        Args:
+            job: Job a processar
+            progress_callback: Função de callback para progresso (message, percent)
+            max_workers_video: Número máximo de vídeos processados simultaneamente no WaveSpeed (padrão: 3)
+            resume: Se True, reaproveita textos, áudios e clipes já presentes na
+                    pasta do job e gera só o que falta (retry de um job falho)
+            draft: Se True, para depois dos áudios com um rascunho local
+                   (DraftRenderer) e o job fica aguardando aprovação; os renders
+                   finais são feitos por uma nova chamada com resume=True
 
-            return final_video_path
+        Returns:
+            Path do vídeo final gerado (ou do rascunho, se draft=True)
 
-        except Exception as e:
-            error_msg = f"Erro no processamento: {str(e)}"
-            job.mark_failed(error_msg)
-            logger.error(f"Job {job.job_id} falhou: {error_msg}")
-            raise
+        Raises:
+            Exception: Se o processamento falhar
+        """
+        job.started_at = datetime.now()
+        job.completed_at = None
+
+        with tracing.start_trace(job.job_id, job.job_dir / 'trace.json'):
+            try:
+                def update_progress(message: str, percent: int):
+                    """Helper para atualizar progresso"""
+                    job.update_progress(message, percent)
+                    if progress_callback:
+                        progress_callback(message, percent)
+
+                logger.info(f"Iniciando processamento do job {job.job_id}")
+
+                # ETAPA 1: Processar texto com Gemini
+                update_progress("Formatando texto com IA...", 5)
+                job.set_status(JobStatus.PROCESSING_TEXT)
+
+                with tracing.span('format', provider='gemini') as stage:
+                    job.formatted_texts = self.text_processor.process_text(
+                        full_text=job.input_text,
+                        output_dir=job.job_dir,
+                        progress_callback=lambda msg: update_progress(msg, 10),
+                        reuse_existing=resume
+                    )
+                    stage.set('batches', len(job.formatted_texts))
+
+                update_progress(f"Texto formatado em {len(job.formatted_texts)} batches", 20)
+
+                # ETAPA 2: Gerar áudios com ElevenLabs
+                update_progress("Gerando áudios com síntese de voz...", 25)
+                job.set_status(JobStatus.GENERATING_AUDIO)
+
+                with tracing.span('tts', provider=self.audio_generator.provider) as stage:
+                    voice_id = self.audio_generator.get_voice_id_by_name(job.voice_name)
+
+                    job.audios = self.audio_generator.generate_audios_batch(
+                        texts=job.formatted_texts,
+                        voice_id=voice_id,
+                        output_dir=job.job_dir,
+                        model_id=job.model_id,
+                        progress_callback=lambda msg: update_progress(msg, 30),
+                        reuse_existing=resume
+                    )
+                    stage.set('audios', len(job.audios))
+
+                # Verifica se todos os áudios foram gerados
+                failed_audios = [a for a in job.audios if a.get('error')]
+                if failed_audios:
+                    raise Exception(f"{len(failed_audios)} áudios falharam ao gerar")
+
+                update_progress(f"{len(job.audios)} áudios gerados com sucesso", 50)
+
+                if draft:
+                    # Rascunho local: nenhum render no WaveSpeed antes da aprovação
+                    job.set_status(JobStatus.RENDERING_DRAFT)
+
+                    with tracing.span('draft', provider='ffmpeg', clips=len(job.audios)):
+                        images = self.video_generator.assign_images(job.audios, job.image_paths, job.job_dir)
+                        draft_path = self.draft_renderer.render(
+                            audios=job.audios,
+                            images=images,
+                            output_dir=job.job_dir,
+                            progress_callback=lambda msg: update_progress(msg, 50)
+                        )
+
+                    job.mark_draft_ready(draft_path)
+                    metrics.JOBS_TOTAL.inc(result='draft')
+
+                    return draft_path
+
+                # ETAPA 3: Gerar vídeos com lip-sync (WaveSpeed)
+                update_progress(f"Gerando {len(job.audios)} vídeos com lip-sync em paralelo...", 55)
+                job.set_status(JobStatus.GENERATING_VIDEO)
+
+                # Clipes prontos alimentam a prévia e a concatenação incremental
+                # enquanto os demais ainda renderizam
+                clip_numbers = [audio['audio_number'] for audio in job.audios]
+                preview = self._start_preview(job) if Config.LIVE_PREVIEW else None
+                incremental = (
+                    IncrementalConcatenator(job.job_dir / 'concat_stream.mp4', clip_numbers)
+                    if Config.INCREMENTAL_CONCAT and not Config.VIDEO_TRANSITIONS else None
+                )
+                clip_consumers = [c for c in (preview, incremental) if c]
+
+                def on_video_ready(video: Dict):
+                    for consumer in clip_consumers:
+                        consumer.add_clip(video['video_number'], video.get('video_path'))
+
+                with tracing.span('video', provider='wavespeed', max_workers=max_workers_video) as stage:
+                    try:
+                        job.videos = self.video_generator.generate_videos_batch(
+                            audios=job.audios,
+                            image_paths=job.image_paths,
+                            output_dir=job.job_dir,
+                            progress_callback=lambda msg: update_progress(msg, 60),
+                            max_workers=max_workers_video,
+                            on_video_ready=on_video_ready if clip_consumers else None,
+                            reuse_existing=resume
+                        )
+                    except Exception:
+                        if incremental:
+                            incremental.discard()
+                        raise
+                    finally:
+                        for consumer in clip_consumers:
+                            consumer.close()
+                    stage.set('videos', len(job.videos))
+
+                # Verifica se todos os vídeos foram gerados
+                failed_videos = [v for v in job.videos if v.get('error')]
+                if failed_videos:
+                    # Sem todos os clipes o arquivo incremental não serve: não fica parcial no disco
+                    if incremental:
+                        incremental.discard()
+                    raise Exception(f"{len(failed_videos)} vídeos falharam ao gerar")
+
+                update_progress(f"{len(job.videos)} vídeos gerados com sucesso", 85)
+
+                # ETAPA 4: Concatenar vídeos
+                update_progress("Concatenando vídeos finais...", 90)
+                job.set_status(JobStatus.CONCATENATING)
+
+                video_paths = [v['video_path'] for v in job.videos if v.get('video_path')]
+
+                final_video_path = job.job_dir / 'final_output.mp4'
+
+                with tracing.span('concat', provider='ffmpeg', clips=len(video_paths)) as stage:
+                    # Os clipes já foram anexados durante a geração: resta só o remux final
+                    incremental_path = incremental.finish(final_video_path) if incremental else None
+                    stage.set('incremental', incremental_path is not None)
+
+                    if incremental_path is not None:
+                        final_video_path = incremental_path
+                    else:
+                        final_video_path = self.video_concatenator.concatenate_videos(
+                            video_paths=video_paths,
+                            output_path=final_video_path,
+                            add_transitions=Config.VIDEO_TRANSITIONS,
+                            transition_duration=Config.TRANSITION_DURATION,
+                            progress_callback=lambda msg: update_progress(msg, 95)
+                        )
+                    stage.set('bytes', final_video_path.stat().st_size)
+
+                # Marca job como concluído
+                job.mark_completed(final_video_path)
+                discard_preview(job.job_dir / 'preview')
+
+                metrics.JOBS_TOTAL.inc(result='completed')
+                metrics.JOB_DURATION.observe(job.duration, result='completed')
+
+                logger.info(f"Job {job.job_id} processado com sucesso!")
+
+                return final_video_path
+
+            except Exception as e:
+                error_msg = f"Erro no processamento: {str(e)}"
+                job.mark_failed(error_msg)
+                discard_preview(job.job_dir / 'preview')
+
+                metrics.JOBS_TOTAL.inc(result='failed')
+                metrics.JOB_DURATION.observe(job.duration, result='failed')
+
+                logger.error(f"Job {job.job_id} falhou: {error_msg}")
+                raise
 
     def get_job_estimate(self, input_text: str) -> Dict:
         """
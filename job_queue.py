@@ -0,0 +1,121 @@
+"""
+Fila de jobs em disco (spool) compartilhada entre a API e os pipeline workers
+
+Cada tarefa é um arquivo JSON em pending/. Um worker reivindica a tarefa
+movendo o arquivo para running/ com os.rename (atômico: só um processo
+consegue) e a remove ao terminar. Não depende de serviços externos.
+"""
+import os
+import time
+import uuid
+import json
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from config import Config
+from utils import get_logger, write_json_atomic
+
+logger = get_logger(__name__)
+
+
+class JobQueue:
+    """Fila FIFO de tarefas do pipeline baseada em diretórios"""
+
+    def __init__(self, queue_dir: Path = None):
+        """
+        Inicializa a fila
+
+        Args:
+            queue_dir: Pasta da fila (padrão: Config.QUEUE_FOLDER)
+        """
+        self.queue_dir = Path(queue_dir or Config.QUEUE_FOLDER)
+        self.pending_dir = self.queue_dir / 'pending'
+        self.running_dir = self.queue_dir / 'running'
+        self.pending_dir.mkdir(parents=True, exist_ok=True)
+        self.running_dir.mkdir(parents=True, exist_ok=True)
+
+    def enqueue(self, task: str, payload: Dict) -> str:
+        """
+        Adiciona uma tarefa à fila
+
+        Args:
+            task: Tipo da tarefa (ex: 'single_video', 'batch_videos')
+            payload: Dados da tarefa (serializáveis em JSON)
+
+        Returns:
+            ID da tarefa
+        """
+        task_id = uuid.uuid4().hex
+        # Prefixo com timestamp mantém a ordem de chegada na listagem
+        name = f"{time.time_ns():020d}_{task_id}.json"
+
+        write_json_atomic(self.pending_dir / name, {
+            'id': task_id,
+            'task': task,
+            'payload': payload,
+            'enqueued_at': time.time()
+        })
+
+        logger.info(f"Tarefa enfileirada: {task} ({task_id})")
+        return task_id
+
+    def claim(self) -> Optional[Dict]:
+        """
+        Reivindica a tarefa mais antiga da fila
+
+        Returns:
+            Tarefa (com o campo 'file') ou None se a fila estiver vazia
+        """
+        for name in sorted(os.listdir(self.pending_dir)):
+            if not name.endswith('.json'):
+                continue
+
+            # Em running/ o arquivo leva o pid do worker (para recuperar se ele morrer)
+            target = self.running_dir / f"{os.getpid()}__{name}"
+            try:
+                os.rename(self.pending_dir / name, target)
+            except FileNotFoundError:
+                # Outro worker chegou antes
+                continue
+
+            try:
+                with open(target, 'r', encoding='utf-8') as f:
+                    item = json.load(f)
+            except Exception as e:
+                logger.error(f"Tarefa inválida descartada ({name}): {e}")
+                target.unlink(missing_ok=True)
+                continue
+
+            item['file'] = target.name
+            return item
+
+        return None
+
+    def done(self, item: Dict):
+        """Remove uma tarefa concluída (com sucesso ou falha)"""
+        (self.running_dir / item['file']).unlink(missing_ok=True)
+
+    def recover(self, pid: int = None) -> List[Dict]:
+        """
+        Retira da fila tarefas que estavam em execução quando os workers pararam
+
+        Args:
+            pid: Apenas as tarefas do worker com este pid (padrão: todas)
+
+        Returns:
+            Tarefas interrompidas (para serem marcadas como falhas)
+        """
+        interrupted = []
+        pattern = f"{pid}__*.json" if pid else '*.json'
+        for path in sorted(self.running_dir.glob(pattern)):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    interrupted.append(json.load(f))
+            except Exception as e:
+                logger.error(f"Tarefa interrompida ilegível ({path.name}): {e}")
+            path.unlink(missing_ok=True)
+        return interrupted
+
+    def size(self) -> int:
+        """Número de tarefas aguardando"""
+        return sum(1 for name in os.listdir(self.pending_dir) if name.endswith('.json'))
@@ -0,0 +1,248 @@
+"""
+Prévia ao vivo (HLS) de um job enquanto os clipes ainda estão sendo renderizados
+
+Cada clipe baixado do WaveSpeed é segmentado em chunks .ts (remux -c copy,
+sem re-encoding) e entra em uma playlist HLS do tipo EVENT, sempre na ordem
+do roteiro: um clipe que termina antes do anterior aguarda até o anterior
+entrar. O navegador toca os primeiros minutos enquanto o restante renderiza.
+
+Arquivos em job_dir/preview/: index.m3u8 + clip001_000.ts, clip001_001.ts...
+A pasta é apagada quando o job termina (discard_preview): o vídeo final
+substitui a prévia e os segmentos dobrariam o espaço do job em temp/.
+"""
+import os
+import math
+import shutil
+import threading
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from config import Config
+from utils import get_logger
+
+logger = get_logger(__name__)
+
+PLAYLIST_NAME = 'index.m3u8'
+
+# Remoções agendadas por pasta (canceladas se o job for retomado antes)
+_discards: Dict[Path, threading.Timer] = {}
+_discards_lock = threading.Lock()
+
+
+def discard_preview(preview_dir: Path, delay: float = None):
+    """
+    Apaga a pasta da prévia de um job concluído ou falho
+
+    Args:
+        preview_dir: Pasta da playlist e dos segmentos
+        delay: Segundos até apagar (padrão: config), para o player terminar
+               as requisições em andamento ao trocar para o vídeo final
+    """
+    preview_dir = Path(preview_dir).resolve()
+    if not preview_dir.exists():
+        return
+
+    delay = Config.PREVIEW_RETAIN_SECONDS if delay is None else delay
+
+    def remove():
+        with _discards_lock:
+            if _discards.get(preview_dir) is not timer:
+                return  # Cancelada: a pasta voltou a ser usada
+            _discards.pop(preview_dir)
+        shutil.rmtree(preview_dir, ignore_errors=True)
+
+    timer = threading.Timer(max(delay, 0), remove)
+    timer.daemon = True
+    with _discards_lock:
+        previous = _discards.get(preview_dir)
+        if previous:
+            previous.cancel()
+        _discards[preview_dir] = timer
+
+    if delay <= 0:
+        remove()
+    else:
+        timer.start()
+
+
+def _cancel_discard(preview_dir: Path):
+    """Cancela a remoção agendada de uma pasta que será usada de novo (retry)"""
+    with _discards_lock:
+        timer = _discards.pop(Path(preview_dir).resolve(), None)
+    if timer:
+        timer.cancel()
+
+
+class LivePreview:
+    """Playlist HLS de eventos alimentada clipe a clipe"""
+
+    def __init__(
+        self,
+        preview_dir: Path,
+        clip_numbers: List[int],
+        on_update: Optional[Callable[[int], None]] = None,
+        segment_seconds: float = None
+    ):
+        """
+        Inicializa a prévia
+
+        Args:
+            preview_dir: Pasta da playlist e dos segmentos
+            clip_numbers: Números dos clipes na ordem de reprodução
+            on_update: Chamado com o número de clipes na playlist sempre que ela cresce
+            segment_seconds: Duração alvo de cada segmento (padrão: config)
+        """
+        self.preview_dir = Path(preview_dir)
+        _cancel_discard(self.preview_dir)
+        self.preview_dir.mkdir(parents=True, exist_ok=True)
+        self.clip_numbers = sorted(clip_numbers)
+        self.on_update = on_update
+        self.segment_seconds = segment_seconds or Config.PREVIEW_SEGMENT_SECONDS
+
+        self._lock = threading.Lock()
+        # Segmentos prontos por clipe: [(duração, arquivo)]; None = clipe sem prévia
+        self._ready: Dict[int, Optional[List[Tuple[float, str]]]] = {}
+        self._published = 0  # clipes (em ordem) já na playlist
+        self._closed = False
+
+        # Uma thread: o FFmpeg não compete com downloads e a ordem de gravação é simples
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='live-preview')
+
+        self._write_playlist([], ended=False)
+
+    def add_clip(self, clip_number: int, video_path: Optional[Path]):
+        """
+        Agenda a segmentação de um clipe concluído (não bloqueia)
+
+        Args:
+            clip_number: Número do clipe
+            video_path: Caminho do clipe, ou None se ele falhou (é pulado)
+        """
+        if self._closed:
+            return
+        self._executor.submit(self._segment_clip, clip_number, video_path)
+
+    def close(self):
+        """Aguarda segmentações pendentes e encerra a playlist (#EXT-X-ENDLIST)"""
+        if self._closed:
+            return
+        self._closed = True
+        self._executor.shutdown(wait=True)
+
+        with self._lock:
+            self._write_playlist(self._playlist_clips(), ended=True)
+
+    @property
+    def playlist_path(self) -> Path:
+        return self.preview_dir / PLAYLIST_NAME
+
+    def _segment_clip(self, clip_number: int, video_path: Optional[Path]):
+        segments = None
+
+        if video_path is not None:
+            try:
+                segments = self._run_segmenter(clip_number, Path(video_path))
+            except Exception as e:
+                # A prévia é opcional: o clipe só fica fora da playlist
+                logger.warning(f"Prévia: falha ao segmentar clipe {clip_number}: {e}")
+
+        with self._lock:
+            self._ready[clip_number] = segments
+            published = self._advance()
+
+        if published is not None and self.on_update:
+            try:
+                self.on_update(published)
+            except Exception as e:
+                logger.error(f"Erro no callback da prévia: {e}")
+
+    def _run_segmenter(self, clip_number: int, video_path: Path) -> List[Tuple[float, str]]:
+        """Segmenta um clipe com o muxer HLS do FFmpeg e retorna seus segmentos"""
+        prefix = f"clip{clip_number:03d}"
+        clip_playlist = self.preview_dir / f"{prefix}.m3u8"
+
+        cmd = [
+            'ffmpeg',
+            '-i', str(video_path),
+            '-map', '0:v:0?',
+            '-map', '0:a:0?',
+            '-c', 'copy',
+            '-f', 'hls',
+            '-hls_time', str(self.segment_seconds),
+            '-hls_playlist_type', 'vod',
+            '-hls_segment_filename', str(self.preview_dir / f"{prefix}_%03d.ts"),
+            '-y',
+            str(clip_playlist)
+        ]
+
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=120)
+        if result.returncode != 0:
+            raise Exception(f"FFmpeg falhou: {result.stderr[-500:]}")
+
+        segments = []
+        duration = None
+        with open(clip_playlist, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if line.startswith('#EXTINF:'):
+                    duration = float(line[len('#EXTINF:'):].split(',')[0])
+                elif line and not line.startswith('#') and duration is not None:
+                    segments.append((duration, line))
+                    duration = None
+
+        clip_playlist.unlink(missing_ok=True)
+
+        if not segments:
+            raise Exception("nenhum segmento gerado")
+
+        return segments
+
+    def _advance(self) -> Optional[int]:
+        """Publica os próximos clipes em ordem; retorna o total publicado se mudou"""
+        before = self._published
+        while self._published < len(self.clip_numbers) and self.clip_numbers[self._published] in self._ready:
+            self._published += 1
+
+        if self._published == before:
+            return None
+
+        clips = self._playlist_clips()
+        self._write_playlist(clips, ended=False)
+        return len(clips)
+
+    def _playlist_clips(self) -> List[List[Tuple[float, str]]]:
+        clips = []
+        for number in self.clip_numbers[:self._published]:
+            if self._ready.get(number):
+                clips.append(self._ready[number])
+        return clips
+
+    def _write_playlist(self, clips: List[List[Tuple[float, str]]], ended: bool):
+        """Reescreve a playlist de forma atômica (o player pode lê-la a qualquer momento)"""
+        longest = max((d for clip in clips for d, _ in clip), default=self.segment_seconds)
+
+        lines = [
+            '#EXTM3U',
+            '#EXT-X-VERSION:3',
+            '#EXT-X-PLAYLIST-TYPE:EVENT',
+            f'#EXT-X-TARGETDURATION:{math.ceil(max(longest, self.segment_seconds))}',
+            '#EXT-X-MEDIA-SEQUENCE:0',
+        ]
+
+        for index, clip in enumerate(clips):
+            # Cada clipe recomeça os timestamps em zero
+            if index > 0:
+                lines.append('#EXT-X-DISCONTINUITY')
+            for duration, name in clip:
+                lines.append(f'#EXTINF:{duration:.6f},')
+                lines.append(name)
+
+        if ended:
+            lines.append('#EXT-X-ENDLIST')
+
+        temp_path = self.playlist_path.with_suffix('.m3u8.tmp')
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(lines) + '\n')
+        os.replace(temp_path, self.playlist_path)
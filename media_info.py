@@ -0,0 +1,260 @@
+"""
+Metadados de vídeos (duração, resolução, bitrate) com cache
+
+Cada arquivo é analisado uma única vez por versão: a chave do cache é
+(caminho, tamanho, mtime), então um arquivo regravado é analisado de novo e
+um arquivo inalterado nunca. Vários arquivos podem ser analisados em
+paralelo com probe_many().
+
+Usa o ffprobe quando instalado; sem ele, lê os boxes do MP4 direto
+(mp4_boxes) e o cabeçalho dos MP3, o que cobre os arquivos do pipeline.
+"""
+import os
+import json
+import shutil
+import threading
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from fractions import Fraction
+from pathlib import Path
+from typing import Dict, Hashable, Iterable, Union
+
+from cache import TTLCache
+from utils import get_logger
+from mp4_boxes import movie_duration, file_tracks, track_params, video_frame_rate
+
+logger = get_logger(__name__)
+
+# Nome do codec no sample entry do MP4 -> nome usado pelo ffprobe
+_MP4_CODECS = {'avc1': 'h264', 'avc3': 'h264', 'hvc1': 'hevc', 'hev1': 'hevc',
+               'av01': 'av1', 'vp09': 'vp9', 'mp4a': 'aac', 'Opus': 'opus'}
+
+
+def parse_rational(value: Union[str, int, float, None]) -> float:
+    """
+    Converte um racional do ffprobe ("30000/1001", "25", "0/0") em float
+
+    Returns:
+        Valor numérico (0.0 se vazio, inválido ou com denominador zero)
+    """
+    if value is None:
+        return 0.0
+    try:
+        if isinstance(value, str) and '/' in value:
+            numerator, denominator = value.split('/', 1)
+            if float(denominator) == 0:
+                return 0.0
+            return float(Fraction(int(numerator), int(denominator)))
+        return float(value)
+    except (ValueError, ZeroDivisionError):
+        return 0.0
+
+
+class MediaInfoService:
+    """Análise de vídeos com cache por (caminho, tamanho, mtime)"""
+
+    # Entradas só mudam com o arquivo (a chave inclui tamanho e mtime)
+    CACHE_TTL = 24 * 3600
+
+    def __init__(self, max_workers: int = 8):
+        """
+        Inicializa o serviço
+
+        Args:
+            max_workers: Análises simultâneas em probe_many()
+        """
+        self.max_workers = max_workers
+        self.ffprobe = shutil.which('ffprobe')
+
+        self._cache = TTLCache(ttl=self.CACHE_TTL, name='media-info')
+        self._lock = threading.Lock()
+        self._keys: Dict[str, Hashable] = {}  # caminho -> chave atual no cache
+
+    def probe(self, video_path: Union[str, Path]) -> Dict:
+        """
+        Metadados de um vídeo
+
+        Args:
+            video_path: Caminho do vídeo
+
+        Returns:
+            Dict com duration, size, bitrate, format, width, height, fps, codec
+            e, se houver áudio, audio_codec, sample_rate e channels
+            (vazio se o arquivo não existe ou não pôde ser analisado)
+        """
+        path = Path(video_path).resolve()
+        try:
+            stat = path.stat()
+        except OSError:
+            return {}
+
+        key = (str(path), stat.st_size, stat.st_mtime_ns)
+        with self._lock:
+            previous = self._keys.get(key[0])
+            self._keys[key[0]] = key
+        if previous is not None and previous != key:
+            # Arquivo regravado: a versão antiga não será mais consultada
+            self._cache.invalidate(previous)
+
+        try:
+            return dict(self._cache.get(key, lambda: self._analyze(path, stat.st_size)))
+        except Exception as e:
+            logger.error(f"Erro ao obter info do vídeo {path.name}: {e}")
+            return {}
+
+    def probe_many(self, video_paths: Iterable[Union[str, Path]]) -> Dict[str, Dict]:
+        """
+        Metadados de vários vídeos, analisados em paralelo
+
+        Returns:
+            Dict caminho (como recebido) -> metadados
+        """
+        paths = [str(path) for path in video_paths]
+        if not paths:
+            return {}
+
+        with ThreadPoolExecutor(max_workers=min(len(paths), self.max_workers)) as executor:
+            return dict(zip(paths, executor.map(self.probe, paths)))
+
+    def _analyze(self, path: Path, size: int) -> Dict:
+        if self.ffprobe:
+            info = self._ffprobe(path)
+        elif path.suffix.lower() == '.mp3':
+            info = self._read_mp3(path)
+        else:
+            info = self._read_boxes(path)
+        info['size'] = size
+        info['bitrate'] = info.get('bitrate') or (
+            int(size * 8 / info['duration']) if info.get('duration') else 0
+        )
+        return info
+
+    def _ffprobe(self, path: Path) -> Dict:
+        cmd = [
+            self.ffprobe,
+            '-v', 'quiet',
+            '-print_format', 'json',
+            '-show_format',
+            '-show_streams',
+            str(path)
+        ]
+
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
+        if result.returncode != 0:
+            raise Exception(f"ffprobe falhou: {result.stderr}")
+
+        data = json.loads(result.stdout)
+        container = data.get('format', {})
+
+        info = {
+            'duration': parse_rational(container.get('duration')),
+            'bitrate': int(parse_rational(container.get('bit_rate'))),
+            'format': container.get('format_name', 'unknown'),
+        }
+
+        for stream in data.get('streams', []):
+            if stream.get('codec_type') == 'video' and 'width' not in info:
+                info.update({
+                    'width': stream.get('width', 0),
+                    'height': stream.get('height', 0),
+                    'fps': parse_rational(stream.get('avg_frame_rate')) or parse_rational(stream.get('r_frame_rate')),
+                    'codec': stream.get('codec_name', 'unknown')
+                })
+            elif stream.get('codec_type') == 'audio' and 'audio_codec' not in info:
+                info.update({
+                    'audio_codec': stream.get('codec_name', 'unknown'),
+                    'sample_rate': int(parse_rational(stream.get('sample_rate'))),
+                    'channels': stream.get('channels', 0)
+                })
+
+        return info
+
+    def _read_boxes(self, path: Path) -> Dict:
+        info = {
+            'duration': movie_duration(path),
+            'format': 'mov,mp4,m4a,3gp,3g2,mj2',
+        }
+
+        for track in file_tracks(path).values():
+            params = track_params(*track)
+            codec = _MP4_CODECS.get(params['codec'], params['codec'])
+            if 'width' in params and 'width' not in info:
+                rate = video_frame_rate(path)
+                info.update({
+                    'width': params['width'],
+                    'height': params['height'],
+                    'fps': float(rate) if rate else 0.0,
+                    'codec': codec
+                })
+            elif 'sample_rate' in params and 'audio_codec' not in info:
+                info.update({
+                    'audio_codec': codec,
+                    'sample_rate': params['sample_rate'],
+                    'channels': params['channels']
+                })
+
+        return info
+
+    def _read_mp3(self, path: Path) -> Dict:
+        """Duração de um MP3 pelo cabeçalho Xing/Info ou pelo bitrate do primeiro frame"""
+        with open(path, 'rb') as f:
+            data = f.read(64 * 1024)
+            size = os.fstat(f.fileno()).st_size
+
+        # Pula a tag ID3v2 (tamanho em 4 bytes de 7 bits)
+        start = 0
+        if data[:3] == b'ID3' and len(data) >= 10:
+            start = 10 + ((data[6] << 21) | (data[7] << 14) | (data[8] << 7) | data[9])
+            with open(path, 'rb') as f:
+                f.seek(start)
+                data = f.read(64 * 1024)
+            size -= start
+
+        position = next((i for i in range(len(data) - 4) if data[i] == 0xFF and data[i + 1] & 0xE0 == 0xE0), None)
+        if position is None:
+            raise ValueError("frame MP3 não encontrado")
+
+        header = int.from_bytes(data[position:position + 4], 'big')
+        version = (header >> 19) & 3            # 3 = MPEG1, 2 = MPEG2, 0 = MPEG2.5
+        bitrate_index = (header >> 12) & 0xF
+        rate_index = (header >> 10) & 3
+        channels = 1 if (header >> 6) & 3 == 3 else 2
+
+        sample_rate = _MP3_SAMPLE_RATES[version][rate_index] if version != 1 and rate_index < 3 else 0
+        bitrate = (_MP3_BITRATES_V1 if version == 3 else _MP3_BITRATES_V2)[bitrate_index] * 1000
+        samples_per_frame = 1152 if version == 3 else 576
+
+        duration = 0.0
+        for tag in (b'Xing', b'Info'):
+            index = data.find(tag, position, position + 200)
+            if index >= 0 and data[index + 7] & 1 and sample_rate:
+                frames = int.from_bytes(data[index + 8:index + 12], 'big')
+                duration = frames * samples_per_frame / sample_rate
+                bitrate = int((size - position) * 8 / duration) if duration else bitrate  # média (VBR)
+                break
+        if not duration and bitrate:
+            duration = (size - position) * 8 / bitrate
+
+        return {
+            'duration': duration,
+            'format': 'mp3',
+            'bitrate': bitrate,
+            'audio_codec': 'mp3',
+            'sample_rate': sample_rate,
+            'channels': channels
+        }
+
+
+# Tabelas do cabeçalho de frame MP3 (Layer III)
+_MP3_SAMPLE_RATES = {3: (44100, 48000, 32000), 2: (22050, 24000, 16000), 0: (11025, 12000, 8000)}
+_MP3_BITRATES_V1 = (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 0)
+_MP3_BITRATES_V2 = (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160, 0)
+
+
+def video_summary(info: Dict) -> Dict:
+    """Campos de metadados gravados nos registros de jobs e projetos"""
+    return {key: info[key] for key in ('duration', 'width', 'height', 'bitrate', 'fps', 'size') if key in info}
+
+
+# Instância compartilhada pelo processo
+media_info = MediaInfoService()
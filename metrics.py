@@ -0,0 +1,458 @@
+"""
+Métricas no estilo Prometheus (histogramas, contadores e gauges)
+
+Implementação mínima em memória, sem dependências externas, exportada em
+formato de texto (exposition format 0.0.4) pelo endpoint /metrics.
+
+Com vários processos (gunicorn + pipeline workers no modo queue) cada um
+grava periodicamente um snapshot das suas métricas em METRICS_FOLDER/<pid>.json
+(enable_shared) e o /metrics, servido por qualquer processo, soma os
+snapshots de todos, como o modo multiprocess do cliente oficial do Prometheus.
+Gauges de processos que pararam de gravar são ignorados.
+"""
+import os
+import json
+import time
+import atexit
+import logging
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+# utils importa este módulo: aqui só logging direto (mesmo que utils.get_logger)
+logger = logging.getLogger(__name__)
+
+# Buckets padrão (segundos) cobrindo de chamadas rápidas a renders longos
+DEFAULT_BUCKETS = (
+    0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+    60.0, 120.0, 300.0, 600.0, 900.0, 1800.0
+)
+
+
+def _escape(value: str) -> str:
+    """Escapa valor de label"""
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(labels: Tuple[Tuple[str, str], ...], extra: Dict[str, str] = None) -> str:
+    """Formata labels como {a="1",b="2"}"""
+    items = list(labels) + list((extra or {}).items())
+    if not items:
+        return ''
+    return '{' + ','.join(f'{k}="{_escape(v)}"' for k, v in items) + '}'
+
+
+def _format_value(value: float) -> str:
+    """Formata número (inteiros sem casas decimais)"""
+    if value == float('inf'):
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    """Base das métricas com labels"""
+
+    metric_type = 'untyped'
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[Tuple[str, str], ...]:
+        """Normaliza os labels na ordem declarada"""
+        return tuple((name, str(labels.get(name, ''))) for name in self.labelnames)
+
+    def render(self) -> List[str]:
+        """Linhas de texto da métrica"""
+        raise NotImplementedError
+
+    def spec(self) -> Dict:
+        """Definição da métrica (para recriá-la a partir de um snapshot)"""
+        return {'type': self.metric_type, 'help': self.documentation, 'labelnames': list(self.labelnames)}
+
+    def empty(self) -> '_Metric':
+        """Nova métrica com a mesma definição e sem valores"""
+        return type(self)(self.name, self.documentation, self.labelnames)
+
+    def samples(self) -> List:
+        """Valores serializáveis em JSON"""
+        with self._lock:
+            return [[list(map(list, k)), v] for k, v in self._values.items()]
+
+    def merge(self, samples: List):
+        """Soma valores de um snapshot aos desta métrica"""
+        with self._lock:
+            for key, value in samples:
+                key = tuple(map(tuple, key))
+                self._values[key] = self._values.get(key, 0.0) + value
+
+
+class Counter(_Metric):
+    """Contador monotônico"""
+
+    metric_type = 'counter'
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[tuple, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels):
+        """Incrementa o contador"""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def render(self) -> List[str]:
+        with self._lock:
+            return [f"{self.name}{_format_labels(k)} {_format_value(v)}" for k, v in self._values.items()]
+
+
+class Gauge(_Metric):
+    """Valor que sobe e desce (ex: requisições em andamento)"""
+
+    metric_type = 'gauge'
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[tuple, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels):
+        """Incrementa o gauge"""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels):
+        """Decrementa o gauge"""
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels):
+        """Define o valor do gauge"""
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def render(self) -> List[str]:
+        with self._lock:
+            return [f"{self.name}{_format_labels(k)} {_format_value(v)}" for k, v in self._values.items()]
+
+
+class Histogram(_Metric):
+    """Histograma cumulativo com buckets fixos"""
+
+    metric_type = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[tuple, list] = {}  # key -> [counts por bucket, soma, total]
+
+    def spec(self) -> Dict:
+        return dict(super().spec(), buckets=list(self.buckets))
+
+    def empty(self) -> 'Histogram':
+        return Histogram(self.name, self.documentation, self.labelnames, self.buckets)
+
+    def samples(self) -> List:
+        with self._lock:
+            return [[list(map(list, k)), list(counts), total_sum, count]
+                    for k, (counts, total_sum, count) in self._series.items()]
+
+    def merge(self, samples: List):
+        with self._lock:
+            for key, counts, total_sum, count in samples:
+                if len(counts) != len(self.buckets):
+                    continue  # Buckets mudaram entre versões: snapshot incompatível
+                key = tuple(map(tuple, key))
+                series = self._series.setdefault(key, [[0] * len(self.buckets), 0.0, 0])
+                series[0] = [a + b for a, b in zip(series[0], counts)]
+                series[1] += total_sum
+                series[2] += count
+
+    def observe(self, value: float, **labels):
+        """Registra uma observação"""
+        key = self._key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = [[0] * len(self.buckets), 0.0, 0]
+                self._series[key] = series
+
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+                    break
+            series[1] += value
+            series[2] += 1
+
+    def render(self) -> List[str]:
+        lines = []
+        with self._lock:
+            for key, (counts, total_sum, count) in self._series.items():
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets, counts):
+                    cumulative += bucket_count
+                    lines.append(
+                        f"{self.name}_bucket{_format_labels(key, {'le': _format_value(bound)})} {cumulative}"
+                    )
+                lines.append(f"{self.name}_bucket{_format_labels(key, {'le': '+Inf'})} {count}")
+                lines.append(f"{self.name}_sum{_format_labels(key)} {_format_value(total_sum)}")
+                lines.append(f"{self.name}_count{_format_labels(key)} {count}")
+        return lines
+
+
+_TYPES = {cls.metric_type: cls for cls in (Counter, Gauge, Histogram)}
+
+
+def _from_spec(name: str, spec: Dict) -> _Metric:
+    """Recria uma métrica (vazia) a partir da definição de um snapshot"""
+    cls = _TYPES[spec['type']]
+    if cls is Histogram:
+        return Histogram(name, spec['help'], tuple(spec['labelnames']), tuple(spec['buckets']))
+    return cls(name, spec['help'], tuple(spec['labelnames']))
+
+
+class MetricsRegistry:
+    """Registro das métricas do processo"""
+
+    # Snapshots sem atualização há mais que isto (em intervalos) são de
+    # processos encerrados: seus gauges (ex: em andamento) não contam mais
+    STALE_INTERVALS = 3
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+        self._shared_folder: Optional[Path] = None
+        self._interval = 5.0
+
+    def register(self, metric: _Metric) -> _Metric:
+        """Registra (ou retorna a já registrada com o mesmo nome)"""
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def enable_shared(self, folder: Path, interval: float = 5.0):
+        """
+        Publica as métricas deste processo para os demais (modo multiprocesso)
+
+        Args:
+            folder: Pasta dos snapshots (compartilhada por API e pipeline workers)
+            interval: Segundos entre snapshots
+        """
+        if self._shared_folder is not None:
+            return
+        self._shared_folder = Path(folder)
+        self._interval = interval
+        self._shared_folder.mkdir(parents=True, exist_ok=True)
+
+        def writer():
+            while True:
+                time.sleep(interval)
+                self.write_snapshot()
+
+        threading.Thread(target=writer, name='metrics-snapshot', daemon=True).start()
+        atexit.register(self.write_snapshot)
+
+    def snapshot(self) -> Dict:
+        """Métricas deste processo em formato serializável"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return {
+            'pid': os.getpid(),
+            'updated_at': time.time(),
+            'metrics': {m.name: dict(m.spec(), samples=m.samples()) for m in metrics}
+        }
+
+    def write_snapshot(self):
+        """Grava o snapshot deste processo em <pasta>/<pid>.json"""
+        if self._shared_folder is None:
+            return
+        from utils import write_json_atomic
+        try:
+            write_json_atomic(self._shared_folder / f"{os.getpid()}.json", self.snapshot(), indent=None)
+        except Exception as e:
+            logger.warning(f"Falha ao gravar snapshot de métricas: {e}")
+
+    def cleanup_shared(self) -> int:
+        """
+        Remove snapshots de processos encerrados (ex: ao iniciar um deploy)
+
+        Os contadores desses processos deixam de ser somados, o que o
+        Prometheus trata como um reinício de contador.
+
+        Returns:
+            Número de snapshots removidos
+        """
+        if self._shared_folder is None:
+            return 0
+        removed = 0
+        limit = time.time() - self._interval * self.STALE_INTERVALS
+        for path in self._shared_folder.glob('*.json'):
+            try:
+                if path.stat().st_mtime < limit:
+                    path.unlink()
+                    removed += 1
+            except FileNotFoundError:
+                continue
+        return removed
+
+    def _collect(self) -> List[_Metric]:
+        """Métricas a exportar: as deste processo ou a soma de todos os snapshots"""
+        with self._lock:
+            local = list(self._metrics.values())
+
+        if self._shared_folder is None:
+            return local
+
+        merged: Dict[str, _Metric] = {}
+        for metric in local:
+            merged[metric.name] = metric.empty()
+            merged[metric.name].merge(metric.samples())
+
+        # Os dados deste processo vêm da memória (mais novos que o próprio arquivo)
+        own_file = f"{os.getpid()}.json"
+        live_after = time.time() - self._interval * self.STALE_INTERVALS
+
+        for path in sorted(self._shared_folder.glob('*.json')):
+            if path.name == own_file:
+                continue
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    snapshot = json.load(f)
+            except (OSError, ValueError):
+                continue  # Processo encerrado no meio da gravação ou arquivo removido
+
+            live = snapshot.get('updated_at', 0) >= live_after
+            for name, spec in snapshot.get('metrics', {}).items():
+                try:
+                    metric = merged.get(name)
+                    if metric is None:
+                        metric = merged[name] = _from_spec(name, spec)
+                    if metric.metric_type != spec['type'] or (metric.metric_type == 'gauge' and not live):
+                        continue
+                    metric.merge(spec['samples'])
+                except (KeyError, TypeError, ValueError) as e:
+                    logger.warning(f"Snapshot de métricas inválido ({path.name}, {name}): {e}")
+
+        return list(merged.values())
+
+    def render(self) -> str:
+        """Exporta todas as métricas no formato de texto do Prometheus"""
+        lines = []
+        for metric in self._collect():
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.metric_type}")
+            lines.extend(metric.render())
+
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = MetricsRegistry()
+
+# Content-Type do formato de texto
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# ============================================================================
+# MÉTRICAS DO PIPELINE
+# ============================================================================
+
+STAGE_DURATION = REGISTRY.register(Histogram(
+    'lipsync_stage_duration_seconds',
+    'Latência de cada etapa/chamada externa do pipeline',
+    ('stage', 'provider')
+))
+
+STAGE_ERRORS = REGISTRY.register(Counter(
+    'lipsync_stage_errors_total',
+    'Erros por etapa/chamada externa do pipeline',
+    ('stage', 'provider')
+))
+
+STAGE_IN_FLIGHT = REGISTRY.register(Gauge(
+    'lipsync_stage_in_flight',
+    'Chamadas em andamento por etapa',
+    ('stage', 'provider')
+))
+
+RETRIES = REGISTRY.register(Counter(
+    'lipsync_retries_total',
+    'Novas tentativas feitas por retry/backoff',
+    ('operation',)
+))
+
+HEDGES = REGISTRY.register(Counter(
+    'lipsync_render_hedges_total',
+    'Tarefas WaveSpeed duplicadas por demora (submitted, won = a duplicata terminou antes, lost)',
+    ('outcome',)
+))
+
+BYTES_TRANSFERRED = REGISTRY.register(Counter(
+    'lipsync_bytes_total',
+    'Bytes transferidos (upload/download) por etapa',
+    ('stage', 'direction')
+))
+
+JOBS_TOTAL = REGISTRY.register(Counter(
+    'lipsync_jobs_total',
+    'Jobs finalizados por resultado',
+    ('result',)
+))
+
+JOB_DURATION = REGISTRY.register(Histogram(
+    'lipsync_job_duration_seconds',
+    'Duração total dos jobs (ponta a ponta)',
+    ('result',)
+))
+
+
+@contextmanager
+def track(stage: str, provider: str = ''):
+    """
+    Mede uma etapa: latência, em andamento e erros
+
+    Uso:
+        with metrics.track('tts', 'elevenlabs'):
+            ...
+
+    Args:
+        stage: Nome da etapa (format, tts, upload, submit, render, download, concat)
+        provider: Provedor/serviço envolvido
+    """
+    STAGE_IN_FLIGHT.inc(stage=stage, provider=provider)
+    start = time.perf_counter()
+    try:
+        yield
+    except BaseException:
+        STAGE_ERRORS.inc(stage=stage, provider=provider)
+        raise
+    finally:
+        STAGE_DURATION.observe(time.perf_counter() - start, stage=stage, provider=provider)
+        STAGE_IN_FLIGHT.dec(stage=stage, provider=provider)
+
+
+def add_bytes(stage: str, direction: str, amount: int):
+    """
+    Contabiliza bytes transferidos
+
+    Args:
+        stage: Etapa (upload, download, tts...)
+        direction: 'in' (recebidos) ou 'out' (enviados)
+        amount: Quantidade de bytes
+    """
+    if amount:
+        BYTES_TRANSFERRED.inc(amount, stage=stage, direction=direction)
+
+
+def enable_shared(folder: Path = None, interval: float = None):
+    """Ativa os snapshots compartilhados entre processos (padrão: config)"""
+    from config import Config
+    REGISTRY.enable_shared(folder or Config.METRICS_FOLDER, interval or Config.METRICS_SNAPSHOT_INTERVAL)
+
+
+def render() -> str:
+    """Exporta as métricas (de todos os processos, no modo compartilhado) em texto"""
+    return REGISTRY.render()
@@ -0,0 +1,352 @@
+"""
+Leitura leve de MP4 (ISO BMFF) sem subprocessos
+
+Percorre apenas os boxes necessários (moov/trak/stbl, moof/traf) para obter
+duração, parâmetros de codec e keyframes. Usado pela concatenação
+incremental e pelas transições com re-encode parcial.
+"""
+import io
+import os
+import struct
+from collections import Counter
+from fractions import Fraction
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+# Containers percorridos para achar mvhd/tkhd/mdhd/stsd e tfhd/tfdt
+_CONTAINERS = {b'moov', b'trak', b'mdia', b'minf', b'stbl', b'moof', b'traf'}
+
+
+def iter_boxes(f: BinaryIO, start: int, end: int) -> Iterator[Tuple[bytes, int, int, int]]:
+    """Percorre os boxes entre start e end: (tipo, início, tamanho, tamanho do cabeçalho)"""
+    position = start
+    while position + 8 <= end:
+        f.seek(position)
+        size, kind = struct.unpack('>I4s', f.read(8))
+        header = 8
+        if size == 1:
+            size = struct.unpack('>Q', f.read(8))[0]
+            header = 16
+        elif size == 0:
+            size = end - position
+        if size < header:
+            raise ValueError(f"Box inválido ({kind!r}) na posição {position}")
+
+        yield kind, position, size, header
+        position += size
+
+
+def _esds_config(esds: bytes) -> bytes:
+    """AudioSpecificConfig (descritor 0x05) de um esds, sem taxas de bits"""
+    position = 4  # version/flags
+    while position < len(esds):
+        tag = esds[position]
+        position += 1
+        length = 0
+        for _ in range(4):
+            byte = esds[position]
+            position += 1
+            length = (length << 7) | (byte & 0x7F)
+            if not byte & 0x80:
+                break
+
+        if tag == 0x03:
+            # ES_Descriptor: ES_ID + flags (+ campos opcionais) e descritores filhos
+            flags = esds[position + 2]
+            position += 3
+            if flags & 0x80:
+                position += 2
+            if flags & 0x40:
+                position += 1 + esds[position]
+            if flags & 0x20:
+                position += 2
+        elif tag == 0x04:
+            # DecoderConfigDescriptor: pula objectType, streamType, buffer e bitrates
+            position += 13
+        elif tag == 0x05:
+            return esds[position:position + length]
+        else:
+            position += length
+
+    return b''
+
+
+def sample_signature(stsd: bytes) -> bytes:
+    """
+    Assinatura do sample entry de um stsd: o que precisa ser igual para os
+    fragmentos de um clipe tocarem com o moov de outro
+
+    Ignora campos que variam por clipe sem afetar a decodificação (btrt e
+    taxas de bits do esds).
+    """
+    entry = stsd[8:]  # version/flags + entry_count
+    entry_size, kind = struct.unpack('>I4s', entry[:8])
+    entry = entry[:entry_size]
+
+    if kind in (b'mp4a', b'ac-3', b'ec-3', b'Opus', b'fLaC'):
+        fixed = 36  # AudioSampleEntry (versão 0)
+    else:
+        fixed = 86  # VisualSampleEntry
+
+    signature = [kind, entry[16:fixed]]
+    f = io.BytesIO(entry)
+    for child, start, size, header in iter_boxes(f, fixed, len(entry)):
+        body = entry[start + header:start + size]
+        if child == b'btrt':
+            continue
+        if child == b'esds':
+            body = _esds_config(body)
+        signature.append(child + body)
+
+    return b''.join(signature)
+
+
+def read_tracks(data: bytes) -> Dict[int, Tuple[int, bytes]]:
+    """Extrai de um moov: track_id -> (timescale, assinatura do sample entry)"""
+    f = io.BytesIO(data)
+    tracks = {}
+
+    for kind, start, size, header in iter_boxes(f, 0, len(data)):
+        if kind != b'moov':
+            continue
+        for trak, t_start, t_size, t_header in iter_boxes(f, start + header, start + size):
+            if trak != b'trak':
+                continue
+            track_id = timescale = stsd = None
+            stack = [(t_start + t_header, t_start + t_size)]
+            while stack:
+                box_start, box_end = stack.pop()
+                for child, c_start, c_size, c_header in list(iter_boxes(f, box_start, box_end)):
+                    f.seek(c_start + c_header)
+                    if child == b'tkhd':
+                        version = f.read(1)[0]
+                        f.seek(3 + (16 if version == 1 else 8), os.SEEK_CUR)
+                        track_id = struct.unpack('>I', f.read(4))[0]
+                    elif child == b'mdhd':
+                        version = f.read(1)[0]
+                        f.seek(3 + (16 if version == 1 else 8), os.SEEK_CUR)
+                        timescale = struct.unpack('>I', f.read(4))[0]
+                    elif child == b'stsd':
+                        stsd = sample_signature(f.read(c_size - c_header))
+                    elif child in _CONTAINERS:
+                        stack.append((c_start + c_header, c_start + c_size))
+            tracks[track_id] = (timescale, stsd)
+
+    return tracks
+
+
+def movie_duration(video_path: Path) -> float:
+    """Duração do MP4 (mvhd do moov) em segundos"""
+    with open(video_path, 'rb') as f:
+        end = os.fstat(f.fileno()).st_size
+        for kind, start, size, header in iter_boxes(f, 0, end):
+            if kind != b'moov':
+                continue
+            for child, c_start, c_size, c_header in iter_boxes(f, start + header, start + size):
+                if child == b'mvhd':
+                    f.seek(c_start + c_header)
+                    version = f.read(1)[0]
+                    f.seek(3 + (16 if version == 1 else 8), os.SEEK_CUR)
+                    timescale = struct.unpack('>I', f.read(4))[0]
+                    duration = struct.unpack('>Q' if version == 1 else '>I', f.read(8 if version == 1 else 4))[0]
+                    return duration / timescale if timescale else 0.0
+    raise ValueError(f"moov/mvhd não encontrado em {video_path.name}")
+
+
+def _find_box(f: BinaryIO, start: int, end: int, path: List[bytes]) -> Tuple[int, int]:
+    """Localiza um box pelo caminho (ex: [b'mdia', b'minf', b'stbl']); retorna (início do corpo, fim)"""
+    for kind, box_start, size, header in iter_boxes(f, start, end):
+        if kind == path[0]:
+            if len(path) == 1:
+                return box_start + header, box_start + size
+            return _find_box(f, box_start + header, box_start + size, path[1:])
+    raise ValueError(f"Box {path[0]!r} não encontrado")
+
+
+def _read_moov(f: BinaryIO) -> Tuple[int, int]:
+    end = os.fstat(f.fileno()).st_size
+    return _find_box(f, 0, end, [b'moov'])
+
+
+def file_tracks(video_path: Path) -> Dict[int, Tuple[int, bytes]]:
+    """read_tracks() do moov de um arquivo"""
+    with open(video_path, 'rb') as f:
+        start, end = _read_moov(f)
+        f.seek(start - 8)
+        size = end - start + 8
+        return read_tracks(f.read(size))
+
+
+def video_keyframes(video_path: Path) -> List[float]:
+    """Instantes (s, tempo de apresentação) dos keyframes da trilha de vídeo"""
+    return [time for time, keyframe in video_frames(video_path) if keyframe]
+
+
+def video_frames(video_path: Path) -> List[Tuple[float, bool]]:
+    """
+    Frames da trilha de vídeo em ordem de apresentação: (instante em s, é keyframe)
+
+    Usa stts/ctts/stss e a edit list do trak, sem decodificar nada.
+    """
+    with open(video_path, 'rb') as f:
+        moov_start, moov_end = _read_moov(f)
+
+        movie_timescale = None
+        for kind, start, size, header in iter_boxes(f, moov_start, moov_end):
+            if kind == b'mvhd':
+                f.seek(start + header)
+                version = f.read(1)[0]
+                f.seek(3 + (16 if version == 1 else 8), os.SEEK_CUR)
+                movie_timescale = struct.unpack('>I', f.read(4))[0]
+
+        for kind, start, size, header in list(iter_boxes(f, moov_start, moov_end)):
+            if kind != b'trak':
+                continue
+            trak_start, trak_end = start + header, start + size
+
+            hdlr_start, _ = _find_box(f, trak_start, trak_end, [b'mdia', b'hdlr'])
+            f.seek(hdlr_start + 8)
+            if f.read(4) != b'vide':
+                continue
+
+            mdhd_start, _ = _find_box(f, trak_start, trak_end, [b'mdia', b'mdhd'])
+            f.seek(mdhd_start)
+            version = f.read(1)[0]
+            f.seek(3 + (16 if version == 1 else 8), os.SEEK_CUR)
+            timescale = struct.unpack('>I', f.read(4))[0]
+
+            stbl_start, stbl_end = _find_box(f, trak_start, trak_end, [b'mdia', b'minf', b'stbl'])
+            tables = {}
+            for child, c_start, c_size, c_header in iter_boxes(f, stbl_start, stbl_end):
+                if child in (b'stts', b'ctts', b'stss'):
+                    f.seek(c_start + c_header)
+                    tables[child] = f.read(c_size - c_header)
+
+            # Tempo de decodificação de cada amostra
+            dts = []
+            current = 0
+            stts = tables.get(b'stts', b'\0' * 8)
+            for i in range(struct.unpack_from('>I', stts, 4)[0]):
+                count, delta = struct.unpack_from('>II', stts, 8 + i * 8)
+                for _ in range(count):
+                    dts.append(current)
+                    current += delta
+
+            # Deslocamento de composição (B-frames)
+            cts = [0] * len(dts)
+            if b'ctts' in tables:
+                ctts = tables[b'ctts']
+                signed = ctts[0] == 1
+                index = 0
+                for i in range(struct.unpack_from('>I', ctts, 4)[0]):
+                    count, offset = struct.unpack_from('>Ii' if signed else '>II', ctts, 8 + i * 8)
+                    for _ in range(count):
+                        if index < len(cts):
+                            cts[index] = offset
+                        index += 1
+
+            if b'stss' in tables:
+                stss = tables[b'stss']
+                sync = {struct.unpack_from('>I', stss, 8 + i * 4)[0] - 1
+                        for i in range(struct.unpack_from('>I', stss, 4)[0])}
+            else:
+                sync = set(range(len(dts)))
+
+            # Edit list: início da mídia e atraso inicial (edições vazias)
+            media_time = 0
+            delay = 0.0
+            try:
+                elst_start, _ = _find_box(f, trak_start, trak_end, [b'edts', b'elst'])
+                f.seek(elst_start)
+                version = f.read(1)[0]
+                f.seek(3, os.SEEK_CUR)
+                for _ in range(struct.unpack('>I', f.read(4))[0]):
+                    if version == 1:
+                        segment, media = struct.unpack('>Qq', f.read(16))
+                    else:
+                        segment, media = struct.unpack('>Ii', f.read(8))
+                    f.seek(4, os.SEEK_CUR)  # media_rate
+                    if media == -1:
+                        delay += segment / (movie_timescale or timescale)
+                    else:
+                        media_time = media
+                        break
+            except ValueError:
+                pass
+
+            return sorted(
+                (max(0.0, (dts[i] + cts[i] - media_time) / timescale + delay), i in sync)
+                for i in range(len(dts))
+            )
+
+    raise ValueError(f"Trilha de vídeo não encontrada em {Path(video_path).name}")
+
+
+def video_frame_rate(video_path: Path) -> Optional[Fraction]:
+    """Frame rate a partir do intervalo mais comum entre frames (ex: 30000/1001)"""
+    times = [time for time, _ in video_frames(video_path)]
+    intervals = Counter(round(b - a, 6) for a, b in zip(times, times[1:]) if b > a)
+    if not intervals:
+        return None
+    return Fraction(1 / intervals.most_common(1)[0][0]).limit_denominator(1001)
+
+
+def avc_profile(video_path: Path) -> Optional[int]:
+    """profile_idc do H.264 (avcC) da trilha de vídeo, ou None se não for H.264"""
+    for timescale, signature in file_tracks(video_path).values():
+        index = signature.find(b'avcC')
+        if index >= 0:
+            # avcC: configurationVersion, AVCProfileIndication...
+            return signature[index + 5]
+    return None
+
+
+def track_params(timescale: int, signature: bytes) -> Dict:
+    """
+    Parâmetros legíveis de uma trilha a partir de (timescale, assinatura)
+
+    Returns:
+        Dict com codec e timescale, mais width/height (vídeo) ou
+        channels/sample_rate (áudio)
+    """
+    codec = signature[:4].decode('latin-1')
+    params = {'codec': codec, 'timescale': timescale}
+
+    if codec in ('mp4a', 'ac-3', 'ec-3', 'Opus', 'fLaC'):
+        # AudioSampleEntry a partir do byte 16: reserved(8) channelcount samplesize
+        # pre_defined reserved samplerate(16.16)
+        params['channels'], = struct.unpack_from('>H', signature, 4 + 8)
+        params['sample_rate'] = struct.unpack_from('>I', signature, 4 + 16)[0] >> 16
+    else:
+        # VisualSampleEntry a partir do byte 16: pre_defined/reserved(16) width height
+        params['width'], params['height'] = struct.unpack_from('>HH', signature, 4 + 16)
+
+    return params
+
+
+def verify_mp4(video_path: Path):
+    """
+    Verificação rápida de integridade de um MP4 baixado
+
+    Os boxes de topo precisam cobrir o arquivo exatamente (um download
+    truncado corta o último box) e moov/mdat precisam existir, com duração
+    maior que zero.
+
+    Raises:
+        ValueError: Se o arquivo estiver truncado ou não for um MP4 válido
+    """
+    with open(video_path, 'rb') as f:
+        end = os.fstat(f.fileno()).st_size
+        kinds = set()
+        position = 0
+        for kind, start, size, header in iter_boxes(f, 0, end):
+            kinds.add(kind)
+            position = start + size
+
+    if position != end:
+        raise ValueError(f"MP4 truncado ({end} de {position} bytes)")
+    for required in (b'moov', b'mdat'):
+        if required not in kinds:
+            raise ValueError(f"MP4 sem {required.decode()}")
+    if movie_duration(video_path) <= 0:
+        raise ValueError("MP4 com duração zero")
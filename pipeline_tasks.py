@@ -0,0 +1,350 @@
+"""
+Tarefas do pipeline executadas a partir da API
+
+As mesmas funções rodam na thread da requisição (PIPELINE_MODE=inline) ou
+em um processo de pipeline_worker.py (PIPELINE_MODE=queue). Recebem apenas
+dados serializáveis em JSON e registram o resultado no banco (database.db),
+que é o estado compartilhado entre os processos.
+"""
+from typing import Dict, Optional
+
+from client_registry import registry
+from database import db
+from event_bus import bus
+from media_info import media_info, video_summary
+from utils import get_logger, validate_text, validate_images
+
+logger = get_logger(__name__)
+
+
+def validate_single(payload: Dict) -> Optional[str]:
+    """
+    Valida um vídeo único antes de registrá-lo (mesmas regras de JobManager.create_job)
+
+    Returns:
+        Mensagem de erro ou None
+    """
+    valid, error = validate_text(payload.get('text', ''))
+    if not valid:
+        return error
+
+    valid, error = validate_images(payload.get('image_paths', []))
+    if not valid:
+        return error
+
+    return None
+
+
+def run_single_video(payload: Dict) -> Dict:
+    """
+    Gera um vídeo único já registrado no banco
+
+    Args:
+        payload: job_id, text, provider, voice_name, model_id, image_paths,
+                 max_workers, draft e client_ref (opcionais)
+
+    Returns:
+        Resultado (success, video_path, job_id, duration); com draft=True o
+        job para no rascunho (success, draft, video_path, job_id, batches)
+
+    Raises:
+        Exception: Se o processamento falhar (o job é marcado como falho)
+    """
+    job_id = payload['job_id']
+    job_mgr = registry.get_job_manager(payload.get('provider', 'elevenlabs'))
+
+    job, error = job_mgr.create_job(
+        input_text=payload['text'],
+        voice_name=payload['voice_name'],
+        image_paths=payload['image_paths'],
+        model_id=payload.get('model_id', 'eleven_multilingual_v2'),
+        job_id=job_id
+    )
+
+    if error:
+        db.update_job(job_id, {'status': 'failed', 'error': error})
+        bus.publish(job_id, 'failed', status='failed', error=error, client_ref=payload.get('client_ref'))
+        raise ValueError(error)
+
+    return _process_single(job_mgr, job, payload, draft=bool(payload.get('draft')))
+
+
+def run_retry_video(payload: Dict) -> Dict:
+    """
+    Reprocessa um vídeo único que falhou, gerando só os itens que faltam
+
+    Textos, áudios e clipes já presentes na pasta do job são reaproveitados:
+    uma falha pontual no WaveSpeed custa um clipe, não o job inteiro.
+
+    Args:
+        payload: job_id, provider, max_workers e client_ref (opcional)
+
+    Returns:
+        Resultado (success, video_path, job_id, duration)
+
+    Raises:
+        Exception: Se o processamento falhar (o job volta a ser marcado como falho)
+    """
+    job_id = payload['job_id']
+    job_mgr = registry.get_job_manager(payload.get('provider', 'elevenlabs'))
+
+    job = job_mgr.load_job(job_id)
+    if job is None:
+        error = 'Artefatos do job não encontrados para reprocessamento'
+        db.update_job(job_id, {'status': 'failed', 'error': error})
+        bus.publish(job_id, 'failed', status='failed', error=error, client_ref=payload.get('client_ref'))
+        raise ValueError(error)
+
+    return _process_single(job_mgr, job, payload, resume=True)
+
+
+def run_review_draft(payload: Dict) -> Dict:
+    """
+    Continua um vídeo único parado no rascunho (aprovado ou revisado)
+
+    Os batches editados têm o texto substituído e só eles ganham áudio novo;
+    os demais textos e áudios são reaproveitados.
+
+    Args:
+        payload: job_id, provider, max_workers, edits ({batch: texto}),
+                 draft (True = gera novo rascunho; False = renders finais)
+                 e client_ref (opcional)
+
+    Returns:
+        Resultado de _process_single (rascunho ou vídeo final)
+
+    Raises:
+        Exception: Se o processamento falhar (o job é marcado como falho)
+    """
+    job_id = payload['job_id']
+    job_mgr = registry.get_job_manager(payload.get('provider', 'elevenlabs'))
+
+    job = job_mgr.load_job(job_id)
+    if job is None:
+        error = 'Artefatos do job não encontrados'
+        db.update_job(job_id, {'status': 'failed', 'error': error})
+        bus.publish(job_id, 'failed', status='failed', error=error, client_ref=payload.get('client_ref'))
+        raise ValueError(error)
+
+    try:
+        job_mgr.apply_edits(job, payload.get('edits') or {})
+    except ValueError:
+        # Edição inválida não perde o rascunho: o job continua aguardando aprovação
+        db.update_job(job_id, {'status': 'draft_ready'})
+        raise
+
+    return _process_single(job_mgr, job, payload, resume=True, draft=bool(payload.get('draft')))
+
+
+def _process_single(job_mgr, job, payload: Dict, resume: bool = False, draft: bool = False) -> Dict:
+    """Processa um job de vídeo único e registra o resultado no banco"""
+    job_id = payload['job_id']
+
+    if payload.get('client_ref'):
+        job.event_context = {'client_ref': payload['client_ref']}
+
+    try:
+        final_video = job_mgr.process_job(
+            job=job,
+            max_workers_video=payload.get('max_workers', 3),
+            resume=resume,
+            draft=draft
+        )
+    except Exception as e:
+        db.update_job(job_id, {'status': 'failed', 'error': str(e)})
+        raise
+
+    if draft:
+        # Textos formatados vão no registro: a revisão edita batches pelo número
+        batches = [{'batch_number': t['batch_number'], 'text': t['formatted_text']} for t in job.formatted_texts]
+        db.update_job(job_id, {'status': 'draft_ready', 'draft_path': str(final_video), 'batches': batches})
+        return {
+            'success': True,
+            'draft': True,
+            'video_path': str(final_video),
+            'job_id': job_id,
+            'batches': batches
+        }
+
+    duration = job.duration
+    # Metadados do vídeo final gravados no registro: o histórico não precisa analisá-lo de novo
+    video_info = video_summary(media_info.probe(final_video))
+
+    db.update_job(job_id, {
+        'status': 'completed',
+        'video_path': str(final_video),
+        'duration': duration,
+        'video_info': video_info
+    })
+
+    return {
+        'success': True,
+        'video_path': str(final_video),
+        'job_id': job_id,
+        'duration': duration,
+        'video_info': video_info
+    }
+
+
+def run_batch_videos(payload: Dict) -> Dict:
+    """
+    Gera os vídeos de um lote já registrado no banco (um roteiro por vez)
+
+    Args:
+        payload: job_id (do lote), scripts, provider, model_id, image_paths,
+                 max_workers, voice_selections, batch_image_mode e batch_images
+
+    Returns:
+        Resultado (success, results, videos_count, total_scripts)
+    """
+    batch_job_id = payload['job_id']
+    scripts = payload['scripts']
+    image_paths = payload['image_paths']
+    voice_selections = payload.get('voice_selections', [])
+    batch_image_mode = payload.get('batch_image_mode', 'fixed')
+    batch_images = payload.get('batch_images', {})  # {scriptId_batchNumber: image_path}
+
+    job_mgr = registry.get_job_manager(payload.get('provider', 'elevenlabs'))
+
+    results = []
+    videos_gerados = []
+
+    for idx, script_data in enumerate(scripts):
+        try:
+            script_text = script_data.get('text', '')
+            script_id = script_data.get('id')
+            voice_name = voice_selections[idx] if idx < len(voice_selections) else voice_selections[0]
+
+            # Determine image paths for this script based on mode
+            if batch_image_mode == 'individual':
+                # Collect images for each batch in this script
+                script_image_paths = []
+                batches = script_data.get('batches', [])
+
+                for batch in batches:
+                    batch_number = batch.get('batch_number')
+                    batch_key = f"{script_id}_{batch_number}"
+
+                    if batch_key in batch_images:
+                        batch_image_path = batch_images[batch_key]
+                        if batch_image_path not in script_image_paths:
+                            script_image_paths.append(batch_image_path)
+
+                # If no specific images found, fallback to default image_paths
+                if not script_image_paths:
+                    script_image_paths = image_paths
+            else:
+                # Fixed mode - use the same images for all scripts
+                script_image_paths = image_paths
+
+            # Cria job
+            job, error = job_mgr.create_job(
+                input_text=script_text,
+                voice_name=voice_name,
+                image_paths=script_image_paths,
+                model_id=payload.get('model_id', 'eleven_multilingual_v2')
+            )
+
+            if error:
+                results.append({
+                    'script_id': script_id,
+                    'success': False,
+                    'error': error
+                })
+                bus.publish(batch_job_id, 'failed', script_id=script_id, error=error)
+                continue
+
+            # Eventos do roteiro também chegam aos assinantes do lote
+            job.parent_job_id = batch_job_id
+            job.event_context = {
+                'script_id': script_id,
+                'script_index': idx + 1,
+                'total_scripts': len(scripts)
+            }
+
+            # Processa job
+            final_video = job_mgr.process_job(
+                job=job,
+                max_workers_video=payload.get('max_workers', 3)
+            )
+
+            duration = job.duration
+            videos_gerados.append(str(final_video))
+
+            results.append({
+                'script_id': script_id,
+                'success': True,
+                'video_path': str(final_video),
+                'duration': duration
+            })
+
+        except Exception as e:
+            results.append({
+                'script_id': script_data.get('id'),
+                'success': False,
+                'error': str(e)
+            })
+
+    # Metadados dos vídeos gerados (analisados em paralelo)
+    infos = media_info.probe_many(videos_gerados)
+    for result in results:
+        if result.get('video_path') in infos:
+            result['video_info'] = video_summary(infos[result['video_path']])
+
+    # Update batch job as completed (com os resultados, para quem consultar depois)
+    if videos_gerados:
+        db.update_job(batch_job_id, {
+            'status': 'completed',
+            'video_path': videos_gerados[0] if len(videos_gerados) == 1 else f'{len(videos_gerados)} vídeos',
+            'results': results
+        })
+        bus.publish(batch_job_id, 'completed', status='completed', percent=100,
+                    videos_count=len(videos_gerados), total_scripts=len(scripts))
+    else:
+        db.update_job(batch_job_id, {'status': 'failed', 'results': results})
+        bus.publish(batch_job_id, 'failed', status='failed',
+                    error='Nenhum vídeo gerado', total_scripts=len(scripts))
+
+    return {
+        'success': True,
+        'results': results,
+        'videos_count': len(videos_gerados),
+        'total_scripts': len(scripts)
+    }
+
+
+# Tarefas disponíveis para a fila (job_queue)
+TASKS = {
+    'single_video': run_single_video,
+    'retry_video': run_retry_video,
+    'review_draft': run_review_draft,
+    'batch_videos': run_batch_videos,
+}
+
+
+def run_task(task: str, payload: Dict) -> Dict:
+    """
+    Executa uma tarefa pelo nome
+
+    Args:
+        task: Nome da tarefa (ver TASKS)
+        payload: Dados da tarefa
+
+    Returns:
+        Resultado da tarefa
+    """
+    if task not in TASKS:
+        raise ValueError(f"Tarefa desconhecida: {task}")
+    return TASKS[task](payload)
+
+
+def fail_interrupted(item: Dict):
+    """Marca como falho o job de uma tarefa interrompida (worker encerrado no meio)"""
+    job_id = item.get('payload', {}).get('job_id')
+    if not job_id:
+        return
+
+    error = 'Processamento interrompido (worker reiniciado)'
+    db.update_job(job_id, {'status': 'failed', 'error': error})
+    bus.publish(job_id, 'failed', status='failed', error=error)
+    logger.warning(f"Job {job_id} interrompido marcado como falho")
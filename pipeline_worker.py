@@ -0,0 +1,148 @@
+"""
+Pipeline workers - processos que executam os jobs enfileirados pela API
+
+Usado com PIPELINE_MODE=queue: a API (wsgi.py + gunicorn) apenas registra o
+job e o coloca na fila em disco; este supervisor mantém N processos que
+consomem a fila, cada um executando um job por vez. O progresso é publicado
+no log de eventos compartilhado e o resultado fica no banco (data/jobs.json).
+
+Uso:
+    python pipeline_worker.py                 # PIPELINE_WORKERS processos
+    python pipeline_worker.py --workers 4
+"""
+import os
+import sys
+import time
+import signal
+import argparse
+import multiprocessing as mp
+
+from config import Config
+from utils import get_logger
+
+logger = get_logger(__name__)
+
+# Intervalo para verificar workers que morreram
+SUPERVISOR_INTERVAL = 5.0
+
+
+def worker_main(index: int, stop_event):
+    """
+    Loop de um processo worker: reivindica tarefas e as executa
+
+    Args:
+        index: Número do worker (para logs)
+        stop_event: Evento de parada compartilhado com o supervisor
+    """
+    # Imports pesados só no processo filho
+    from client_registry import registry
+    from event_bus import bus
+    from job_queue import JobQueue
+    import pipeline_tasks
+    import metrics
+
+    # Ao receber SIGTERM (ex: systemd) o worker termina a tarefa atual e sai.
+    # O handler só marca a flag: chamar stop_event.set() dentro dele pode
+    # travar se o processo estiver esperando no próprio evento.
+    stopping = []
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, lambda *_: stopping.append(True))
+
+    bus.enable_shared_log(Config.EVENT_LOG_FOLDER, follow=False)
+    # Métricas das etapas (tts, render...) são registradas aqui: o /metrics da API as soma
+    metrics.enable_shared()
+    queue = JobQueue()
+
+    logger.info(f"Worker {index} iniciado (pid {os.getpid()})")
+
+    while not stopping and not stop_event.is_set():
+        item = queue.claim()
+        if item is None:
+            time.sleep(Config.QUEUE_POLL_INTERVAL)
+            continue
+
+        job_id = item['payload'].get('job_id')
+        logger.info(f"Worker {index}: executando {item['task']} (job {job_id})")
+
+        try:
+            # Keys salvas pela interface (no .env) desde a última tarefa
+            if registry.reload_api_keys():
+                logger.info(f"Worker {index}: API keys atualizadas a partir do .env")
+            pipeline_tasks.run_task(item['task'], item['payload'])
+        except Exception as e:
+            # O job já foi marcado como falho pela tarefa
+            logger.error(f"Worker {index}: tarefa {item['task']} falhou (job {job_id}): {e}")
+        finally:
+            queue.done(item)
+
+    logger.info(f"Worker {index} encerrado")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Pipeline workers (PIPELINE_MODE=queue)')
+    parser.add_argument('--workers', type=int, default=Config.PIPELINE_WORKERS,
+                        help='Número de processos (jobs simultâneos)')
+    args = parser.parse_args()
+
+    if Config.PIPELINE_MODE != 'queue':
+        logger.warning("PIPELINE_MODE não é 'queue': a API continuará processando jobs nas requisições")
+
+    from event_bus import bus, SharedEventLog
+    from job_queue import JobQueue
+    import pipeline_tasks
+    import metrics
+
+    bus.enable_shared_log(Config.EVENT_LOG_FOLDER, follow=False)
+
+    # Tarefas em execução quando os workers pararam não são retomadas
+    # (já consumiram créditos dos provedores); o job é marcado como falho
+    queue = JobQueue()
+    for item in queue.recover():
+        pipeline_tasks.fail_interrupted(item)
+
+    SharedEventLog(Config.EVENT_LOG_FOLDER).cleanup()
+
+    # Snapshots de métricas de processos de execuções anteriores
+    metrics.enable_shared()
+    metrics.REGISTRY.cleanup_shared()
+
+    ctx = mp.get_context('spawn')
+    stop_event = ctx.Event()
+
+    def start_worker(index: int):
+        process = ctx.Process(target=worker_main, args=(index, stop_event), name=f'pipeline-worker-{index}')
+        process.start()
+        return process
+
+    workers = {i: start_worker(i) for i in range(args.workers)}
+    logger.info(f"{args.workers} pipeline workers iniciados")
+
+    stopping = []
+    signal.signal(signal.SIGTERM, lambda *_: stopping.append(True))
+    signal.signal(signal.SIGINT, lambda *_: stopping.append(True))
+
+    while not stopping:
+        # Reinicia workers que morreram inesperadamente
+        for index, process in list(workers.items()):
+            if not process.is_alive():
+                logger.error(f"Worker {index} saiu (código {process.exitcode}); reiniciando")
+                for item in queue.recover(pid=process.pid):
+                    pipeline_tasks.fail_interrupted(item)
+                workers[index] = start_worker(index)
+
+        deadline = time.time() + SUPERVISOR_INTERVAL
+        while not stopping and time.time() < deadline:
+            time.sleep(0.2)
+
+    logger.info("Encerrando workers (aguardando jobs em andamento)...")
+    stop_event.set()
+
+    for process in workers.values():
+        process.join()
+
+    logger.info("Pipeline workers encerrados")
+    sys.exit(0)
+
+
+if __name__ == '__main__':
+    main()
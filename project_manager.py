@@ -2,11 +2,11 @@
 Sistema de Gerenciamento de Projetos e Biblioteca de Assets
 """
 import json
-import shutil
 from pathlib import Path
 from datetime import datetime
 from typing import List, Dict, Optional
 from utils import get_logger
+from asset_store import asset_store
 
 logger = get_logger(__name__)
 
@@ -123,8 +123,8 @@ class ProjectManager:
         dest_dir = self.avatars_dir / category
         dest_path = dest_dir / f"{avatar_id}.png"
 
-        # Copia imagem
-        shutil.copy2(image_path, dest_path)
+        # Referência ao conteúdo no asset_store (bytes repetidos não são copiados)
+        asset_store.store(image_path, dest_dir, name=dest_path.name)
 
         avatar = {
             'id': avatar_id,
@@ -0,0 +1,157 @@
+"""
+Modelo do tempo de render WaveSpeed e agenda de polls
+
+O tempo entre a submissão e a conclusão de uma tarefa cresce com a duração
+do áudio e depende da resolução. O modelo guarda, por resolução, o tempo de
+render por segundo de áudio das tarefas recentes e estima percentis para
+uma nova tarefa. É usado para:
+- Agendar os polls (PollSchedule): dormir até perto da conclusão prevista,
+  consultar com frequência na janela provável e espaçar depois dela
+- Detectar tarefas lentas e duplicá-las (hedging.HedgePolicy)
+"""
+import threading
+from collections import deque
+from typing import Dict, Optional
+
+from config import Config
+
+
+def _percentile(values, pct: float) -> float:
+    """Percentil com interpolação linear"""
+    ordered = sorted(values)
+    k = (len(ordered) - 1) * pct / 100
+    low = int(k)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (k - low)
+
+
+class RenderTimeModel:
+    """Histórico de tempos de render por resolução (thread-safe)"""
+
+    def __init__(self, window: int = 200):
+        """
+        Inicializa o modelo
+
+        Args:
+            window: Renders recentes considerados por resolução
+        """
+        self.window = window
+        self._lock = threading.Lock()
+        self._per_second: Dict[Optional[str], deque] = {}  # render (s) por segundo de áudio
+        self._absolute: Dict[Optional[str], deque] = {}    # render (s) sem duração de áudio
+
+    def record(self, elapsed: float, audio_seconds: Optional[float], resolution: Optional[str] = None):
+        """
+        Registra o tempo de render de uma tarefa concluída
+
+        Args:
+            elapsed: Segundos entre a submissão e a conclusão
+            audio_seconds: Duração do áudio da tarefa
+            resolution: Resolução do vídeo
+        """
+        with self._lock:
+            self._absolute.setdefault(resolution, deque(maxlen=self.window)).append(elapsed)
+            if audio_seconds:
+                self._per_second.setdefault(resolution, deque(maxlen=self.window)).append(elapsed / audio_seconds)
+
+    def estimate(
+        self,
+        pct: float,
+        audio_seconds: Optional[float],
+        resolution: Optional[str] = None,
+        min_samples: int = 1
+    ) -> Optional[float]:
+        """
+        Percentil estimado do tempo de render de uma nova tarefa
+
+        Args:
+            pct: Percentil (0-100)
+            audio_seconds: Duração do áudio (None = usa os tempos absolutos)
+            resolution: Resolução do vídeo
+            min_samples: Amostras necessárias para estimar
+
+        Returns:
+            Segundos desde a submissão, ou None se não há amostras suficientes
+        """
+        with self._lock:
+            if audio_seconds:
+                samples = list(self._per_second.get(resolution, ()))
+                scale = audio_seconds
+            else:
+                samples = list(self._absolute.get(resolution, ()))
+                scale = 1.0
+
+        if len(samples) < max(min_samples, 1):
+            return None
+        return _percentile(samples, pct) * scale
+
+
+class PollSchedule:
+    """
+    Intervalos entre polls de uma tarefa
+
+    Com histórico suficiente, o primeiro poll acontece no percentil baixo
+    previsto (antes disso a tarefa quase nunca terminou), os seguintes são
+    densos até o percentil alto e, passado ele, crescem com o atraso (metade
+    do tempo já excedido, até POLL_MAX_INTERVAL). Sem histórico, usa a espera
+    inicial e o intervalo fixos.
+    """
+
+    LOW_PERCENTILE = 10
+    HIGH_PERCENTILE = 90
+
+    # Polls pretendidos dentro da janela prevista (p10 a p90)
+    WINDOW_POLLS = 5
+
+    def __init__(
+        self,
+        audio_seconds: Optional[float] = None,
+        resolution: Optional[str] = None,
+        model: RenderTimeModel = None,
+        poll_interval: float = None
+    ):
+        """
+        Inicializa a agenda
+
+        Args:
+            audio_seconds: Duração do áudio da tarefa
+            resolution: Resolução do vídeo
+            model: Histórico de renders (padrão: o do processo)
+            poll_interval: Intervalo fixo (desativa a agenda adaptativa)
+        """
+        model = model or render_model
+        self.interval = Config.POLL_INTERVAL if poll_interval is None else poll_interval
+        self.low = self.high = None
+
+        if Config.POLL_ADAPTIVE and poll_interval is None:
+            self.low = model.estimate(self.LOW_PERCENTILE, audio_seconds, resolution, Config.POLL_MIN_SAMPLES)
+            self.high = model.estimate(self.HIGH_PERCENTILE, audio_seconds, resolution, Config.POLL_MIN_SAMPLES)
+
+    @property
+    def adaptive(self) -> bool:
+        return self.low is not None
+
+    def first_delay(self) -> float:
+        """Espera antes do primeiro poll"""
+        if not self.adaptive:
+            return Config.POLL_INITIAL_DELAY
+        return max(Config.POLL_MIN_INTERVAL, self.low)
+
+    def next_delay(self, elapsed: float) -> float:
+        """
+        Espera até o próximo poll
+
+        Args:
+            elapsed: Segundos desde a submissão da tarefa
+        """
+        if not self.adaptive:
+            return self.interval
+
+        dense = min(max((self.high - self.low) / self.WINDOW_POLLS, Config.POLL_MIN_INTERVAL), self.interval)
+        if elapsed < self.high:
+            return min(dense, max(self.high - elapsed, Config.POLL_MIN_INTERVAL))
+        return min(max((elapsed - self.high) / 2, dense), Config.POLL_MAX_INTERVAL)
+
+
+# Instância compartilhada pelo processo (aprende com todos os jobs)
+render_model = RenderTimeModel()
@@ -138,6 +138,7 @@ python3 -m venv venv
 source venv/bin/activate
 pip install --upgrade pip wheel setuptools
 pip install -r requirements.txt
+python scripts/vendor_hls.py || echo "hls.js nao obtido: rode depois python scripts/vendor_hls.py"
 
 # Diretorios
 mkdir -p temp/uploads temp/outputs logs data/avatars/thumbnails
@@ -188,7 +189,9 @@ Group=$APP_USER
 WorkingDirectory=$APP_DIR
 Environment=PATH=$APP_DIR/venv/bin:/usr/local/bin:/usr/bin:/bin
 Environment=PYTHONUNBUFFERED=1
-ExecStart=$APP_DIR/venv/bin/python3 web_server.py
+Environment=PIPELINE_MODE=queue
+Environment=MEDIA_ACCEL_REDIRECT=true
+ExecStart=$APP_DIR/venv/bin/gunicorn -c gunicorn.conf.py wsgi:app
 Restart=always
 RestartSec=10
 
@@ -196,8 +199,30 @@ RestartSec=10
 WantedBy=multi-user.target
 EOF
 
+cat > /etc/systemd/system/lipsync-worker.service << EOF
+[Unit]
+Description=LipSync Video Generator - Pipeline Workers
+After=network.target
+
+[Service]
+Type=simple
+User=$APP_USER
+Group=$APP_USER
+WorkingDirectory=$APP_DIR
+Environment=PATH=$APP_DIR/venv/bin:/usr/local/bin:/usr/bin:/bin
+Environment=PYTHONUNBUFFERED=1
+Environment=PIPELINE_MODE=queue
+ExecStart=$APP_DIR/venv/bin/python3 pipeline_worker.py
+Restart=always
+RestartSec=10
+TimeoutStopSec=900
+
+[Install]
+WantedBy=multi-user.target
+EOF
+
 systemctl daemon-reload
-systemctl enable lipsync
+systemctl enable lipsync lipsync-worker
 log_success "Servico systemd configurado!"
 
 # =============================================================================
@@ -236,6 +261,14 @@ server {
         proxy_read_timeout 300s;
     }
 
+    location ^~ /_media/ {
+        internal;
+        alias /home/lipsync/app/;
+        sendfile on;
+        tcp_nopush on;
+        add_header Cache-Control "no-cache";
+    }
+
     location /api/generate/ {
         proxy_pass http://lipsync_backend;
         proxy_http_version 1.1;
@@ -275,7 +308,7 @@ log_success "Firewall configurado!"
 # =============================================================================
 log_step "ETAPA 8/8: Iniciando Servicos"
 # =============================================================================
-systemctl start lipsync
+systemctl start lipsync lipsync-worker
 systemctl restart nginx
 log_success "Servicos iniciados!"
 
@@ -307,11 +340,11 @@ echo "     GEMINI_API_KEY=sua_chave_aqui"
 echo "     WAVESPEED_API_KEY=sua_chave_aqui"
 echo ""
 echo "  3. Reinicie o servico:"
-echo "     sudo systemctl restart lipsync"
+echo "     sudo systemctl restart lipsync lipsync-worker"
 echo ""
 echo -e "${CYAN}Comandos uteis:${NC}"
-echo "  - Status:    sudo systemctl status lipsync"
-echo "  - Logs:      sudo journalctl -u lipsync -f"
-echo "  - Reiniciar: sudo systemctl restart lipsync"
+echo "  - Status:    sudo systemctl status lipsync lipsync-worker"
+echo "  - Logs:      sudo journalctl -u lipsync -u lipsync-worker -f"
+echo "  - Reiniciar: sudo systemctl restart lipsync lipsync-worker"
 echo ""
 echo -e "${GREEN}=============================================================================${NC}"
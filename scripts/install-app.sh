@@ -109,6 +109,9 @@ fi
 
 log_success "Dependencias instaladas!"
 
+# Player da prévia ao vivo (hls.js) servido pelo próprio app
+python $APP_DIR/scripts/vendor_hls.py || log_warn "hls.js nao obtido: rode depois python scripts/vendor_hls.py"
+
 # =============================================================================
 # 4. CRIAR ARQUIVO .ENV (SE NAO EXISTIR)
 # =============================================================================
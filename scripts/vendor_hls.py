@@ -0,0 +1,86 @@
+"""
+Copia o hls.js (player da prévia ao vivo) para static/js/vendor/
+
+A interface não carrega JavaScript de terceiros em tempo de execução: o
+hls.min.js é servido pelo próprio app. Este script baixa a versão fixada do
+registro do npm e confere o pacote com o hash de integridade publicado pelo
+registro antes de extrair o arquivo.
+
+Uso:
+    python scripts/vendor_hls.py
+    python scripts/vendor_hls.py --version 1.5.17
+"""
+import io
+import sys
+import base64
+import hashlib
+import tarfile
+import argparse
+from pathlib import Path
+
+import requests
+
+HLS_VERSION = '1.5.17'
+REGISTRY_URL = 'https://registry.npmjs.org/hls.js/{version}'
+TARBALL_MEMBER = 'package/dist/hls.min.js'
+DEST = Path(__file__).resolve().parent.parent / 'static' / 'js' / 'vendor' / 'hls.min.js'
+
+
+def verify_integrity(data: bytes, integrity: str):
+    """
+    Confere os bytes com um hash SRI do npm (ex: 'sha512-<base64>')
+
+    Raises:
+        ValueError: Se o algoritmo não for suportado ou o hash não conferir
+    """
+    algorithm, _, expected = integrity.partition('-')
+    if algorithm not in ('sha256', 'sha384', 'sha512'):
+        raise ValueError(f"Algoritmo de integridade não suportado: {algorithm}")
+
+    actual = base64.b64encode(hashlib.new(algorithm, data).digest()).decode()
+    if actual != expected:
+        raise ValueError(f"Hash do pacote não confere ({algorithm})")
+
+
+def vendor(version: str, dest: Path) -> Path:
+    """
+    Baixa, verifica e grava o hls.min.js
+
+    Returns:
+        Caminho gravado
+    """
+    metadata = requests.get(REGISTRY_URL.format(version=version), timeout=30)
+    metadata.raise_for_status()
+    dist = metadata.json()['dist']
+
+    tarball = requests.get(dist['tarball'], timeout=60)
+    tarball.raise_for_status()
+    verify_integrity(tarball.content, dist['integrity'])
+
+    with tarfile.open(fileobj=io.BytesIO(tarball.content), mode='r:gz') as archive:
+        script = archive.extractfile(TARBALL_MEMBER).read()
+
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = dest.with_name(dest.name + '.tmp')
+    tmp_path.write_bytes(script)
+    tmp_path.replace(dest)
+    return dest
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Copia o hls.js para static/js/vendor/')
+    parser.add_argument('--version', default=HLS_VERSION, help='Versão do hls.js')
+    args = parser.parse_args()
+
+    try:
+        path = vendor(args.version, DEST)
+    except Exception as e:
+        print(f"❌ Falha ao obter hls.js {args.version}: {e}", file=sys.stderr)
+        print("   A prévia ao vivo só funcionará em navegadores com HLS nativo (Safari)", file=sys.stderr)
+        sys.exit(1)
+
+    print(f"✅ hls.js {args.version} verificado e gravado em {path}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+"""
+Gravação assíncrona e coalescida do estado dos jobs (state.json)
+
+Threads do pipeline apenas entregam o snapshot mais recente; uma gravação
+atômica acontece no máximo uma vez por janela, fora da thread que reportou
+o progresso.
+"""
+import atexit
+import threading
+import weakref
+from pathlib import Path
+from typing import Dict, Optional
+
+from config import Config
+from utils import get_logger, write_json_atomic
+
+logger = get_logger(__name__)
+
+# Writers vivos, para gravar pendências ao encerrar o processo
+_writers: "weakref.WeakSet[StateWriter]" = weakref.WeakSet()
+
+
+class StateWriter:
+    """Grava o estado de um job coalescendo atualizações dentro de uma janela"""
+
+    def __init__(self, file_path: Path, delay: float = None):
+        """
+        Inicializa o writer
+
+        Args:
+            file_path: Caminho do arquivo de estado
+            delay: Janela de coalescência em segundos (padrão: config)
+        """
+        self.file_path = Path(file_path)
+        self.delay = Config.STATE_WRITE_DELAY if delay is None else delay
+
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._pending: Optional[Dict] = None
+        self._pending_seq = 0
+        self._written_seq = 0
+        self._timer: Optional[threading.Timer] = None
+
+        _writers.add(self)
+
+    def submit(self, state: Dict):
+        """
+        Agenda a gravação do estado (não bloqueia)
+
+        Args:
+            state: Snapshot do estado; substitui qualquer snapshot pendente
+        """
+        with self._lock:
+            self._pending = state
+            self._pending_seq += 1
+
+            if self.delay <= 0:
+                schedule = False
+            elif self._timer is None:
+                self._timer = threading.Timer(self.delay, self.flush)
+                self._timer.daemon = True
+                schedule = True
+            else:
+                # Já há gravação agendada: ela levará este snapshot
+                return
+
+        if schedule:
+            self._timer.start()
+        else:
+            self.flush()
+
+    def flush(self):
+        """Grava imediatamente o snapshot pendente (se houver)"""
+        with self._lock:
+            state, seq = self._pending, self._pending_seq
+            self._pending = None
+            if self._timer is not None and self._timer is not threading.current_thread():
+                self._timer.cancel()
+            self._timer = None
+
+        if state is None:
+            return
+
+        with self._write_lock:
+            # Um snapshot mais novo pode já ter sido gravado por outra thread
+            if seq <= self._written_seq:
+                return
+            try:
+                write_json_atomic(self.file_path, state)
+                self._written_seq = seq
+            except Exception as e:
+                logger.error(f"Erro ao gravar estado em {self.file_path}: {e}")
+
+
+@atexit.register
+def _flush_all():
+    """Grava estados pendentes ao encerrar o processo"""
+    for writer in list(_writers):
+        writer.flush()
@@ -31,6 +31,10 @@ const state = {
     currentVideoPath: null,
     processingJobs: [],
     completedVideos: [],
+    jobEvents: null, // EventSource de /api/jobs/events
+    currentClientRef: null,
+    jobWaiters: {}, // job_id -> verificação de jobs enfileirados (PIPELINE_MODE=queue)
+    livePreview: null, // { url, hls } da prévia HLS do vídeo único em andamento
 
     // Projects
     projects: [],
@@ -54,7 +58,7 @@ document.addEventListener('DOMContentLoaded', () => {
     loadAvatars();
     loadProjects();
     loadVideoHistory();
-    loadProcessingJobs();
+    initJobEvents();
 
     // Event listeners
     document.getElementById('btnEstimate').addEventListener('click', calculateEstimate);
@@ -410,6 +414,7 @@ async function loadAvatars() {
 
         if (data.success) {
             state.avatars = data.avatars;
+            state.thumbnailSizes = data.thumbnail_sizes || [];
             renderAvatarsGallery();
             renderAvatarSelectors();
         }
@@ -418,6 +423,27 @@ async function loadAvatars() {
     }
 }
 
+// Miniatura do avatar: WebP com fallback JPEG, o navegador escolhe o tamanho
+// (lado menor) pelo espaço exibido (displaySize, em px CSS) e pela densidade da tela
+function avatarThumbnail(avatar, className, displaySize) {
+    const sizes = state.thumbnailSizes || [];
+    const base = `/api/avatars/${avatar.id}`;
+    const classAttr = className ? ` class="${className}"` : '';
+
+    if (sizes.length === 0) {
+        return `<img${classAttr} src="${base}/image" alt="${avatar.name}" loading="lazy">`;
+    }
+
+    const srcset = fmt => sizes.map(size => `${base}/thumbnail/${size}.${fmt} ${size}w`).join(', ');
+    const fallback = sizes.find(size => size >= displaySize) || sizes[sizes.length - 1];
+
+    return `<picture class="avatar-picture">
+                <source type="image/webp" srcset="${srcset('webp')}" sizes="${displaySize}px">
+                <img${classAttr} src="${base}/thumbnail/${fallback}.jpg" srcset="${srcset('jpg')}"
+                     sizes="${displaySize}px" alt="${avatar.name}" loading="lazy" decoding="async">
+            </picture>`;
+}
+
 function renderAvatarsGallery() {
     const gallery = document.getElementById('avatarsGallery');
 
@@ -437,7 +463,7 @@ function renderAvatarsGallery() {
 
     gallery.innerHTML = state.avatars.map(avatar => `
         <div class="avatar-card" data-id="${avatar.id}">
-            <img class="avatar-card-image" src="/api/avatars/${avatar.id}/image" alt="${avatar.name}">
+            ${avatarThumbnail(avatar, 'avatar-card-image', 240)}
             <div class="avatar-card-info">
                 <div class="avatar-card-name">${avatar.name}</div>
                 <div class="avatar-card-date">${formatDate(avatar.created_at)}</div>
@@ -467,7 +493,7 @@ function renderAvatarSelectors() {
                  data-id="${avatar.id}"
                  data-path="${avatar.image_path}"
                  onclick="selectAvatar('${avatar.id}', '${avatar.image_path}')">
-                <img class="avatar-selector-thumb" src="/api/avatars/${avatar.id}/image" alt="${avatar.name}">
+                ${avatarThumbnail(avatar, 'avatar-selector-thumb', 70)}
                 <span class="avatar-selector-name">${avatar.name}</span>
             </div>
         `).join('');
@@ -766,6 +792,7 @@ async function generateSingleVideo() {
     const voice = document.getElementById('singleVoice').value;
     const model = document.getElementById('singleModel').value;
     const workers = parseInt(document.getElementById('singleWorkers').value);
+    const draft = document.getElementById('singleMode').value === 'draft';
 
     // Validation
     if (!text.trim()) {
@@ -806,6 +833,7 @@ async function generateSingleVideo() {
 
     // Add to loading tab
     const tempJobId = Date.now().toString();
+    state.currentClientRef = tempJobId;
     addToLoadingTab({
         id: tempJobId,
         title: 'Video em processamento',
@@ -829,19 +857,46 @@ async function generateSingleVideo() {
                 voice_name: voice,
                 model_id: model,
                 image_paths: imagePaths,
-                max_workers: workers
+                max_workers: workers,
+                draft,
+                client_ref: tempJobId
             })
         });
 
-        const data = await response.json();
+        let data = await response.json();
 
-        if (data.success) {
+        // Modo fila: o job roda nos pipeline workers; aguarda o resultado
+        if (data.success && data.queued) {
+            const job = await waitForJob(data.job_id);
+            if (job.status === 'draft_ready') {
+                data = { success: true, draft: true, video_path: job.draft_path, job_id: job.id };
+            } else {
+                data = job.status === 'completed'
+                    ? { success: true, video_path: job.video_path, job_id: job.id, duration: job.duration || 0 }
+                    : { success: false, error: job.error || 'Erro ao gerar vídeo', job_id: job.id };
+            }
+        }
+
+        if (data.success && data.draft) {
+            // Rascunho: os renders finais só começam com a aprovação
+            progressFill.style.width = '50%';
+            progressText.textContent = 'Rascunho pronto: aprove para renderizar o vídeo final';
+
+            stopLivePreview();
+            const videoPlayer = document.getElementById('videoPlayer');
+            videoPlayer.src = `/api/stream/${encodeURIComponent(data.video_path)}`;
+            videoContainer.style.display = 'block';
+
+            updateLoadingTabItem(tempJobId, 'draft_ready', data.video_path, data.job_id);
+            showMessage('statusMessages', 'Rascunho pronto para aprovação', 'success');
+        } else if (data.success) {
             progressFill.style.width = '100%';
             progressText.textContent = 'Vídeo gerado com sucesso!';
 
             state.currentVideoPath = data.video_path;
 
-            // Show video
+            // Show video (substitui a prévia ao vivo, se estava tocando)
+            stopLivePreview();
             const videoPlayer = document.getElementById('videoPlayer');
             videoPlayer.src = `/api/download/${encodeURIComponent(data.video_path)}`;
             videoContainer.style.display = 'block';
@@ -855,11 +910,14 @@ async function generateSingleVideo() {
             loadVideoHistory();
             loadProcessingJobs();
         } else {
+            stopLivePreview();
+            videoContainer.style.display = 'none';
             progressContainer.style.display = 'none';
-            updateLoadingTabItem(tempJobId, 'failed');
+            updateLoadingTabItem(tempJobId, 'failed', null, data.job_id);
             showMessage('statusMessages', data.error, 'error');
         }
     } catch (error) {
+        stopLivePreview();
         progressContainer.style.display = 'none';
         updateLoadingTabItem(tempJobId, 'failed');
         showMessage('statusMessages', 'Erro ao gerar vídeo', 'error');
@@ -1019,7 +1077,7 @@ function renderBatchImageSelector(scriptId, batchNumber) {
         html += `
             <div class="batch-image-mini-item ${selectedId === avatar.id ? 'selected' : ''}"
                  onclick="selectBatchImage('${scriptId}', ${batchNumber}, '${avatar.id}')">
-                <img src="/api/avatars/${avatar.id}/image" alt="${avatar.name}">
+                ${avatarThumbnail(avatar, '', 50)}
             </div>
         `;
     });
@@ -1142,7 +1200,19 @@ async function generateBatchVideos() {
             })
         });
 
-        const data = await response.json();
+        let data = await response.json();
+
+        // Modo fila: o lote roda nos pipeline workers; aguarda o resultado
+        if (data.success && data.queued) {
+            const job = await waitForJob(data.job_id);
+            const results = job.results || [];
+            data = {
+                success: true,
+                results,
+                videos_count: results.filter(r => r.success).length,
+                total_scripts: state.previewData.scripts.length
+            };
+        }
 
         if (data.success) {
             const resultsCard = document.getElementById('multiResultsCard');
@@ -1234,7 +1304,7 @@ function addToLoadingTab(item) {
     container.insertAdjacentHTML('afterbegin', itemHtml);
 }
 
-function updateLoadingTabItem(itemId, status, videoPath = null) {
+function updateLoadingTabItem(itemId, status, videoPath = null, jobId = null) {
     const item = document.querySelector(`.loading-video-card[data-id="${itemId}"]`);
     if (!item) return;
 
@@ -1249,8 +1319,92 @@ function updateLoadingTabItem(itemId, status, videoPath = null) {
     } else if (status === 'failed') {
         item.querySelector('.loading-video-status').innerHTML = `
             <span style="color: var(--error);">Falhou</span>
+            ${jobId ? `<button class="btn btn-secondary" onclick="retryJob('${jobId}', '${itemId}')">Tentar novamente</button>` : ''}
         `;
         item.querySelector('.progress-fill').style.background = 'var(--error)';
+    } else if (status === 'draft_ready') {
+        const escapedPath = videoPath.replace(/\\/g, '\\\\').replace(/'/g, "\\'");
+        item.querySelector('.loading-video-status').innerHTML = `
+            <span>Rascunho pronto</span>
+            <button class="btn btn-secondary" onclick="playVideo('${escapedPath}')">Assistir</button>
+            <button class="btn btn-primary" onclick="approveDraft('${jobId}', '${itemId}')">Aprovar</button>
+        `;
+        item.querySelector('.progress-fill').style.width = '50%';
+    } else if (status === 'processing') {
+        item.querySelector('.loading-video-status').textContent = 'Reprocessando itens que falharam...';
+        item.querySelector('.progress-fill').style.background = '';
+    } else if (status === 'rendering') {
+        item.querySelector('.loading-video-status').textContent = 'Renderizando vídeo final...';
+    }
+}
+
+// Aprova o rascunho: renderiza o vídeo final reaproveitando textos e áudios
+async function approveDraft(jobId, itemId) {
+    updateLoadingTabItem(itemId, 'rendering');
+
+    try {
+        const response = await fetch(`/api/jobs/${jobId}/approve`, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ client_ref: itemId })
+        });
+
+        let data = await response.json();
+
+        if (data.success && data.queued) {
+            const job = await waitForJob(data.job_id);
+            data = job.status === 'completed'
+                ? { success: true, video_path: job.video_path }
+                : { success: false, error: job.error || 'Erro ao gerar vídeo' };
+        }
+
+        if (data.success) {
+            updateLoadingTabItem(itemId, 'completed', data.video_path);
+            showMessage('statusMessages', 'Vídeo gerado com sucesso!', 'success');
+            loadVideoHistory();
+        } else {
+            updateLoadingTabItem(itemId, 'failed', null, jobId);
+            showMessage('statusMessages', data.error, 'error');
+        }
+    } catch (error) {
+        updateLoadingTabItem(itemId, 'failed', null, jobId);
+        showMessage('statusMessages', 'Erro ao aprovar rascunho', 'error');
+        console.error(error);
+    }
+}
+
+// Reprocessa só os clipes/áudios que falharam de um job (o resto é reaproveitado)
+async function retryJob(jobId, itemId) {
+    updateLoadingTabItem(itemId, 'processing');
+
+    try {
+        const response = await fetch(`/api/jobs/${jobId}/retry`, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ client_ref: itemId })
+        });
+
+        let data = await response.json();
+
+        if (data.success && data.queued) {
+            const job = await waitForJob(data.job_id);
+            data = job.status === 'completed'
+                ? { success: true, video_path: job.video_path }
+                : { success: false, error: job.error || 'Erro ao gerar vídeo' };
+        }
+
+        if (data.success) {
+            updateLoadingTabItem(itemId, 'completed', data.video_path);
+            showMessage('statusMessages', 'Vídeo gerado com sucesso!', 'success');
+            loadVideoHistory();
+        } else {
+            updateLoadingTabItem(itemId, 'failed', null, jobId);
+            showMessage('statusMessages', data.error, 'error');
+        }
+    } catch (error) {
+        updateLoadingTabItem(itemId, 'failed', null, jobId);
+        showMessage('statusMessages', 'Erro ao reprocessar vídeo', 'error');
+        console.error(error);
     }
 }
 
@@ -1297,7 +1451,200 @@ function addToCompletedVideos(video) {
     container.insertAdjacentHTML('afterbegin', itemHtml);
 }
 
+// ============================================================================
+// JOB EVENTS (Server-Sent Events)
+// ============================================================================
+
+function initJobEvents() {
+    if (!window.EventSource) {
+        loadProcessingJobs();
+        return;
+    }
+
+    const source = new EventSource('/api/jobs/events');
+    state.jobEvents = source;
+
+    source.onmessage = (message) => {
+        try {
+            handleJobEvent(JSON.parse(message.data));
+        } catch (error) {
+            console.error('Evento de job inválido:', error);
+        }
+    };
+
+    source.onerror = () => {
+        // O navegador reconecta sozinho; o snapshot inicial ressincroniza o estado
+        console.warn('Conexão de eventos de jobs interrompida, reconectando...');
+    };
+}
+
+function handleJobEvent(event) {
+    if (event.type === 'snapshot') {
+        state.processingJobs = event.jobs || [];
+        // (Re)conexão: eventos finais podem ter passado enquanto o stream estava fora
+        Object.values(state.jobWaiters).forEach(check => check());
+        return;
+    }
+
+    if (event.type === 'created') {
+        state.processingJobs = state.processingJobs.filter(j => j.id !== event.job_id);
+        state.processingJobs.unshift({ id: event.job_id, status: 'processing', progress: 0, type: event.job_type });
+        return;
+    }
+
+    // Rascunho pronto também libera quem aguarda o job (ele para até a aprovação)
+    const isFinal = (event.type === 'completed' || event.type === 'failed' || event.type === 'draft')
+        && !event.pipeline_job_id && !event.script_id;
+
+    if (isFinal) {
+        state.processingJobs = state.processingJobs.filter(j => j.id !== event.job_id);
+        if (state.jobWaiters[event.job_id]) {
+            state.jobWaiters[event.job_id]();
+        }
+    } else {
+        const job = state.processingJobs.find(j => j.id === event.job_id);
+        if (job && typeof event.percent === 'number') {
+            job.progress = event.percent;
+            job.message = event.message;
+        }
+    }
+
+    // Atualiza card da aba "Carregando" (vídeo único ou roteiro de lote)
+    let cardId = null;
+    if (event.client_ref) {
+        cardId = event.client_ref;
+    } else if (event.script_id !== undefined && event.script_id !== null) {
+        cardId = `batch_${event.script_id}`;
+    }
+
+    if (cardId && (event.type === 'progress' || event.type === 'status')) {
+        const card = document.querySelector(`.loading-video-card[data-id="${cardId}"]`);
+        if (card && typeof event.percent === 'number') {
+            card.querySelector('.progress-fill').style.width = `${event.percent}%`;
+        }
+    }
+
+    // Prévia ao vivo do vídeo único em andamento
+    if (event.type === 'preview' && event.client_ref && event.client_ref === state.currentClientRef) {
+        showLivePreview(event);
+    }
+
+    // Barra de progresso do vídeo único em andamento
+    if (event.client_ref && event.client_ref === state.currentClientRef && event.type === 'progress') {
+        const progressFill = document.getElementById('progressFill');
+        const progressText = document.getElementById('progressText');
+        if (progressFill) progressFill.style.width = `${event.percent}%`;
+        if (progressText && event.message) progressText.textContent = event.message;
+    }
+}
+
+// ============================================================================
+// PRÉVIA AO VIVO (HLS)
+// ============================================================================
+
+// Servido pelo próprio app (scripts/vendor_hls.py): nada de JavaScript de terceiros
+const HLS_JS_URL = '/js/vendor/hls.min.js';
+
+function loadHlsJs() {
+    if (window.Hls) return Promise.resolve(window.Hls);
+
+    return new Promise((resolve, reject) => {
+        const script = document.createElement('script');
+        script.src = HLS_JS_URL;
+        script.onload = () => resolve(window.Hls);
+        script.onerror = reject;
+        document.head.appendChild(script);
+    });
+}
+
+// Toca a playlist da prévia enquanto os clipes seguintes ainda renderizam.
+// Safari toca HLS nativamente; nos demais navegadores usa hls.js.
+async function showLivePreview(event) {
+    if (state.livePreview && state.livePreview.url === event.preview_url) {
+        return; // O player já recarrega a playlist sozinho
+    }
+
+    stopLivePreview();
+    state.livePreview = { url: event.preview_url, hls: null };
+
+    const videoPlayer = document.getElementById('videoPlayer');
+    document.getElementById('videoContainer').style.display = 'block';
+    document.getElementById('btnDownload').style.display = 'none';
+
+    if (videoPlayer.canPlayType('application/vnd.apple.mpegurl')) {
+        videoPlayer.src = event.preview_url;
+        return;
+    }
+
+    try {
+        const Hls = await loadHlsJs();
+        if (!Hls.isSupported() || !state.livePreview || state.livePreview.url !== event.preview_url) {
+            return;
+        }
+        const hls = new Hls();
+        hls.loadSource(event.preview_url);
+        hls.attachMedia(videoPlayer);
+        state.livePreview.hls = hls;
+    } catch (error) {
+        console.warn('Prévia ao vivo indisponível:', error);
+    }
+}
+
+function stopLivePreview() {
+    if (!state.livePreview) return;
+
+    if (state.livePreview.hls) {
+        state.livePreview.hls.destroy();
+    }
+    state.livePreview = null;
+
+    const videoPlayer = document.getElementById('videoPlayer');
+    videoPlayer.removeAttribute('src');
+    videoPlayer.load();
+    document.getElementById('btnDownload').style.display = '';
+}
+
+// Aguarda a conclusão de um job enfileirado e resolve com o registro final
+// (/api/jobs/<id>). Com o stream de eventos aberto, só o evento final (ou o
+// snapshot de uma reconexão) dispara a verificação; o intervalo só consulta
+// a API enquanto o stream está fechado ou reconectando.
+function jobEventsOpen() {
+    return state.jobEvents && state.jobEvents.readyState === EventSource.OPEN;
+}
+
+function waitForJob(jobId) {
+    return new Promise((resolve) => {
+        let timer = null;
+
+        const check = async () => {
+            try {
+                const response = await fetch(`/api/jobs/${jobId}`);
+                const data = await response.json();
+
+                if (data.success && ['completed', 'failed', 'draft_ready'].includes(data.job.status)) {
+                    clearInterval(timer);
+                    delete state.jobWaiters[jobId];
+                    resolve(data.job);
+                }
+            } catch (error) {
+                console.error('Erro ao verificar job:', error);
+            }
+        };
+
+        state.jobWaiters[jobId] = check;
+        check(); // O job pode ter terminado antes de o aguardarmos
+        timer = setInterval(() => {
+            if (!jobEventsOpen()) check();
+        }, 5000);
+    });
+}
+
 async function loadProcessingJobs() {
+    // Com o stream de eventos ativo o estado já chega em tempo real
+    if (state.jobEvents && state.jobEvents.readyState !== EventSource.CLOSED) {
+        return;
+    }
+
     try {
         const response = await fetch('/api/jobs?status=processing');
         const data = await response.json();
@@ -6,6 +6,8 @@ from pathlib import Path
 from typing import List, Dict
 from config import Config
 from utils import get_logger, retry_with_backoff, create_batches, split_into_paragraphs
+import metrics
+import tracing
 
 logger = get_logger(__name__)
 
@@ -14,7 +16,15 @@ class TextProcessor:
 
     def __init__(self):
         """Inicializa o processador de texto"""
-        genai.configure(api_key=Config.GEMINI_API_KEY)
+        if Config.GEMINI_API_ENDPOINT:
+            # Endpoint alternativo (ex: stub local de benchmark) via REST
+            genai.configure(
+                api_key=Config.GEMINI_API_KEY,
+                transport='rest',
+                client_options={'api_endpoint': Config.GEMINI_API_ENDPOINT}
+            )
+        else:
+            genai.configure(api_key=Config.GEMINI_API_KEY)
         self.model = genai.GenerativeModel('gemini-2.5-flash-lite')
         logger.info("TextProcessor inicializado com Gemini 2.5 Flash Lite")
 
@@ -72,18 +82,20 @@ TEXTO FORMATADO:"""
         """
         try:
             logger.info(f"Formatando batch #{batch_number}...")
+            tracing.current_span().incr('attempts')
 
             prompt = self._get_formatting_prompt(batch_text, batch_number)
 
-            response = self.model.generate_content(
-                prompt,
-                generation_config={
-                    'temperature': 0.7,
-                    'top_p': 0.9,
-                    'top_k': 40,
-                    'max_output_tokens': 8192,
-                }
-            )
+            with metrics.track('format', 'gemini'):
+                response = self.model.generate_content(
+                    prompt,
+                    generation_config={
+                        'temperature': 0.7,
+                        'top_p': 0.9,
+                        'top_k': 40,
+                        'max_output_tokens': 8192,
+                    }
+                )
 
             formatted_text = response.text.strip()
 
@@ -99,7 +111,8 @@ TEXTO FORMATADO:"""
         self,
         full_text: str,
         output_dir: Path,
-        progress_callback=None
+        progress_callback=None,
+        reuse_existing: bool = False
     ) -> List[Dict[str, any]]:
         """
         Processa texto completo em batches
@@ -108,6 +121,8 @@ TEXTO FORMATADO:"""
             full_text: Texto completo a processar
             output_dir: Diretório para salvar textos formatados
             progress_callback: Função de callback para progresso (opcional)
+            reuse_existing: Se True, batches já formatados em output_dir não
+                            são enviados de novo ao Gemini (retry de job)
 
         Returns:
             Lista de dicts com informações dos batches processados
@@ -143,18 +158,25 @@ TEXTO FORMATADO:"""
             # Junta parágrafos do batch
             batch_text = '\n\n'.join(batch)
 
-            # Atualiza progresso
-            if progress_callback:
-                progress_callback(f"Formatando texto batch {batch_number}/{len(batches)}...")
+            file_path = formatted_dir / f'batch_{batch_number}.txt'
 
-            # Formata batch
-            formatted_text = self.format_batch(batch_text, batch_number)
+            if reuse_existing and file_path.exists() and file_path.stat().st_size > 0:
+                formatted_text = file_path.read_text(encoding='utf-8')
+                logger.info(f"Batch {batch_number} reaproveitado de: {file_path}")
+            else:
+                # Atualiza progresso
+                if progress_callback:
+                    progress_callback(f"Formatando texto batch {batch_number}/{len(batches)}...")
 
-            # Salva em arquivo
-            file_path = formatted_dir / f'batch_{batch_number}.txt'
-            file_path.write_text(formatted_text, encoding='utf-8')
+                # Formata batch
+                with tracing.span('format.batch', batch=batch_number, chars=len(batch_text)) as batch_span:
+                    formatted_text = self.format_batch(batch_text, batch_number)
+                    batch_span.set('formatted_chars', len(formatted_text))
+
+                # Salva em arquivo
+                file_path.write_text(formatted_text, encoding='utf-8')
 
-            logger.info(f"Batch {batch_number} salvo em: {file_path}")
+                logger.info(f"Batch {batch_number} salvo em: {file_path}")
 
             results.append({
                 'batch_number': batch_number,
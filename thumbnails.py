@@ -0,0 +1,203 @@
+"""
+Miniaturas dos avatares em vários tamanhos (WebP e JPEG)
+
+A galeria e os seletores mostram os avatares em blocos de 50 a 250 px, mas
+recebiam a imagem original (vários MB). As miniaturas são geradas em
+segundo plano, em um pool de processos (Pillow usa CPU e não deve disputar
+o GIL com as requisições), logo que o avatar é criado. Avatares antigos
+ganham miniaturas na primeira vez em que são pedidos. O pool é encerrado
+depois de THUMBNAIL_IDLE_SECONDS sem trabalho: os processos só existem
+enquanto há miniaturas a gerar.
+
+Os arquivos ficam em <pasta>/<sha256 da imagem>_<tamanho>.<formato>: o
+conteúdo de um nome nunca muda, então podem ser servidos como imutáveis.
+"""
+import os
+import threading
+import multiprocessing as mp
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+from asset_store import asset_store
+from config import Config
+from utils import get_logger
+
+logger = get_logger(__name__)
+
+# Formato -> (extensão, mimetype)
+FORMATS = {'webp': ('webp', 'image/webp'), 'jpg': ('jpg', 'image/jpeg')}
+
+
+def render_thumbnails(source: str, output_dir: str, key: str, sizes: Tuple[int, ...], quality: int) -> List[str]:
+    """
+    Gera as miniaturas de uma imagem (executado nos processos do pool)
+
+    Cada tamanho é o lado menor da miniatura (a imagem nunca é ampliada),
+    com a orientação EXIF aplicada e sem metadados.
+
+    Returns:
+        Caminhos gerados
+    """
+    from PIL import Image, ImageOps
+
+    written = []
+    with Image.open(source) as original:
+        image = ImageOps.exif_transpose(original)
+        if image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info):
+            rgba = image.convert('RGBA')
+            image = Image.new('RGB', rgba.size, (255, 255, 255))
+            image.paste(rgba, mask=rgba.getchannel('A'))
+        elif image.mode != 'RGB':
+            image = image.convert('RGB')
+
+        for size in sizes:
+            scale = min(1.0, size / min(image.size))
+            thumb = image.resize(
+                (max(1, round(image.width * scale)), max(1, round(image.height * scale))),
+                Image.LANCZOS
+            ) if scale < 1 else image
+
+            for fmt, (ext, _) in FORMATS.items():
+                path = Path(output_dir) / f"{key}_{size}.{ext}"
+                tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+                if fmt == 'webp':
+                    thumb.save(tmp_path, 'WEBP', quality=quality, method=4)
+                else:
+                    thumb.save(tmp_path, 'JPEG', quality=quality, optimize=True, progressive=True)
+                os.replace(tmp_path, path)
+                written.append(str(path))
+
+    return written
+
+
+class ThumbnailService:
+    """Geração (em processos) e localização das miniaturas"""
+
+    def __init__(self, output_dir: Path, sizes: Tuple[int, ...] = None, max_workers: int = None,
+                 idle_timeout: float = None):
+        """
+        Inicializa o serviço
+
+        Args:
+            output_dir: Pasta das miniaturas
+            sizes: Tamanhos (lado menor, px) (padrão: config)
+            max_workers: Processos do pool (padrão: config)
+            idle_timeout: Segundos sem trabalho até encerrar o pool (padrão: config)
+        """
+        self.output_dir = Path(output_dir)
+        self.sizes = tuple(sorted(sizes or Config.THUMBNAIL_SIZES))
+        self.max_workers = max_workers or Config.THUMBNAIL_WORKERS
+        self.quality = Config.THUMBNAIL_QUALITY
+        self.idle_timeout = Config.THUMBNAIL_IDLE_SECONDS if idle_timeout is None else idle_timeout
+
+        self._lock = threading.Lock()
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._pending: Dict[str, Future] = {}
+        self._idle_timer: Optional[threading.Timer] = None
+
+    def key(self, image_path: Union[str, Path]) -> str:
+        """Chave das miniaturas de uma imagem (hash do conteúdo)"""
+        return asset_store.digest(image_path)
+
+    def path(self, key: str, size: int, fmt: str) -> Path:
+        """Caminho de uma miniatura"""
+        return self.output_dir / f"{key}_{size}.{FORMATS[fmt][0]}"
+
+    def schedule(self, image_path: Union[str, Path]) -> Future:
+        """
+        Gera as miniaturas em segundo plano (não bloqueia)
+
+        Pedidos repetidos da mesma imagem enquanto a geração não termina
+        compartilham o mesmo Future.
+
+        Returns:
+            Future com a lista de arquivos gerados
+        """
+        key = self.key(image_path)
+
+        with self._lock:
+            pending = self._pending.get(key)
+            if pending is not None:
+                return pending
+
+            if self._idle_timer is not None:
+                self._idle_timer.cancel()
+                self._idle_timer = None
+
+            args = (str(image_path), str(self.output_dir), key, self.sizes, self.quality)
+            try:
+                future = self._pool().submit(render_thumbnails, *args)
+            except BrokenProcessPool:
+                # Um processo morreu (ex: falta de memória): encerra o pool quebrado e cria outro
+                self._shutdown_pool()
+                future = self._pool().submit(render_thumbnails, *args)
+            self._pending[key] = future
+
+        future.add_done_callback(lambda f: self._finished(key, f))
+        return future
+
+    def get(self, image_path: Union[str, Path], size: int, fmt: str, timeout: float = 30) -> Optional[Path]:
+        """
+        Miniatura pronta de uma imagem, gerando-a se necessário
+
+        Args:
+            image_path: Imagem original
+            size: Um dos tamanhos configurados
+            fmt: 'webp' ou 'jpg'
+            timeout: Espera máxima (s) pela geração
+
+        Returns:
+            Caminho da miniatura ou None se não pôde ser gerada
+        """
+        path = self.path(self.key(image_path), size, fmt)
+        if path.exists():
+            return path
+
+        try:
+            self.schedule(image_path).result(timeout=timeout)
+        except Exception as e:
+            logger.warning(f"Miniaturas de {Path(image_path).name} indisponíveis: {e}")
+            return None
+
+        return path if path.exists() else None
+
+    def remove(self, key: str):
+        """Apaga as miniaturas de uma imagem (pela chave, já que a imagem pode não existir mais)"""
+        for size in self.sizes:
+            for fmt in FORMATS:
+                self.path(key, size, fmt).unlink(missing_ok=True)
+
+    def _pool(self) -> ProcessPoolExecutor:
+        """Pool de processos, criado no primeiro uso (chamar com o lock)"""
+        if self._executor is None:
+            # spawn: o processo da API tem threads (fork poderia herdar locks presos)
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=mp.get_context('spawn')
+            )
+            self.output_dir.mkdir(parents=True, exist_ok=True)
+        return self._executor
+
+    def _shutdown_pool(self):
+        """Encerra o pool sem esperar (chamar com o lock)"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _shutdown_if_idle(self):
+        with self._lock:
+            self._idle_timer = None
+            if not self._pending:
+                self._shutdown_pool()
+
+    def _finished(self, key: str, future: Future):
+        with self._lock:
+            self._pending.pop(key, None)
+            if not self._pending and self._executor is not None and self._idle_timer is None:
+                self._idle_timer = threading.Timer(self.idle_timeout, self._shutdown_if_idle)
+                self._idle_timer.daemon = True
+                self._idle_timer.start()
+        if future.exception():
+            logger.warning(f"Falha ao gerar miniaturas {key[:12]}: {future.exception()}")
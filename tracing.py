@@ -0,0 +1,333 @@
+"""
+Trace por job: linha do tempo com spans de cada etapa e chamada externa
+
+Cada job grava um trace.json ao lado do state.json com um "waterfall" de
+spans (format, tts, upload, submit, queue, render, download, concat) e seus
+atributos (bytes, tentativas, host...). O trace ativo é propagado por
+contextvars; use `wrap()` ao enviar funções para thread pools.
+
+O arquivo é regravado ao início e a cada etapa (span de primeiro nível)
+concluída, então outros processos (API no modo queue) acompanham o job ao
+vivo. Cada execução do job (retry, aprovação do rascunho) tem o seu arquivo:
+trace.json, trace_2.json, trace_3.json...
+"""
+import time
+import uuid
+import threading
+import contextvars
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from utils import get_logger, write_json_atomic
+
+logger = get_logger(__name__)
+
+# (trace, span atual) do contexto atual
+_current: contextvars.ContextVar = contextvars.ContextVar('lipsync_trace', default=None)
+
+# Traces em andamento, para consulta ao vivo pela API
+_active: Dict[str, 'Trace'] = {}
+_active_lock = threading.Lock()
+
+
+class Span:
+    """Intervalo de tempo nomeado dentro de um trace"""
+
+    def __init__(self, name: str, parent_id: Optional[str], attributes: Dict[str, Any]):
+        self.span_id = uuid.uuid4().hex[:12]
+        self.parent_id = parent_id
+        self.name = name
+        self.attributes = dict(attributes)
+        self.start = time.time()
+        self.end: Optional[float] = None
+        self.status = 'ok'
+
+    def set(self, key: str, value: Any):
+        """Define um atributo do span"""
+        self.attributes[key] = value
+
+    def incr(self, key: str, amount: int = 1):
+        """Incrementa um atributo numérico (ex: tentativas)"""
+        self.attributes[key] = self.attributes.get(key, 0) + amount
+
+
+class _NoopSpan:
+    """Span usado quando não há trace ativo"""
+
+    def set(self, key: str, value: Any):
+        pass
+
+    def incr(self, key: str, amount: int = 1):
+        pass
+
+
+_NOOP = _NoopSpan()
+
+
+def run_files(file_path: Path) -> List[Path]:
+    """
+    Arquivos das execuções de um trace, em ordem
+
+    Args:
+        file_path: Arquivo da primeira execução (ex: job_dir/trace.json)
+
+    Returns:
+        [trace.json, trace_2.json, ...] existentes
+    """
+    file_path = Path(file_path)
+    files = []
+    while True:
+        path = file_path if not files else file_path.with_name(f"{file_path.stem}_{len(files) + 1}{file_path.suffix}")
+        if not path.exists():
+            return files
+        files.append(path)
+
+
+class Trace:
+    """Coleção de spans de um job"""
+
+    def __init__(self, job_id: str, file_path: Path = None, run: int = 1):
+        """
+        Inicializa o trace
+
+        Args:
+            job_id: ID do job
+            file_path: Onde gravar o trace (ex: job_dir/trace.json)
+            run: Número da execução do job
+        """
+        self.job_id = job_id
+        self.file_path = Path(file_path) if file_path else None
+        self.run = run
+        self.start = time.time()
+        self.running = True
+        self.spans: List[Span] = []
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+
+    def add(self, span: Span):
+        """Registra um span"""
+        with self._lock:
+            self.spans.append(span)
+
+    def to_waterfall(self) -> Dict:
+        """
+        Monta o waterfall do trace
+
+        Returns:
+            Dict com spans ordenados (offsets em ms a partir do início do job),
+            totais por etapa e caminho crítico
+        """
+        now = time.time()
+
+        with self._lock:
+            spans = list(self.spans)
+
+        by_id = {s.span_id: s for s in spans}
+
+        def depth(span: Span) -> int:
+            level = 0
+            while span.parent_id and span.parent_id in by_id:
+                span = by_id[span.parent_id]
+                level += 1
+            return level
+
+        def end_of(span: Span) -> float:
+            return span.end if span.end is not None else now
+
+        items = []
+        for span in sorted(spans, key=lambda s: s.start):
+            items.append({
+                'span_id': span.span_id,
+                'parent_id': span.parent_id,
+                'name': span.name,
+                'depth': depth(span),
+                'start_ms': round((span.start - self.start) * 1000, 1),
+                'duration_ms': round((end_of(span) - span.start) * 1000, 1),
+                'status': span.status if span.end is not None else 'running',
+                'attributes': span.attributes
+            })
+
+        # Totais por etapa (spans de primeiro nível)
+        stages: Dict[str, float] = {}
+        for item in items:
+            if item['depth'] == 0:
+                stages[item['name']] = stages.get(item['name'], 0.0) + item['duration_ms']
+
+        # Caminho crítico: as etapas (sequenciais) e, dentro de cada uma,
+        # sempre o filho que termina por último (quem segurou a etapa)
+        children: Dict[Optional[str], List[Span]] = {}
+        for span in spans:
+            parent = span.parent_id if span.parent_id in by_id else None
+            children.setdefault(parent, []).append(span)
+
+        critical_path = []
+        for root in sorted(children.get(None, []), key=lambda s: s.start):
+            node, level = root, 0
+            while node is not None:
+                critical_path.append({
+                    'span_id': node.span_id,
+                    'name': node.name,
+                    'depth': level,
+                    'duration_ms': round((end_of(node) - node.start) * 1000, 1),
+                    'attributes': node.attributes
+                })
+                kids = children.get(node.span_id)
+                node = max(kids, key=end_of) if kids else None
+                level += 1
+
+        end = max([end_of(s) for s in spans] + [self.start])
+
+        return {
+            'job_id': self.job_id,
+            'run': self.run,
+            'running': self.running,
+            'started_at': datetime.fromtimestamp(self.start).isoformat(),
+            'duration_ms': round((end - self.start) * 1000, 1),
+            'stages': {k: round(v, 1) for k, v in stages.items()},
+            'critical_path': critical_path,
+            'spans': items
+        }
+
+    def save(self):
+        """Grava o waterfall no arquivo do trace"""
+        if not self.file_path:
+            return
+        try:
+            # Saves concorrentes (etapas em threads) não podem gravar fora de ordem
+            with self._save_lock:
+                write_json_atomic(self.file_path, self.to_waterfall())
+        except Exception as e:
+            logger.error(f"Erro ao gravar trace do job {self.job_id}: {e}")
+
+
+@contextmanager
+def start_trace(job_id: str, file_path: Path = None):
+    """
+    Ativa um trace para o job no contexto atual
+
+    Args:
+        job_id: ID do job
+        file_path: Arquivo da primeira execução; as seguintes usam o próximo
+                   nome livre (trace_2.json...) e nunca sobrescrevem as anteriores
+
+    Yields:
+        Trace ativo
+    """
+    run = 1
+    if file_path:
+        run = len(run_files(file_path)) + 1
+        if run > 1:
+            file_path = Path(file_path).with_name(f"{Path(file_path).stem}_{run}{Path(file_path).suffix}")
+
+    trace = Trace(job_id, file_path, run)
+    token = _current.set((trace, None))
+
+    with _active_lock:
+        _active[job_id] = trace
+
+    # Arquivo já existe durante o job (consultado por outros processos)
+    trace.save()
+
+    try:
+        yield trace
+    finally:
+        _current.reset(token)
+        with _active_lock:
+            _active.pop(job_id, None)
+        trace.running = False
+        trace.save()
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """
+    Registra um span no trace ativo (no-op se não houver trace)
+
+    Uso:
+        with tracing.span('download', host='cdn.wavespeed.ai') as s:
+            ...
+            s.set('bytes', size)
+
+    Args:
+        name: Nome do span
+        **attributes: Atributos iniciais
+    """
+    current = _current.get()
+    if current is None:
+        yield _NOOP
+        return
+
+    trace, parent = current
+    new_span = Span(name, parent.span_id if parent else None, attributes)
+    trace.add(new_span)
+    token = _current.set((trace, new_span))
+
+    try:
+        yield new_span
+    except BaseException as e:
+        new_span.status = 'error'
+        new_span.set('error', str(e)[:300])
+        raise
+    finally:
+        new_span.end = time.time()
+        _current.reset(token)
+        if parent is None:
+            # Etapa concluída: publica o progresso para os outros processos
+            trace.save()
+
+
+def record(name: str, start: float, end: float, **attributes):
+    """
+    Registra um span já concluído (ex: tempo de fila detectado no polling)
+
+    Args:
+        name: Nome do span
+        start: Início (time.time())
+        end: Fim (time.time())
+        **attributes: Atributos do span
+    """
+    current = _current.get()
+    if current is None:
+        return
+
+    trace, parent = current
+    new_span = Span(name, parent.span_id if parent else None, attributes)
+    new_span.start = start
+    new_span.end = end
+    trace.add(new_span)
+    if parent is None:
+        trace.save()
+
+
+def current_span():
+    """Retorna o span atual (ou um span no-op)"""
+    current = _current.get()
+    if current is None or current[1] is None:
+        return _NOOP
+    return current[1]
+
+
+def wrap(func: Callable) -> Callable:
+    """
+    Propaga o trace atual para uma função executada em outra thread
+
+    Args:
+        func: Função a executar (ex: em ThreadPoolExecutor.submit)
+
+    Returns:
+        Função que roda em uma cópia do contexto atual
+    """
+    context = contextvars.copy_context()
+
+    def wrapper(*args, **kwargs):
+        return context.copy().run(func, *args, **kwargs)
+
+    return wrapper
+
+
+def get_active(job_id: str) -> Optional[Trace]:
+    """Retorna o trace em andamento de um job (ou None)"""
+    with _active_lock:
+        return _active.get(job_id)
@@ -1,14 +1,19 @@
 """
 Funções auxiliares e utilitárias
 """
+import os
+import json
 import time
 import logging
 import random
+import tempfile
 from pathlib import Path
 from functools import wraps
 from typing import List, Callable, Any
 import requests
 
+import metrics
+
 # Configuração de logging
 logging.basicConfig(
     level=logging.INFO,
@@ -19,6 +24,33 @@ def get_logger(name: str) -> logging.Logger:
     """Retorna um logger configurado"""
     return logging.getLogger(name)
 
+def write_json_atomic(file_path: Path, data: Any, indent: int = 2):
+    """
+    Grava JSON de forma atômica (arquivo temporário + rename)
+
+    Leitores concorrentes nunca veem um arquivo parcialmente escrito.
+
+    Args:
+        file_path: Caminho final do arquivo
+        data: Dados serializáveis em JSON
+        indent: Indentação do JSON
+    """
+    file_path = Path(file_path)
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+
+    fd, tmp_path = tempfile.mkstemp(
+        dir=str(file_path.parent),
+        prefix=f".{file_path.name}.",
+        suffix='.tmp'
+    )
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=indent, ensure_ascii=False)
+        os.replace(tmp_path, file_path)
+    except Exception:
+        Path(tmp_path).unlink(missing_ok=True)
+        raise
+
 def retry_with_backoff(
     max_retries: int = 3,
     base_delay: float = 1.0,
@@ -57,6 +89,7 @@ def retry_with_backoff(
                         f"Tentativa {attempt + 1}/{max_retries} falhou: {e}. "
                         f"Aguardando {delay}s antes de tentar novamente..."
                     )
+                    metrics.RETRIES.inc(operation=func.__name__)
                     time.sleep(delay)
 
             raise Exception(f"Falhou após {max_retries} tentativas")
@@ -1,13 +1,98 @@
 """
 Módulo de concatenação de vídeos usando FFmpeg
 """
+import os
+import shutil
+import struct
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from collections import Counter
 from pathlib import Path
-from typing import List, Dict
+from typing import List, Dict, Optional, Tuple
+from config import Config
 from utils import get_logger
+from mp4_boxes import movie_duration, video_frames, video_frame_rate, file_tracks, avc_profile, track_params
+from media_info import media_info
+import metrics
 
 logger = get_logger(__name__)
 
+# movflags por layout de MP4 (Config.MP4_LAYOUT)
+MP4_MOVFLAGS = {
+    'faststart': ['-movflags', '+faststart'],
+    'fragmented': ['-movflags', '+frag_keyframe+empty_moov+default_base_moof'],
+    'default': [],
+}
+
+
+# Opções do x264 que definem SPS/PPS: as janelas de transição precisam
+# repeti-las para serem emendadas por cópia aos trechos originais
+X264_STITCH_OPTIONS = (
+    'cabac', 'ref', '8x8dct', 'bframes', 'b_pyramid', 'weightp', 'keyint',
+    'keyint_min', 'psy', 'psy_rd', 'constrained_intra', 'interlaced', 'crf'
+)
+
+# profile_idc do H.264 -> pix_fmt
+AVC_PROFILE_PIX_FMT = {66: 'yuv420p', 77: 'yuv420p', 88: 'yuv420p', 100: 'yuv420p',
+                       110: 'yuv420p10le', 122: 'yuv422p', 244: 'yuv444p'}
+
+
+def x264_options(video_path: Path, scan_bytes: int = 2 * 1024 * 1024) -> Dict[str, str]:
+    """
+    Opções de encode gravadas pelo x264 no SEI do início do stream
+
+    Returns:
+        Dict opção -> valor (vazio se o vídeo não foi gerado pelo x264)
+    """
+    with open(video_path, 'rb') as f:
+        data = f.read(scan_bytes)
+
+    start = data.find(b'x264 - core')
+    if start < 0:
+        return {}
+    end = data.find(b'\x00', start)
+    text = data[start:end if end > 0 else None].decode('latin-1')
+
+    _, _, options = text.partition(' - options: ')
+    return dict(item.split('=', 1) for item in options.split() if '=' in item)
+
+
+def moov_before_mdat(video_path: Path) -> Optional[bool]:
+    """
+    Verifica se o índice (moov) de um MP4 vem antes dos dados (mdat)
+
+    Lê apenas os cabeçalhos dos atoms de primeiro nível (sem ler o conteúdo).
+
+    Returns:
+        True se o moov vem primeiro (ou o arquivo é fragmentado), False se
+        vem depois, None se a estrutura não puder ser lida
+    """
+    try:
+        with open(video_path, 'rb') as f:
+            while True:
+                header = f.read(8)
+                if len(header) < 8:
+                    return None
+
+                size, kind = struct.unpack('>I4s', header)
+                if size == 1:
+                    size = struct.unpack('>Q', f.read(8))[0]
+                    consumed = 16
+                else:
+                    consumed = 8
+
+                if kind in (b'moov', b'moof'):
+                    return True
+                if kind == b'mdat':
+                    return False
+                if size == 0:
+                    # Atom vai até o fim do arquivo
+                    return None
+
+                f.seek(size - consumed, os.SEEK_CUR)
+    except (OSError, struct.error):
+        return None
+
 class VideoConcatenator:
     """Concatena múltiplos vídeos usando FFmpeg"""
 
@@ -41,6 +126,52 @@ class VideoConcatenator:
         except Exception as e:
             raise Exception(f"Erro ao verificar FFmpeg: {e}")
 
+    def _movflags(self) -> List[str]:
+        """Argumentos de muxing para o layout configurado (Config.MP4_LAYOUT)"""
+        return MP4_MOVFLAGS.get(Config.MP4_LAYOUT, MP4_MOVFLAGS['faststart'])
+
+    def optimize_for_web(self, video_path: Path) -> Path:
+        """
+        Garante que o MP4 possa começar a tocar sem baixar o arquivo inteiro
+
+        Se o índice (moov) estiver no fim do arquivo, faz um remux rápido
+        (-c copy) movendo-o para o início. Arquivos já otimizados não são
+        reescritos.
+
+        Args:
+            video_path: Path do vídeo
+
+        Returns:
+            Path do vídeo (o mesmo arquivo)
+        """
+        if Config.MP4_LAYOUT == 'default' or moov_before_mdat(video_path) is not False:
+            return video_path
+
+        logger.info(f"Movendo índice do MP4 para o início: {video_path.name}")
+
+        temp_path = video_path.with_name(f"{video_path.stem}.web{video_path.suffix}")
+        cmd = [
+            'ffmpeg',
+            '-i', str(video_path),
+            '-map', '0',
+            '-c', 'copy',
+            *self._movflags(),
+            '-y',
+            str(temp_path)
+        ]
+
+        with metrics.track('concat', 'ffmpeg'):
+            result = subprocess.run(cmd, capture_output=True, text=True, timeout=300)
+
+        if result.returncode != 0:
+            # O vídeo continua válido, apenas sem faststart
+            temp_path.unlink(missing_ok=True)
+            logger.warning(f"Remux para web falhou, mantendo original: {result.stderr[-500:]}")
+            return video_path
+
+        os.replace(temp_path, video_path)
+        return video_path
+
     def concatenate_videos(
         self,
         video_paths: List[Path],
@@ -76,6 +207,11 @@ class VideoConcatenator:
                 if not video_path.exists():
                     raise Exception(f"Vídeo não encontrado: {video_path}")
 
+            # Clipes com parâmetros de stream fora do padrão são re-encodados
+            # para que a concatenação continue sendo uma cópia
+            normalized_dir = output_path.parent / 'normalized'
+            video_paths = self.normalize_streams(video_paths, normalized_dir, progress_callback)
+
             # Cria arquivo de lista para FFmpeg
             list_file = output_path.parent / 'concat_list.txt'
 
@@ -105,8 +241,12 @@ class VideoConcatenator:
                     progress_callback
                 )
 
-            # Remove arquivo temporário
+            # Remove arquivos temporários
             list_file.unlink(missing_ok=True)
+            shutil.rmtree(normalized_dir, ignore_errors=True)
+
+            # Índice no início: o player começa sem buscar o fim do arquivo
+            self.optimize_for_web(output_path)
 
             logger.info(f"Vídeo final gerado: {output_path}")
 
@@ -116,6 +256,141 @@ class VideoConcatenator:
             logger.error(f"Erro ao concatenar vídeos: {e}")
             raise
 
+    def normalize_streams(self, video_paths: List[Path], work_dir: Path, progress_callback=None) -> List[Path]:
+        """
+        Garante que todos os clipes tenham os mesmos parâmetros de stream
+
+        A assinatura de cada clipe (codec, resolução, timescale, configuração
+        do decoder, canais/taxa do áudio) é lida em paralelo direto do moov.
+        O perfil mais comum vira a referência e só os clipes diferentes são
+        re-encodados (em paralelo) para ele.
+
+        Args:
+            video_paths: Clipes na ordem final
+            work_dir: Pasta para os clipes re-encodados
+            progress_callback: Função de callback para progresso
+
+        Returns:
+            Lista de clipes (na mesma ordem) prontos para concatenação por cópia
+        """
+        if len(video_paths) < 2:
+            return video_paths
+
+        with ThreadPoolExecutor(max_workers=min(len(video_paths), 8)) as executor:
+            signatures = list(executor.map(self._stream_signature, video_paths))
+
+        counts = Counter(signature for signature in signatures if signature is not None)
+        if not counts:
+            logger.warning("Normalização: nenhum clipe pôde ser analisado")
+            return video_paths
+
+        reference_signature = counts.most_common(1)[0][0]
+        if counts[reference_signature] == len(video_paths):
+            return video_paths
+
+        reference = video_paths[signatures.index(reference_signature)]
+        outliers = [i for i, signature in enumerate(signatures) if signature != reference_signature]
+
+        logger.info(
+            f"Normalização: {len(outliers)} de {len(video_paths)} clipes fora do perfil "
+            f"de {reference.name}; re-encodando"
+        )
+        if progress_callback:
+            progress_callback(f"Ajustando {len(outliers)} clipes ao formato dos demais...")
+
+        work_dir.mkdir(parents=True, exist_ok=True)
+        normalized = list(video_paths)
+
+        with ThreadPoolExecutor(max_workers=min(len(outliers), os.cpu_count() or 2)) as executor:
+            futures = {
+                i: executor.submit(
+                    self._normalize_clip, video_paths[i], reference, work_dir / f'{i + 1:03d}_{video_paths[i].name}'
+                )
+                for i in outliers
+            }
+            for i, future in futures.items():
+                normalized[i] = future.result()
+                if self._stream_signature(normalized[i]) != reference_signature:
+                    logger.warning(f"Normalização: {video_paths[i].name} ainda difere da referência")
+
+        return normalized
+
+    @staticmethod
+    def _stream_signature(video_path: Path) -> Optional[tuple]:
+        """Parâmetros de stream que precisam coincidir para concatenar por cópia"""
+        try:
+            return tuple(sorted(file_tracks(video_path).values()))
+        except (OSError, ValueError, struct.error) as e:
+            logger.warning(f"Não foi possível analisar {video_path.name}: {e}")
+            return None
+
+    def _normalize_clip(self, video_path: Path, reference: Path, output_path: Path) -> Path:
+        """Re-encoda um clipe com os parâmetros de stream da referência"""
+        tracks = [track_params(*track) for track in file_tracks(reference).values()]
+        video = next((t for t in tracks if 'width' in t), None)
+        audio = next((t for t in tracks if 'sample_rate' in t), None)
+
+        cmd = ['ffmpeg', '-i', str(video_path)]
+        if audio:
+            # Clipe sem áudio recebe silêncio para manter as trilhas iguais
+            layout = 'mono' if audio['channels'] == 1 else 'stereo'
+            cmd += ['-f', 'lavfi', '-i', f"anullsrc=r={audio['sample_rate']}:cl={layout}"]
+
+        if video:
+            encoder, pix_fmt = self._x264_encoder(reference)
+            width, height = video['width'], video['height']
+            cmd += [
+                '-map', '0:v:0',
+                '-vf', (
+                    f'scale={width}:{height}:force_original_aspect_ratio=decrease,'
+                    f'pad={width}:{height}:(ow-iw)/2:(oh-ih)/2,setsar=1,format={pix_fmt}'
+                ),
+                *encoder,
+                '-video_track_timescale', str(video['timescale']),
+            ]
+            frame_rate = video_frame_rate(reference)
+            if frame_rate:
+                cmd += ['-r', f'{frame_rate.numerator}/{frame_rate.denominator}']
+
+        if audio:
+            cmd += [
+                '-map', '0:a:0?' if self._has_audio(video_path) else '1:a:0',
+                '-c:a', 'aac',
+                '-ar', str(audio['sample_rate']),
+                '-ac', str(audio['channels']),
+                '-shortest',
+            ]
+
+        cmd += [*self._movflags(), '-y', str(output_path)]
+        self._run_ffmpeg(cmd, timeout=600)
+
+        return output_path
+
+    @staticmethod
+    def _has_audio(video_path: Path) -> bool:
+        try:
+            return any('sample_rate' in track_params(*track) for track in file_tracks(video_path).values())
+        except (OSError, ValueError, struct.error):
+            return True
+
+    @staticmethod
+    def _x264_encoder(reference: Path) -> Tuple[List[str], str]:
+        """
+        Argumentos de encode que reproduzem os parâmetros de codec da referência
+
+        Returns:
+            (argumentos do encoder, pix_fmt)
+        """
+        pix_fmt = AVC_PROFILE_PIX_FMT.get(avc_profile(reference), 'yuv420p')
+        options = x264_options(reference)
+        if options.get('rc') not in (None, 'crf'):
+            options.pop('crf', None)
+        x264_params = ':'.join(
+            f"{key.replace('_', '-')}={options[key]}" for key in X264_STITCH_OPTIONS if key in options
+        )
+        encoder = ['-c:v', 'libx264'] + (['-x264-params', x264_params] if x264_params else [])
+        return encoder, pix_fmt
+
     def _concatenate_simple(
         self,
         list_file: Path,
@@ -143,6 +418,7 @@ class VideoConcatenator:
                 '-safe', '0',
                 '-i', str(list_file),
                 '-c', 'copy',  # Copia streams sem re-encoding (mais rápido)
+                *self._movflags(),  # faststart/fMP4 para reprodução imediata
                 '-y',  # Sobrescreve arquivo de saída
                 str(output_path)
             ]
@@ -152,12 +428,13 @@ class VideoConcatenator:
             if progress_callback:
                 progress_callback("Processando concatenação (modo rápido)...")
 
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=300  # 5 minutos timeout
-            )
+            with metrics.track('concat', 'ffmpeg'):
+                result = subprocess.run(
+                    cmd,
+                    capture_output=True,
+                    text=True,
+                    timeout=300  # 5 minutos timeout
+                )
 
             if result.returncode != 0:
                 logger.error(f"STDERR: {result.stderr}")
@@ -181,7 +458,12 @@ class VideoConcatenator:
         progress_callback=None
     ) -> Path:
         """
-        Concatenação com transições de fade
+        Concatenação com transições de fade (crossfade)
+
+        Re-encoda apenas as janelas em torno de cada emenda (alinhadas a
+        keyframes) e copia o resto dos clipes sem re-encoding. Se isso não
+        for possível, re-encoda a timeline inteira; se ainda assim falhar,
+        concatena sem transições.
 
         Args:
             video_paths: Lista de vídeos
@@ -192,57 +474,23 @@ class VideoConcatenator:
         Returns:
             Path do vídeo gerado
         """
+        work_dir = output_path.parent / 'transitions'
+
         try:
             logger.info(f"Usando concatenação com transições (fade de {transition_duration}s)")
 
             if progress_callback:
                 progress_callback("Processando concatenação com transições...")
 
-            # Para transições, precisamos re-encodar
-            # Primeiro, concatenamos sem transições
-            temp_concat = output_path.parent / 'temp_concat.mp4'
-
-            # Cria arquivo de lista temporário
-            list_file = output_path.parent / 'concat_list_temp.txt'
-
-            with open(list_file, 'w') as f:
-                for video_path in video_paths:
-                    abs_path = video_path.resolve()
-                    escaped_path = str(abs_path).replace("'", "'\\''")
-                    f.write(f"file '{escaped_path}'\n")
-
-            # Concatenação base
-            cmd_concat = [
-                'ffmpeg',
-                '-f', 'concat',
-                '-safe', '0',
-                '-i', str(list_file),
-                '-c', 'copy',
-                '-y',
-                str(temp_concat)
-            ]
-
-            logger.info("Executando concatenação base...")
-
-            result = subprocess.run(
-                cmd_concat,
-                capture_output=True,
-                text=True,
-                timeout=300
-            )
-
-            if result.returncode != 0:
-                raise Exception(f"Concatenação base falhou: {result.stderr}")
-
-            # Para simplificar, usamos o vídeo concatenado sem transições elaboradas
-            # (Implementar transições de fade entre múltiplos vídeos é muito complexo com FFmpeg)
-            # Em produção, considere usar bibliotecas como moviepy para isso
+            work_dir.mkdir(parents=True, exist_ok=True)
 
-            import shutil
-            shutil.move(str(temp_concat), str(output_path))
-
-            # Cleanup
-            list_file.unlink(missing_ok=True)
+            try:
+                self._smart_crossfade(video_paths, output_path, transition_duration, work_dir)
+            except Exception as e:
+                logger.warning(f"Transições com re-encode parcial indisponíveis ({e}); re-encodando a timeline inteira")
+                if progress_callback:
+                    progress_callback("Re-encodando vídeo com transições...")
+                self._full_crossfade(video_paths, output_path, transition_duration)
 
             logger.info("Concatenação com transições concluída")
 
@@ -252,11 +500,172 @@ class VideoConcatenator:
             logger.error(f"Erro na concatenação com transições: {e}")
             # Fallback para concatenação simples
             logger.warning("Fallback para concatenação simples")
-            return self._concatenate_simple(list_file, output_path, progress_callback)
+            return self._concatenate_simple(output_path.parent / 'concat_list.txt', output_path, progress_callback)
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    def _smart_crossfade(self, video_paths: List[Path], output_path: Path, fade: float, work_dir: Path):
+        """
+        Crossfade re-encodando só as emendas
+
+        Para cada emenda entre os clipes i e i+1 é gerada uma janela que vai
+        do último keyframe de i antes do fade até o primeiro keyframe de i+1
+        depois dele. O trecho entre janelas é copiado (-c copy). O áudio é
+        re-encodado inteiro (barato) com acrossfade.
+
+        Raises:
+            Exception: Se os keyframes ou os parâmetros de codec não permitirem
+        """
+        durations = [movie_duration(path) for path in video_paths]
+        frames = [video_frames(path) for path in video_paths]
+        keyframes = [[time for time, keyframe in clip if keyframe] for clip in frames]
+
+        # Trecho copiado de cada clipe: [heads[i], tails[i])
+        heads = [0.0] * len(video_paths)
+        tails = list(durations)
+        for i in range(len(video_paths) - 1):
+            tail = [k for k in keyframes[i] if k <= durations[i] - fade]
+            head = [k for k in keyframes[i + 1] if k >= fade]
+            if not tail or not head:
+                raise Exception(f"sem keyframe utilizável na emenda {i + 1}")
+            tails[i] = max(tail)
+            heads[i + 1] = min(head)
+
+        for i, (head, tail) in enumerate(zip(heads, tails)):
+            if head > tail:
+                raise Exception(f"clipe {i + 1} curto demais para as transições")
+
+        # Encoder das janelas com os mesmos parâmetros de stream dos clipes
+        encoder, pix_fmt = self._x264_encoder(video_paths[0])
+
+        # Janelas re-encodadas (em paralelo) e áudio com acrossfade
+        windows = [work_dir / f'window_{i + 1:03d}.mp4' for i in range(len(video_paths) - 1)]
+        audio_path = work_dir / 'audio.m4a'
+
+        jobs = [
+            (self._run_ffmpeg, [
+                'ffmpeg',
+                '-ss', f'{tails[i]:.6f}', '-i', str(video_paths[i]),
+                '-t', f'{heads[i + 1]:.6f}', '-i', str(video_paths[i + 1]),
+                '-filter_complex',
+                # -ss/-t na entrada: os dois trechos já começam em zero
+                f'[0:v][1:v]xfade=transition=fade:duration={fade}:offset={durations[i] - tails[i] - fade:.6f},'
+                f'format={pix_fmt}[v]',
+                '-map', '[v]',
+                *encoder,
+                '-an',
+                '-y', str(window)
+            ])
+            for i, window in enumerate(windows)
+        ]
+        jobs.append((self._run_ffmpeg, self._acrossfade_command(video_paths, fade, audio_path)))
+
+        with ThreadPoolExecutor(max_workers=min(len(jobs), os.cpu_count() or 2)) as executor:
+            for future in [executor.submit(func, cmd) for func, cmd in jobs]:
+                future.result()
+
+        # Trechos copiados. O corte é por número de frames: com B-frames, -t
+        # (comparado ao DTS) deixaria passar frames posteriores ao keyframe
+        pieces = []
+        for i, path in enumerate(video_paths):
+            count = sum(1 for time, _ in frames[i] if heads[i] - 0.0005 <= time < tails[i] - 0.0005)
+            if count:
+                piece = work_dir / f'copy_{i + 1:03d}.mp4'
+                self._run_ffmpeg([
+                    'ffmpeg',
+                    '-ss', f'{heads[i]:.6f}', '-i', str(path),
+                    '-frames:v', str(count),
+                    '-map', '0:v:0',
+                    '-c', 'copy',
+                    '-avoid_negative_ts', 'make_zero',
+                    '-y', str(piece)
+                ])
+                pieces.append(piece)
+            if i < len(windows):
+                pieces.append(windows[i])
+
+        # As janelas só podem ser emendadas por cópia se o codec for idêntico
+        signatures = {tuple(file_tracks(piece).values()) for piece in pieces}
+        if len(signatures) != 1:
+            raise Exception("parâmetros de codec das janelas diferem dos clipes")
+
+        list_file = work_dir / 'pieces.txt'
+        with open(list_file, 'w') as f:
+            for piece in pieces:
+                escaped_path = str(piece.resolve()).replace("'", "'\\''")
+                f.write(f"file '{escaped_path}'\n")
+
+        video_path = work_dir / 'video.mp4'
+        self._run_ffmpeg([
+            'ffmpeg', '-f', 'concat', '-safe', '0', '-i', str(list_file),
+            '-c', 'copy', '-y', str(video_path)
+        ])
+
+        self._run_ffmpeg([
+            'ffmpeg', '-i', str(video_path), '-i', str(audio_path),
+            '-map', '0:v:0', '-map', '1:a:0',
+            '-c', 'copy',
+            *self._movflags(),
+            '-y', str(output_path)
+        ])
+
+        logger.info(f"Transições: {len(windows)} janelas re-encodadas, {len(pieces) - len(windows)} trechos copiados")
+
+    def _full_crossfade(self, video_paths: List[Path], output_path: Path, fade: float):
+        """Crossfade re-encodando a timeline inteira (xfade + acrossfade encadeados)"""
+        durations = [movie_duration(path) for path in video_paths]
+
+        cmd = ['ffmpeg']
+        for path in video_paths:
+            cmd += ['-i', str(path)]
+
+        filters = []
+        label = '[0:v]'
+        elapsed = durations[0]
+        for i in range(1, len(video_paths)):
+            offset = elapsed - fade
+            filters.append(f'{label}[{i}:v]xfade=transition=fade:duration={fade}:offset={offset:.6f}[v{i}]')
+            label = f'[v{i}]'
+            elapsed = offset + durations[i]
+
+        audio_filters, audio_label = self._acrossfade_filters(len(video_paths), fade)
+
+        cmd += [
+            '-filter_complex', ';'.join(filters + audio_filters),
+            '-map', label, '-map', audio_label,
+            '-c:v', 'libx264', '-c:a', 'aac',
+            *self._movflags(),
+            '-y', str(output_path)
+        ]
+        self._run_ffmpeg(cmd, timeout=3600)
+
+    @staticmethod
+    def _acrossfade_filters(count: int, fade: float):
+        """Cadeia de acrossfade entre count entradas; retorna (filtros, rótulo final)"""
+        filters = []
+        label = '[0:a]'
+        for i in range(1, count):
+            filters.append(f'{label}[{i}:a]acrossfade=d={fade}[a{i}]')
+            label = f'[a{i}]'
+        return filters, label
+
+    def _acrossfade_command(self, video_paths: List[Path], fade: float, audio_path: Path) -> List[str]:
+        cmd = ['ffmpeg']
+        for path in video_paths:
+            cmd += ['-i', str(path)]
+        filters, label = self._acrossfade_filters(len(video_paths), fade)
+        return cmd + ['-filter_complex', ';'.join(filters), '-map', label, '-c:a', 'aac', '-y', str(audio_path)]
+
+    def _run_ffmpeg(self, cmd: List[str], timeout: int = 300):
+        """Executa o FFmpeg e levanta Exception com o stderr em caso de erro"""
+        with metrics.track('concat', 'ffmpeg'):
+            result = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout)
+        if result.returncode != 0:
+            raise Exception(f"FFmpeg falhou: {result.stderr[-500:]}")
 
     def get_video_info(self, video_path: Path) -> Dict:
         """
-        Obtém informações sobre um vídeo
+        Obtém informações sobre um vídeo (em cache; ver media_info)
 
         Args:
             video_path: Path do vídeo
@@ -264,52 +673,7 @@ class VideoConcatenator:
         Returns:
             Dict com informações do vídeo
         """
-        try:
-            cmd = [
-                'ffprobe',
-                '-v', 'quiet',
-                '-print_format', 'json',
-                '-show_format',
-                '-show_streams',
-                str(video_path)
-            ]
-
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=30
-            )
-
-            if result.returncode != 0:
-                raise Exception(f"ffprobe falhou: {result.stderr}")
-
-            import json
-            data = json.loads(result.stdout)
-
-            # Extrai informações relevantes
-            video_info = {
-                'duration': float(data.get('format', {}).get('duration', 0)),
-                'size': int(data.get('format', {}).get('size', 0)),
-                'format': data.get('format', {}).get('format_name', 'unknown'),
-            }
-
-            # Busca stream de vídeo
-            for stream in data.get('streams', []):
-                if stream.get('codec_type') == 'video':
-                    video_info.update({
-                        'width': stream.get('width', 0),
-                        'height': stream.get('height', 0),
-                        'fps': eval(stream.get('r_frame_rate', '0/1')),
-                        'codec': stream.get('codec_name', 'unknown')
-                    })
-                    break
-
-            return video_info
-
-        except Exception as e:
-            logger.error(f"Erro ao obter info do vídeo: {e}")
-            return {}
+        return media_info.probe(video_path)
 
 def test_video_concatenator():
     """Função de teste do concatenador"""
@@ -1,20 +1,37 @@
 """
 Módulo de geração de vídeo com lip-sync usando WaveSpeed Wan 2.2 API
 """
+import json
 import time
+import functools
+import threading
 import requests
 from pathlib import Path
 from typing import List, Dict, Optional
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait, FIRST_COMPLETED
 from config import Config
 from utils import get_logger, retry_with_backoff, select_random_image
+from downloader import download_file
+from mp4_boxes import verify_mp4
+from media_info import media_info
+from hedging import hedge_policy
+from image_derivatives import image_derivatives
+from render_model import PollSchedule, render_model
+import metrics
+import tracing
+from urllib.parse import urlparse
 
 logger = get_logger(__name__)
 
+
+class PollCancelled(Exception):
+    """Polling interrompido (outra tarefa do mesmo clipe terminou antes)"""
+
+
 class WaveSpeedClient:
     """Cliente para WaveSpeed API"""
 
-    BASE_URL = "https://api.wavespeed.ai/api/v3"
+    BASE_URL = Config.WAVESPEED_BASE_URL
 
     def __init__(self, api_key: str):
         """
@@ -62,15 +79,17 @@ class WaveSpeedClient:
             }
 
             logger.info(f"Submetendo tarefa: {endpoint}")
+            tracing.current_span().incr('attempts')
 
-            response = self.session.post(
-                endpoint,
-                headers=self._headers(),
-                json=payload,
-                timeout=30
-            )
+            with metrics.track('submit', 'wavespeed'):
+                response = self.session.post(
+                    endpoint,
+                    headers=self._headers(),
+                    json=payload,
+                    timeout=30
+                )
 
-            response.raise_for_status()
+                response.raise_for_status()
 
             data = response.json()
 
@@ -96,23 +115,40 @@ class WaveSpeedClient:
             logger.error(f"Erro ao submeter tarefa: {e}")
             raise
 
-    def poll_result(self, request_id: str, poll_interval: float = None, poll_timeout: float = None) -> dict:
+    def poll_result(
+        self,
+        request_id: str,
+        poll_interval: float = None,
+        poll_timeout: float = None,
+        cancel: threading.Event = None,
+        audio_seconds: float = None,
+        resolution: str = None
+    ) -> dict:
         """
         Faz polling até obter resultado da tarefa
 
         Args:
             request_id: ID da tarefa
-            poll_interval: Intervalo entre polls em segundos
+            poll_interval: Intervalo fixo entre polls em segundos (padrão: agenda adaptativa)
             poll_timeout: Timeout total em segundos
+            cancel: Evento que interrompe o polling (hedging)
+            audio_seconds: Duração do áudio (prevê a conclusão)
+            resolution: Resolução do vídeo (prevê a conclusão)
 
         Returns:
             Dict com dados do resultado
 
         Raises:
+            PollCancelled: Se cancel foi acionado
             Exception: Se polling falhar ou timeout
         """
-        if poll_interval is None:
-            poll_interval = Config.POLL_INTERVAL
+        cancel = cancel or threading.Event()
+
+        def sleep(seconds: float):
+            if cancel.wait(seconds):
+                raise PollCancelled(f"Polling da tarefa {request_id} cancelado")
+
+        schedule = PollSchedule(audio_seconds, resolution, poll_interval=poll_interval)
 
         if poll_timeout is None:
             poll_timeout = Config.POLL_TIMEOUT
@@ -122,12 +158,17 @@ class WaveSpeedClient:
 
         logger.info(f"Iniciando polling para tarefa {request_id}")
 
-        # Aguarda 15 segundos antes do primeiro poll (API precisa de tempo para processar)
-        logger.info("Aguardando 15s antes do primeiro poll (API processando)...")
-        time.sleep(15)
+        # Aguarda antes do primeiro poll (API precisa de tempo para processar)
+        delay = schedule.first_delay()
+        logger.info(
+            f"Aguardando {delay:.0f}s antes do primeiro poll (API processando"
+            + (f", conclusão prevista entre {schedule.low:.0f}s e {schedule.high:.0f}s)..." if schedule.adaptive else ")...")
+        )
+        sleep(delay)
 
         poll_count = 0
         max_connection_errors = 5
+        processing_since = None  # quando a tarefa saiu da fila
 
         while True:
             poll_count += 1
@@ -148,8 +189,19 @@ class WaveSpeedClient:
 
                 logger.info(f"Status da tarefa {request_id}: {status}")
 
+                if status == "processing" and processing_since is None:
+                    processing_since = time.time()
+
                 if status == "completed":
                     logger.info(f"✅ Tarefa {request_id} concluída com sucesso")
+
+                    # Separa tempo de fila e de render no trace do job
+                    now = time.time()
+                    render_start = processing_since or start_time
+                    if processing_since:
+                        tracing.record('queue', start_time, processing_since, request_id=request_id)
+                    tracing.record('render', render_start, now, request_id=request_id, polls=poll_count)
+
                     return data["data"]
 
                 elif status == "failed":
@@ -162,8 +214,9 @@ class WaveSpeedClient:
                     raise Exception(f"Timeout após {poll_timeout}s aguardando resultado")
 
                 # Aguarda antes do próximo poll
-                logger.info(f"Aguardando {poll_interval}s antes do próximo poll...")
-                time.sleep(poll_interval)
+                delay = schedule.next_delay(elapsed)
+                logger.info(f"Aguardando {delay:.1f}s antes do próximo poll...")
+                sleep(delay)
 
             except requests.exceptions.ConnectionError as e:
                 logger.warning(f"⚠️  Erro de conexão no poll #{poll_count}: {e}")
@@ -176,21 +229,27 @@ class WaveSpeedClient:
 
                 # Aguarda mais tempo antes de tentar novamente
                 logger.info("Aguardando 10s devido a erro de conexão...")
-                time.sleep(10)
+                metrics.RETRIES.inc(operation='poll_result')
+                sleep(10)
                 continue
 
             except requests.HTTPError as e:
                 if e.response.status_code == 429:
                     logger.warning("Rate limit no polling, aguardando 30s...")
-                    time.sleep(30)
+                    metrics.RETRIES.inc(operation='poll_result')
+                    sleep(30)
                     continue
                 elif e.response.status_code >= 500:
                     logger.warning(f"Erro do servidor ({e.response.status_code}), aguardando 15s...")
-                    time.sleep(15)
+                    metrics.RETRIES.inc(operation='poll_result')
+                    sleep(15)
                     continue
                 else:
                     raise
 
+            except PollCancelled:
+                raise
+
             except Exception as e:
                 logger.error(f"Erro inesperado no polling: {type(e).__name__}: {e}")
                 raise
@@ -199,7 +258,8 @@ class WaveSpeedClient:
         self,
         audio_url: str,
         image_url: str,
-        resolution: str = "480p"
+        resolution: str = "480p",
+        audio_seconds: float = None
     ) -> str:
         """
         Pipeline completo: submete + aguarda + retorna URL do vídeo
@@ -208,6 +268,7 @@ class WaveSpeedClient:
             audio_url: URL pública do áudio
             image_url: URL pública da imagem
             resolution: Resolução do vídeo
+            audio_seconds: Duração do áudio (referência para detectar render lento)
 
         Returns:
             URL do vídeo gerado
@@ -215,8 +276,12 @@ class WaveSpeedClient:
         Raises:
             Exception: Se o processamento falhar
         """
-        request_id = self.submit_task(audio_url, image_url, resolution)
-        result = self.poll_result(request_id)
+        with tracing.span('submit', host=urlparse(self.BASE_URL).hostname, resolution=resolution):
+            request_id = self.submit_task(audio_url, image_url, resolution)
+
+        # Tempo de fila + render até a detecção da conclusão
+        with metrics.track('render', 'wavespeed'):
+            result = self._await_render(request_id, audio_url, image_url, resolution, audio_seconds)
 
         outputs = result.get("outputs", [])
         if not outputs:
@@ -224,6 +289,86 @@ class WaveSpeedClient:
 
         return outputs[0]
 
+    def _await_render(
+        self,
+        request_id: str,
+        audio_url: str,
+        image_url: str,
+        resolution: str,
+        audio_seconds: Optional[float]
+    ) -> dict:
+        """
+        Aguarda a tarefa; se ela demorar além do esperado, submete uma duplicata
+
+        Vale o primeiro resultado concluído; o polling da outra tarefa é
+        cancelado (a API não tem cancelamento, o render dela é ignorado).
+        """
+        submitted_at = time.time()
+        threshold = hedge_policy.threshold(audio_seconds, resolution) if Config.HEDGE_ENABLED else None
+        poll = functools.partial(self.poll_result, audio_seconds=audio_seconds, resolution=resolution)
+
+        if threshold is None:
+            result = poll(request_id)
+            render_model.record(time.time() - submitted_at, audio_seconds, resolution)
+            return result
+
+        cancel = threading.Event()
+        executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='wavespeed-poll')
+
+        try:
+            primary = executor.submit(tracing.wrap(poll), request_id, cancel=cancel)
+
+            done, _ = wait([primary], timeout=threshold)
+            if done or not hedge_policy.try_acquire():
+                result = primary.result()
+                render_model.record(time.time() - submitted_at, audio_seconds, resolution)
+                return result
+
+            logger.warning(
+                f"Tarefa {request_id} passou de {threshold:.0f}s (p{hedge_policy.percentile:.0f}); "
+                "submetendo duplicata"
+            )
+            try:
+                with tracing.span('hedge', request_id=request_id, after_s=round(threshold, 1)):
+                    hedge_id = self.submit_task(audio_url, image_url, resolution)
+            except Exception as e:
+                logger.warning(f"Falha ao submeter duplicata: {e}; aguardando a tarefa original")
+                result = primary.result()
+                render_model.record(time.time() - submitted_at, audio_seconds, resolution)
+                return result
+
+            metrics.HEDGES.inc(outcome='submitted')
+            hedge = executor.submit(tracing.wrap(poll), hedge_id, cancel=cancel)
+
+            pending = {primary, hedge}
+            error = None
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        # Uma das duas falhou: ainda vale a outra
+                        error = error or e
+                        continue
+
+                    metrics.HEDGES.inc(outcome='won' if future is hedge else 'lost')
+                    # Sempre o tempo da tarefa original (exato se ela venceu, limite inferior
+                    # se a duplicata venceu): o tempo da duplicata esconderia a cauda lenta
+                    # que o percentil do hedge estima
+                    render_model.record(time.time() - submitted_at, audio_seconds, resolution)
+                    logger.info(
+                        f"Render {'da duplicata' if future is hedge else 'original'} terminou primeiro "
+                        f"(tarefa {request_id})"
+                    )
+                    return result
+
+            raise error
+
+        finally:
+            cancel.set()
+            executor.shutdown(wait=False)
+
 class FileUploader:
     """Classe para upload de arquivos para serviços temporários"""
 
@@ -441,13 +586,64 @@ class VideoGenerator:
         self.uploader = FileUploader()
         logger.info("VideoGenerator inicializado")
 
+    def assign_images(self, audios: List[Dict], image_paths: List[Path], output_dir: Path) -> Dict[int, Path]:
+        """
+        Coloca as imagens no job e escolhe a imagem de cada clipe
+
+        Cada imagem entra como o derivado do tamanho de DEFAULT_RESOLUTION
+        (image_derivatives), por hardlink.
+
+        A escolha é aleatória (evitando repetir a imagem do clipe anterior) e
+        fica gravada em images/assignment.json: rascunho, render final e
+        retry do mesmo job usam a mesma imagem em cada clipe.
+
+        Args:
+            audios: Lista de dicts dos áudios ({'audio_number', ...})
+            image_paths: Imagens disponíveis
+            output_dir: Diretório do job
+
+        Returns:
+            Dict número do clipe -> imagem (cópia na pasta do job)
+        """
+        images_dir = output_dir / 'images'
+        images_dir.mkdir(parents=True, exist_ok=True)
+
+        # Derivados em cache, ligados à pasta do job
+        image_pool = []
+        for idx, img_path in enumerate(image_paths, start=1):
+            dest = images_dir / f"image_{idx}.jpg"
+            if not dest.exists():
+                dest = image_derivatives.link(img_path, dest, Config.DEFAULT_RESOLUTION)
+            image_pool.append(dest)
+
+        assignment_file = images_dir / 'assignment.json'
+        assigned = {}
+        if assignment_file.exists():
+            with open(assignment_file, 'r', encoding='utf-8') as f:
+                assigned = {int(number): images_dir / name for number, name in json.load(f).items()}
+
+        used_images = []
+        for audio_data in sorted(audios, key=lambda a: a['audio_number']):
+            number = audio_data['audio_number']
+            if number not in assigned or not assigned[number].exists():
+                # Seleciona imagem aleatória (evita repetições consecutivas)
+                assigned[number] = select_random_image(image_pool, used_images)
+            used_images.append(assigned[number])
+
+        with open(assignment_file, 'w', encoding='utf-8') as f:
+            json.dump({str(number): path.name for number, path in sorted(assigned.items())}, f, indent=2)
+
+        return assigned
+
     def generate_videos_batch(
         self,
         audios: List[Dict],
         image_paths: List[Path],
         output_dir: Path,
         progress_callback=None,
-        max_workers: int = 3
+        max_workers: int = 3,
+        on_video_ready=None,
+        reuse_existing: bool = False
     ) -> List[Dict]:
         """
         Gera múltiplos vídeos com lip-sync
@@ -459,6 +655,10 @@ class VideoGenerator:
             output_dir: Diretório para salvar vídeos
             progress_callback: Função de callback para progresso
             max_workers: Número máximo de workers paralelos
+            on_video_ready: Chamado com o dict de cada vídeo assim que ele termina
+                            (em qualquer ordem; com 'error' se falhou)
+            reuse_existing: Se True, clipes já baixados (e íntegros) em output_dir
+                            não são renderizados de novo (retry de job)
 
         Returns:
             Lista de dicts com informações dos vídeos gerados
@@ -478,22 +678,11 @@ class VideoGenerator:
         video_dir = output_dir / 'videos'
         video_dir.mkdir(parents=True, exist_ok=True)
 
-        images_dir = output_dir / 'images'
-        images_dir.mkdir(parents=True, exist_ok=True)
-
-        # Copia imagens para diretório do job
-        image_pool = []
-        for idx, img_path in enumerate(image_paths, start=1):
-            dest = images_dir / f"image_{idx}{Path(img_path).suffix}"
-            if not dest.exists():
-                import shutil
-                shutil.copy2(img_path, dest)
-            image_pool.append(dest)
+        images = self.assign_images(audios, image_paths, output_dir)
 
         results = []
-        used_images = []
 
-        def generate_single_video(audio_data: Dict) -> Dict:
+        def render_single_video(audio_data: Dict) -> Dict:
             """Gera um único vídeo"""
             video_number = audio_data['audio_number']
             audio_path = audio_data['audio_path']
@@ -501,9 +690,22 @@ class VideoGenerator:
             if not audio_path or not audio_path.exists():
                 raise Exception(f"Áudio não encontrado: {audio_path}")
 
-            # Seleciona imagem aleatória (evita repetições consecutivas)
-            image_path = select_random_image(image_pool, used_images)
-            used_images.append(image_path)
+            video_path = video_dir / f'video_{video_number}.mp4'
+
+            if reuse_existing and video_path.exists():
+                try:
+                    verify_mp4(video_path)
+                    logger.info(f"Vídeo {video_number} reaproveitado de: {video_path}")
+                    return {
+                        'video_number': video_number,
+                        'audio_path': audio_path,
+                        'image_path': images[video_number],
+                        'video_path': video_path
+                    }
+                except (OSError, ValueError) as e:
+                    logger.warning(f"Vídeo {video_number} existente inválido ({e}); renderizando de novo")
+
+            image_path = images[video_number]
 
             if progress_callback:
                 progress_callback(f"Gerando vídeo {video_number}/{len(audios)} (lip-sync)...")
@@ -520,20 +722,21 @@ class VideoGenerator:
             video_url = self.client.process_video(
                 audio_url=audio_url,
                 image_url=image_url,
-                resolution=Config.DEFAULT_RESOLUTION
+                resolution=Config.DEFAULT_RESOLUTION,
+                audio_seconds=media_info.probe(audio_path).get('duration')
             )
 
             # Baixa vídeo gerado
-            video_path = video_dir / f'video_{video_number}.mp4'
-
             logger.info(f"Baixando vídeo {video_number} de {video_url}...")
 
-            response = requests.get(video_url, stream=True, timeout=120)
-            response.raise_for_status()
+            with metrics.track('download', 'wavespeed'), \
+                    tracing.span('download', host=urlparse(video_url).hostname) as download_span:
+                # Retoma conexões que caem e rejeita arquivos truncados/corrompidos:
+                # o clipe é baixado de novo, nunca re-renderizado
+                size = download_file(video_url, video_path, session=self.client.session, validate=verify_mp4)
+                download_span.set('bytes', size)
 
-            with open(video_path, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=1024*1024):
-                    f.write(chunk)
+            metrics.add_bytes('download', 'in', video_path.stat().st_size)
 
             logger.info(f"Vídeo {video_number} salvo em: {video_path}")
 
@@ -544,6 +747,11 @@ class VideoGenerator:
                 'video_path': video_path
             }
 
+        def generate_single_video(audio_data: Dict) -> Dict:
+            """Gera um único vídeo, registrado como span no trace do job"""
+            with tracing.span('video.batch', video=audio_data['audio_number']):
+                return render_single_video(audio_data)
+
         # Processa em paralelo (WaveSpeed suporta múltiplas requisições simultâneas)
         from concurrent.futures import ThreadPoolExecutor, as_completed
 
@@ -556,7 +764,7 @@ class VideoGenerator:
         with ThreadPoolExecutor(max_workers=max_workers) as executor:
             # Submete todos os vídeos para processamento paralelo
             futures = {
-                executor.submit(generate_single_video, audio_data): audio_data
+                executor.submit(tracing.wrap(generate_single_video), audio_data): audio_data
                 for audio_data in audios
             }
 
@@ -591,6 +799,14 @@ class VideoGenerator:
                     if progress_callback:
                         progress_callback(f"⚠️ Vídeo {completed}/{len(audios)} processado (com erro) | {remaining} em processamento...")
 
+                if on_video_ready:
+                    # Fora do try acima: erro de um consumidor (prévia, concatenação
+                    # incremental) não pode virar falha do render
+                    try:
+                        on_video_ready(results[-1])
+                    except Exception as e:
+                        logger.warning(f"Falha ao processar o vídeo {results[-1]['video_number']} pronto: {e}")
+
         # Ordena resultados por número
         results.sort(key=lambda x: x['video_number'])
 
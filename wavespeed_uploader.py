@@ -4,7 +4,10 @@ Usa 0x0.st como primário e tmpfiles.org como fallback
 """
 import requests
 from pathlib import Path
+from config import Config
 from utils import get_logger
+import metrics
+import tracing
 
 logger = get_logger(__name__)
 
@@ -22,7 +25,7 @@ class WaveSpeedCompatibleUploader:
 
             with open(file_path, 'rb') as f:
                 response = requests.post(
-                    'https://0x0.st',
+                    Config.UPLOAD_0X0_URL,
                     files={'file': f},
                     timeout=120
                 )
@@ -53,7 +56,7 @@ class WaveSpeedCompatibleUploader:
 
             with open(file_path, 'rb') as f:
                 response = requests.post(
-                    'https://tmpfiles.org/api/v1/upload',
+                    Config.UPLOAD_TMPFILES_URL,
                     files={'file': f},
                     timeout=120
                 )
@@ -109,7 +112,11 @@ class WaveSpeedCompatibleUploader:
 
             try:
                 logger.info(f"🔄 Tentando {service_name}...")
-                url = upload_func(file_path)
+                size = file_path.stat().st_size
+                with metrics.track('upload', service_name), \
+                        tracing.span('upload', host=service_name, file=file_path.name, bytes=size):
+                    url = upload_func(file_path)
+                metrics.add_bytes('upload', 'out', size)
                 logger.info(f"✅ Upload bem-sucedido via {service_name}")
 
                 # Testa se a URL é acessível
@@ -2,20 +2,28 @@
 Servidor Web Flask para Geração de Vídeos com Lip-Sync
 Interface web moderna com configuração de API keys integrada
 """
-import os
 import json
+import time
+import uuid
 from pathlib import Path
 from typing import List, Dict, Any, Optional
-from flask import Flask, request, jsonify, send_from_directory, send_file
+from flask import Flask, Response, request, jsonify, send_from_directory, send_file, stream_with_context
 from flask_cors import CORS
 from werkzeug.utils import secure_filename
 import logging
 
 from config import Config
-from job_manager import JobManager
-from audio_generator import AudioGenerator  
+from client_registry import registry
 from utils import get_logger, split_into_paragraphs, create_batches
 from database import db
+from event_bus import bus, ALL_JOBS
+from job_queue import JobQueue
+from media_info import media_info, video_summary
+from asset_store import asset_store
+from thumbnails import ThumbnailService, FORMATS as THUMBNAIL_FORMATS
+import pipeline_tasks
+import metrics
+import tracing
 
 # Configuração de logging
 logger = get_logger(__name__)
@@ -28,6 +36,17 @@ CORS(app)
 app.config['MAX_CONTENT_LENGTH'] = 50 * 1024 * 1024  # 50MB max file size
 UPLOAD_FOLDER = Path('./temp/uploads')
 UPLOAD_FOLDER.mkdir(parents=True, exist_ok=True)
+SSE_KEEPALIVE_SECONDS = 15
+
+# Miniaturas dos avatares (geradas em processos separados, servidas como imutáveis)
+thumbnails = ThumbnailService(db.avatars_dir / 'thumbnails')
+
+# Modo queue: jobs rodam em pipeline_worker.py; eventos chegam pelo log compartilhado
+job_queue = None
+if Config.PIPELINE_MODE == 'queue':
+    job_queue = JobQueue()
+    bus.enable_shared_log(Config.EVENT_LOG_FOLDER)
+    metrics.enable_shared()
 
 # ============================================================================
 # ROTAS ESTÁTICAS
@@ -43,6 +62,15 @@ def static_files(path):
     """Serve arquivos estáticos"""
     return send_from_directory('static', path)
 
+# ============================================================================
+# MÉTRICAS
+# ============================================================================
+
+@app.route('/metrics')
+def export_metrics():
+    """Exporta métricas do pipeline no formato de texto do Prometheus"""
+    return Response(metrics.render(), content_type=metrics.CONTENT_TYPE)
+
 # ============================================================================
 # API - CONFIGURAÇÃO
 # ============================================================================
@@ -118,21 +146,17 @@ def save_api_keys():
             for key, value in env_content.items():
                 f.write(f"{key}={value}\n")
         
-        # Recarrega configuração
-        from dotenv import load_dotenv
-        load_dotenv(override=True)
-        
-        # Atualiza Config
-        Config.ELEVENLABS_API_KEY = os.getenv('ELEVENLABS_API_KEY')
-        Config.MINIMAX_API_KEY = os.getenv('MINIMAX_API_KEY')
-        Config.GEMINI_API_KEY = os.getenv('GEMINI_API_KEY')
-        Config.WAVESPEED_API_KEY = os.getenv('WAVESPEED_API_KEY')
+        # Atualiza Config e recria os clientes compartilhados se alguma key mudou.
+        # Os demais processos (workers HTTP e pipeline workers) releem o .env
+        # na próxima requisição/tarefa
+        registry.reload_api_keys(force=True)
         
         logger.info("API keys atualizadas com sucesso")
         
         return jsonify({
             'success': True,
-            'message': 'API keys salvas com sucesso! As configurações foram atualizadas.'
+            'message': 'API keys salvas com sucesso! Novos jobs já usam as novas keys '
+                       '(jobs em andamento terminam com as anteriores).'
         })
         
     except Exception as e:
@@ -150,7 +174,7 @@ def get_voices(provider: str):
         if provider not in ['elevenlabs', 'minimax']:
             return jsonify({'success': False, 'error': 'Provedor inválido'}), 400
         
-        audio_gen = AudioGenerator(provider=provider)
+        audio_gen = registry.get_audio_generator(provider)
         voices = audio_gen.get_available_voices()
         
         if voices and len(voices) > 0:
@@ -183,8 +207,7 @@ def estimate_job():
         if not text or not text.strip():
             return jsonify({'success': False, 'error': 'Texto não fornecido'}), 400
         
-        temp_mgr = JobManager()
-        estimate = temp_mgr.get_job_estimate(text)
+        estimate = registry.get_job_manager().get_job_estimate(text)
         
         return jsonify({
             'success': True,
@@ -287,9 +310,10 @@ def upload_images():
             if file.filename == '':
                 continue
             
-            filename = secure_filename(file.filename)
-            filepath = UPLOAD_FOLDER / filename
-            file.save(str(filepath))
+            # Nome = hash do conteúdo: envios repetidos não duplicam bytes e
+            # arquivos de mesmo nome não se sobrescrevem
+            suffix = Path(secure_filename(file.filename)).suffix
+            filepath = asset_store.store(file.stream, UPLOAD_FOLDER, suffix)
             uploaded_paths.append(str(filepath))
         
         if not uploaded_paths:
@@ -312,75 +336,57 @@ def upload_images():
 @app.route('/api/generate/single', methods=['POST'])
 def generate_single_video():
     """Gera um vídeo único"""
+    payload = {}
     try:
-        data = request.json
-        
-        text = data.get('text', '')
-        provider = data.get('provider', 'elevenlabs')
-        voice_name = data.get('voice_name', '')
-        model_id = data.get('model_id', 'eleven_multilingual_v2')
-        image_paths = data.get('image_paths', [])
-        max_workers = data.get('max_workers', 3)
+        data = request.get_json(silent=True) or {}
+        
+        payload = {
+            'text': data.get('text', ''),
+            'provider': data.get('provider', 'elevenlabs'),
+            'voice_name': data.get('voice_name', ''),
+            'model_id': data.get('model_id', 'eleven_multilingual_v2'),
+            'image_paths': data.get('image_paths', []),
+            'max_workers': data.get('max_workers', 3),
+            'draft': bool(data.get('draft', False)),  # rascunho local antes dos renders (ver /approve)
+            'client_ref': data.get('client_ref')  # ID usado pelo frontend nos eventos
+        }
         
         # Validação
-        if not text or not text.strip():
+        if not payload['text'] or not payload['text'].strip():
             return jsonify({'success': False, 'error': 'Texto não fornecido'}), 400
         
-        if not voice_name:
+        if not payload['voice_name']:
             return jsonify({'success': False, 'error': 'Voz não selecionada'}), 400
         
-        if not image_paths or len(image_paths) == 0:
+        if not payload['image_paths'] or len(payload['image_paths']) == 0:
             return jsonify({'success': False, 'error': 'Nenhuma imagem fornecida'}), 400
         
-        # Cria job manager
-        job_mgr = JobManager(audio_provider=provider)
-        
-        # Cria job
-        job, error = job_mgr.create_job(
-            input_text=text,
-            voice_name=voice_name,
-            image_paths=image_paths,
-            model_id=model_id
-        )
-        
+        error = pipeline_tasks.validate_single(payload)
         if error:
             return jsonify({'success': False, 'error': error}), 400
         
-        # Create database job
+        # Create database job (mesmo ID do job do pipeline, para os eventos)
         db_job = db.create_job({
+            'id': str(uuid.uuid4()),
             'type': 'single_video',
-            'metadata': {'text_preview': text[:100]}
+            'metadata': {
+                'text_preview': payload['text'][:100],
+                # Usados por /api/jobs/<id>/retry e /approve
+                'provider': payload['provider'],
+                'max_workers': payload['max_workers'],
+                'draft': payload['draft']
+            }
         })
-        db_job_id = db_job['id']
+        payload['job_id'] = db_job['id']
+        bus.publish(db_job['id'], 'created', status='processing', job_type='single_video',
+                    percent=0, client_ref=payload['client_ref'])
         
-        try:
-            # Processa job
-            final_video = job_mgr.process_job(
-                job=job,
-                max_workers_video=max_workers
-            )
-            
-            # Update job as completed
-            db.update_job(db_job_id, {
-                'status': 'completed',
-                'video_path': str(final_video)
-            })
-            
-            duration = (job.completed_at - job.created_at).total_seconds()
-            
-            return jsonify({
-                'success': True,
-                'video_path': str(final_video),
-                'job_id': job.job_id,
-                'duration': duration
-            })
-        except Exception as process_error:
-            db.update_job(db_job_id, {'status': 'failed'})
-            raise process_error
+        return _dispatch('single_video', payload)
         
     except Exception as e:
         logger.error(f"Erro ao gerar vídeo: {e}")
-        return jsonify({'success': False, 'error': str(e)}), 500
+        # job_id permite reprocessar só o que falhou (/api/jobs/<id>/retry)
+        return jsonify({'success': False, 'error': str(e), 'job_id': payload.get('job_id')}), 500
 
 @app.route('/api/generate/batch', methods=['POST'])
 def generate_batch_videos():
@@ -388,139 +394,121 @@ def generate_batch_videos():
     try:
         data = request.json
 
-        scripts = data.get('scripts', [])
-        provider = data.get('provider', 'elevenlabs')
-        model_id = data.get('model_id', 'eleven_multilingual_v2')
-        image_paths = data.get('image_paths', [])
-        max_workers = data.get('max_workers', 3)
-        voice_selections = data.get('voice_selections', [])
-        batch_image_mode = data.get('batch_image_mode', 'fixed')
-        batch_images = data.get('batch_images', {})  # {scriptId_batchNumber: image_path}
+        payload = {
+            'scripts': data.get('scripts', []),
+            'provider': data.get('provider', 'elevenlabs'),
+            'model_id': data.get('model_id', 'eleven_multilingual_v2'),
+            'image_paths': data.get('image_paths', []),
+            'max_workers': data.get('max_workers', 3),
+            'voice_selections': data.get('voice_selections', []),
+            'batch_image_mode': data.get('batch_image_mode', 'fixed'),
+            'batch_images': data.get('batch_images', {})  # {scriptId_batchNumber: image_path}
+        }
 
         # Validação
-        if not scripts or len(scripts) == 0:
+        if not payload['scripts'] or len(payload['scripts']) == 0:
             return jsonify({'success': False, 'error': 'Nenhum roteiro fornecido'}), 400
 
-        if not image_paths or len(image_paths) == 0:
+        if not payload['image_paths'] or len(payload['image_paths']) == 0:
             return jsonify({'success': False, 'error': 'Nenhuma imagem fornecida'}), 400
 
-        # Cria job manager
-        job_mgr = JobManager(audio_provider=provider)
-
-        results = []
-        videos_gerados = []
-
         # Create database job for batch
         batch_job = db.create_job({
             'type': 'batch_videos',
-            'metadata': {'num_scripts': len(scripts)}
+            'metadata': {'num_scripts': len(payload['scripts'])}
         })
-        batch_job_id = batch_job['id']
-
-        for idx, script_data in enumerate(scripts):
-            try:
-                script_text = script_data.get('text', '')
-                script_id = script_data.get('id')
-                voice_name = voice_selections[idx] if idx < len(voice_selections) else voice_selections[0]
-
-                # Determine image paths for this script based on mode
-                if batch_image_mode == 'individual':
-                    # Collect images for each batch in this script
-                    script_image_paths = []
-                    batches = script_data.get('batches', [])
-
-                    for batch in batches:
-                        batch_number = batch.get('batch_number')
-                        batch_key = f"{script_id}_{batch_number}"
-
-                        if batch_key in batch_images:
-                            batch_image_path = batch_images[batch_key]
-                            if batch_image_path not in script_image_paths:
-                                script_image_paths.append(batch_image_path)
-
-                    # If no specific images found, fallback to default image_paths
-                    if not script_image_paths:
-                        script_image_paths = image_paths
-                else:
-                    # Fixed mode - use the same images for all scripts
-                    script_image_paths = image_paths
-
-                # Cria job
-                job, error = job_mgr.create_job(
-                    input_text=script_text,
-                    voice_name=voice_name,
-                    image_paths=script_image_paths,
-                    model_id=model_id
-                )
-
-                if error:
-                    results.append({
-                        'script_id': script_id,
-                        'success': False,
-                        'error': error
-                    })
-                    continue
-
-                # Processa job
-                final_video = job_mgr.process_job(
-                    job=job,
-                    max_workers_video=max_workers
-                )
-
-                duration = (job.completed_at - job.created_at).total_seconds()
-                videos_gerados.append(str(final_video))
-
-                results.append({
-                    'script_id': script_id,
-                    'success': True,
-                    'video_path': str(final_video),
-                    'duration': duration
-                })
+        payload['job_id'] = batch_job['id']
+        bus.publish(batch_job['id'], 'created', status='processing', job_type='batch_videos',
+                    percent=0, total_scripts=len(payload['scripts']))
 
-            except Exception as e:
-                results.append({
-                    'script_id': script_data.get('id'),
-                    'success': False,
-                    'error': str(e)
-                })
-
-        # Update batch job as completed
-        if videos_gerados:
-            db.update_job(batch_job_id, {
-                'status': 'completed',
-                'video_path': videos_gerados[0] if len(videos_gerados) == 1 else f'{len(videos_gerados)} vídeos'
-            })
-        else:
-            db.update_job(batch_job_id, {'status': 'failed'})
-
-        return jsonify({
-            'success': True,
-            'results': results,
-            'videos_count': len(videos_gerados),
-            'total_scripts': len(scripts)
-        })
+        return _dispatch('batch_videos', payload)
 
     except Exception as e:
         logger.error(f"Erro ao gerar vídeos em lote: {e}")
         return jsonify({'success': False, 'error': str(e)}), 500
 
+def _dispatch(task: str, payload: Dict):
+    """
+    Executa a tarefa na requisição (modo inline) ou a envia aos pipeline workers (modo queue)
+
+    No modo queue responde 202 com o job_id; o resultado chega pelos eventos
+    (/api/jobs/events) e fica registrado em /api/jobs/<job_id>.
+    """
+    if Config.PIPELINE_MODE == 'queue':
+        job_queue.enqueue(task, payload)
+        return jsonify({'success': True, 'queued': True, 'job_id': payload['job_id']}), 202
+
+    return jsonify(pipeline_tasks.run_task(task, payload))
+
 # ============================================================================
 # API - DOWNLOAD DE VÍDEO
 # ============================================================================
 
+def _resolve_media(filename: str) -> Optional[Path]:
+    """
+    Resolve o caminho de um vídeo pedido pelo navegador
+
+    Returns:
+        Caminho absoluto, ou None se o arquivo não existir ou estiver fora
+        de Config.MEDIA_ROOTS
+    """
+    from urllib.parse import unquote
+    # Decodifica o path que pode vir URL-encoded
+    video_path = Path(unquote(filename)).resolve()
+
+    if not any(root.resolve() in video_path.parents for root in Config.MEDIA_ROOTS):
+        return None
+    if not video_path.is_file():
+        return None
+
+    return video_path
+
+
+def _send_media(video_path: Path, as_attachment: bool = False) -> Response:
+    """
+    Envia um vídeo já autorizado
+
+    Com MEDIA_ACCEL_REDIRECT o corpo fica vazio e o Nginx serve o arquivo
+    (sendfile, Range e ETag no próprio Nginx) sem ocupar um worker Python.
+    Caso contrário o send_file responde com Range (206), ETag e
+    If-None-Match (304).
+    """
+    if Config.MEDIA_ACCEL_REDIRECT:
+        try:
+            relative = video_path.relative_to(Config.MEDIA_ACCEL_ROOT.resolve())
+        except ValueError:
+            relative = None
+
+        if relative is not None:
+            from urllib.parse import quote
+            response = Response(status=200, mimetype='video/mp4')
+            response.headers['X-Accel-Redirect'] = quote(Config.MEDIA_ACCEL_PREFIX.rstrip('/') + '/' + relative.as_posix())
+            if as_attachment:
+                response.headers['Content-Disposition'] = f"attachment; filename*=UTF-8''{quote(video_path.name)}"
+            return response
+
+        logger.warning(f"Vídeo fora de MEDIA_ACCEL_ROOT, servindo pelo Flask: {video_path}")
+
+    return send_file(
+        str(video_path),
+        mimetype='video/mp4',
+        as_attachment=as_attachment,
+        download_name=video_path.name,
+        conditional=True,
+        etag=True
+    )
+
+
 @app.route('/api/download/<path:filename>', methods=['GET'])
 def download_video(filename):
     """Faz download de vídeo gerado"""
     try:
-        from urllib.parse import unquote
-        # Decodifica o path que pode vir URL-encoded
-        decoded_filename = unquote(filename)
-        video_path = Path(decoded_filename)
+        video_path = _resolve_media(filename)
 
-        if not video_path.exists():
+        if video_path is None:
             return jsonify({'success': False, 'error': 'Vídeo não encontrado'}), 404
 
-        return send_file(str(video_path), as_attachment=True, download_name=video_path.name)
+        return _send_media(video_path, as_attachment=True)
 
     except Exception as e:
         logger.error(f"Erro ao fazer download: {e}")
@@ -530,15 +518,12 @@ def download_video(filename):
 def stream_video(filename):
     """Stream de vídeo para visualização no navegador"""
     try:
-        from urllib.parse import unquote
-        # Decodifica o path que pode vir URL-encoded
-        decoded_filename = unquote(filename)
-        video_path = Path(decoded_filename)
+        video_path = _resolve_media(filename)
 
-        if not video_path.exists():
+        if video_path is None:
             return jsonify({'success': False, 'error': 'Vídeo não encontrado'}), 404
 
-        return send_file(str(video_path), mimetype='video/mp4')
+        return _send_media(video_path)
 
     except Exception as e:
         logger.error(f"Erro ao fazer stream: {e}")
@@ -666,6 +651,13 @@ def add_video_to_project(project_id):
     """Adiciona vídeo a um projeto"""
     try:
         data = request.json
+
+        # Duração/resolução/bitrate do arquivo (se o cliente não informou)
+        if not data.get('duration') and data.get('path'):
+            video_path = _resolve_media(data['path'])
+            if video_path is not None:
+                data = {**video_summary(media_info.probe(video_path)), **{k: v for k, v in data.items() if v}}
+
         success = db.add_video_to_project(project_id, data)
         
         if not success:
@@ -691,7 +683,8 @@ def get_avatars():
         
         return jsonify({
             'success': True,
-            'avatars': avatars
+            'avatars': avatars,
+            'thumbnail_sizes': list(thumbnails.sizes)
         })
     except Exception as e:
         logger.error(f"Erro ao listar avatares: {e}")
@@ -701,8 +694,6 @@ def get_avatars():
 def create_avatar():
     """Cria um novo avatar (salva imagem template)"""
     try:
-        from datetime import datetime
-        
         if 'image' not in request.files:
             return jsonify({'success': False, 'error': 'Nenhuma imagem enviada'}), 400
         
@@ -712,21 +703,13 @@ def create_avatar():
         if file.filename == '':
             return jsonify({'success': False, 'error': 'Arquivo inválido'}), 400
         
-        # Salva imagem
-        filename = secure_filename(file.filename)
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        unique_filename = f"{timestamp}_{filename}"
-        
-        avatar_path = db.avatars_dir / unique_filename
-        file.save(str(avatar_path))
+        # Salva imagem (uma vez por conteúdo; avatares iguais compartilham o arquivo)
+        suffix = Path(secure_filename(file.filename)).suffix
+        avatar_path = asset_store.store(file.stream, db.avatars_dir, suffix)
         
-        # Cria thumbnail (simplificado - usa a mesma imagem)
-        thumbnail_path = db.avatars_dir / "thumbnails" / unique_filename
-        file.seek(0)  # Reset file pointer
-        file.save(str(thumbnail_path))
-        
-        # Salva no banco
-        avatar = db.create_avatar(name, str(avatar_path), str(thumbnail_path))
+        # Salva no banco (sem miniatura própria: usa a imagem)
+        avatar = db.create_avatar(name, str(avatar_path))
+        thumbnails.schedule(avatar_path)
         
         return jsonify({
             'success': True,
@@ -740,7 +723,17 @@ def create_avatar():
 def delete_avatar(avatar_id):
     """Deleta um avatar"""
     try:
+        avatar = db.get_avatar(avatar_id)
+        thumbnail_key = None
+        if avatar and Path(avatar['image_path']).exists():
+            thumbnail_key = thumbnails.key(avatar['image_path'])
+
         db.delete_avatar(avatar_id)
+        asset_store.collect()
+
+        # Miniaturas só saem quando nenhum avatar usa mais a mesma imagem
+        if thumbnail_key and not Path(avatar['image_path']).exists():
+            thumbnails.remove(thumbnail_key)
         
         return jsonify({
             'success': True,
@@ -764,11 +757,49 @@ def get_avatar_image(avatar_id):
         if not image_path.exists():
             return jsonify({'success': False, 'error': 'Imagem não encontrada'}), 404
         
-        return send_file(str(image_path))
+        return send_file(str(image_path.resolve()), conditional=True, etag=True, max_age=86400)
     except Exception as e:
         logger.error(f"Erro ao obter imagem: {e}")
         return jsonify({'success': False, 'error': str(e)}), 500
 
+@app.route('/api/avatars/<avatar_id>/thumbnail/<int:size>.<fmt>', methods=['GET'])
+def get_avatar_thumbnail(avatar_id, size, fmt):
+    """
+    Miniatura do avatar (size: lado menor em px, um de THUMBNAIL_SIZES; fmt: webp ou jpg)
+
+    A imagem de um avatar nunca muda, então a resposta é imutável para o
+    navegador; o ETag (hash do conteúdo) responde 304 em revalidações.
+    """
+    try:
+        if size not in thumbnails.sizes or fmt not in THUMBNAIL_FORMATS:
+            return jsonify({'success': False, 'error': 'Tamanho ou formato inválido'}), 400
+
+        avatar = db.get_avatar(avatar_id)
+        if not avatar:
+            return jsonify({'success': False, 'error': 'Avatar não encontrado'}), 404
+
+        image_path = Path(avatar['image_path'])
+        if not image_path.exists():
+            return jsonify({'success': False, 'error': 'Imagem não encontrada'}), 404
+
+        # Gera na hora se ainda não existir (avatares criados antes das miniaturas)
+        thumbnail_path = thumbnails.get(image_path, size, fmt)
+        if thumbnail_path is None:
+            return get_avatar_image(avatar_id)
+
+        response = send_file(
+            str(thumbnail_path.resolve()),
+            mimetype=THUMBNAIL_FORMATS[fmt][1],
+            conditional=True,
+            etag=thumbnail_path.name,
+            max_age=31536000
+        )
+        response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+        return response
+    except Exception as e:
+        logger.error(f"Erro ao obter miniatura: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
 # ============================================================================
 # API - JOBS (Timeline de processamento)
 # ============================================================================
@@ -790,6 +821,97 @@ def get_jobs():
         logger.error(f"Erro ao listar jobs: {e}")
         return jsonify({'success': False, 'error': str(e)}), 500
 
+def _sse_message(event: Dict) -> str:
+    """Formata um evento no protocolo Server-Sent Events"""
+    return f"data: {json.dumps(event, ensure_ascii=False)}\n\n"
+
+def _is_final_event(event: Dict) -> bool:
+    """
+    Indica se o evento encerra o job (eventos de roteiros de um lote não encerram)
+
+    Um rascunho pronto também encerra: o job fica parado até a aprovação.
+    """
+    return (
+        event.get('type') in ('completed', 'failed', 'draft')
+        and not event.get('pipeline_job_id')
+        and not event.get('script_id')
+    )
+
+def _sse_response(generator) -> Response:
+    """Cria resposta SSE sem buffering (inclusive atrás do Nginx)"""
+    return Response(
+        stream_with_context(generator),
+        mimetype='text/event-stream',
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'
+        }
+    )
+
+@app.route('/api/jobs/events', methods=['GET'])
+def stream_all_job_events():
+    """Stream SSE com o progresso de todos os jobs (substitui polling de /api/jobs)"""
+    def generate():
+        with bus.subscribe(ALL_JOBS) as subscription:
+            yield "retry: 3000\n\n"
+
+            # Estado inicial: jobs em processamento (uma única leitura do banco)
+            yield _sse_message({
+                'type': 'snapshot',
+                'timestamp': time.time(),
+                'jobs': db.get_jobs(status='processing'),
+                'events': bus.snapshot()
+            })
+
+            while True:
+                event = subscription.get(timeout=SSE_KEEPALIVE_SECONDS)
+                if event is None:
+                    yield ": keepalive\n\n"
+                    continue
+                yield _sse_message(event)
+
+    return _sse_response(generate())
+
+@app.route('/api/jobs/<job_id>/events', methods=['GET'])
+def stream_job_events(job_id):
+    """Stream SSE com o progresso de um job específico"""
+    job = db.get_job(job_id)
+    last_event = bus.last_event(job_id)
+
+    if not job and not last_event:
+        return jsonify({'success': False, 'error': 'Job não encontrado'}), 404
+
+    def generate():
+        with bus.subscribe(job_id) as subscription:
+            yield "retry: 3000\n\n"
+
+            if last_event:
+                yield _sse_message(last_event)
+                if _is_final_event(last_event):
+                    return
+            elif job and job.get('status') in ('completed', 'failed'):
+                yield _sse_message({
+                    **job,
+                    'job_id': job_id,
+                    'job_type': job.get('type'),
+                    'type': job['status'],
+                    'timestamp': time.time()
+                })
+                return
+
+            while True:
+                event = subscription.get(timeout=SSE_KEEPALIVE_SECONDS)
+                if event is None:
+                    yield ": keepalive\n\n"
+                    continue
+
+                yield _sse_message(event)
+
+                if _is_final_event(event):
+                    return
+
+    return _sse_response(generate())
+
 @app.route('/api/jobs/<job_id>', methods=['GET'])
 def get_job_status(job_id):
     """Obtém status de um job específico"""
@@ -807,6 +929,175 @@ def get_job_status(job_id):
         logger.error(f"Erro ao obter job: {e}")
         return jsonify({'success': False, 'error': str(e)}), 500
 
+@app.route('/api/jobs/<job_id>/retry', methods=['POST'])
+def retry_job(job_id):
+    """
+    Reprocessa um vídeo único que falhou
+
+    Só os itens que falharam (textos, áudios ou clipes ausentes na pasta do
+    job) são gerados de novo; o resto é reaproveitado e então concatenado.
+    """
+    try:
+        job = db.get_job(job_id)
+
+        if not job:
+            return jsonify({'success': False, 'error': 'Job não encontrado'}), 404
+
+        if job.get('type') != 'single_video':
+            return jsonify({'success': False, 'error': 'Apenas vídeos únicos podem ser reprocessados'}), 400
+
+        if job.get('status') != 'failed':
+            return jsonify({'success': False, 'error': 'Apenas jobs que falharam podem ser reprocessados'}), 409
+
+        if not (Config.TEMP_FOLDER / f'job_{secure_filename(job_id)}' / 'state.json').exists():
+            return jsonify({'success': False, 'error': 'Artefatos do job não encontrados'}), 409
+
+        data = request.get_json(silent=True) or {}
+        metadata = job.get('metadata', {})
+
+        payload = {
+            'job_id': job_id,
+            'provider': metadata.get('provider', 'elevenlabs'),
+            'max_workers': data.get('max_workers', metadata.get('max_workers', 3)),
+            'client_ref': data.get('client_ref')
+        }
+
+        # Só um de vários pedidos simultâneos (duplo clique, duas abas) reprocessa
+        if not db.transition_job(job_id, 'failed', {'status': 'processing', 'error': None, 'progress': 0}):
+            return jsonify({'success': False, 'error': 'O job já está sendo reprocessado'}), 409
+        bus.publish(job_id, 'created', status='processing', job_type='single_video',
+                    percent=0, retry=True, client_ref=payload['client_ref'])
+
+        return _dispatch('retry_video', payload)
+
+    except Exception as e:
+        logger.error(f"Erro ao reprocessar job: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+def _review_draft(job_id: str, draft: bool):
+    """Valida um job parado no rascunho e o envia para aprovação/revisão"""
+    job = db.get_job(job_id)
+
+    if not job:
+        return jsonify({'success': False, 'error': 'Job não encontrado'}), 404
+
+    if job.get('status') != 'draft_ready':
+        return jsonify({'success': False, 'error': 'O job não está aguardando aprovação do rascunho'}), 409
+
+    data = request.get_json(silent=True) or {}
+    edits = data.get('edits') or {}
+
+    if not isinstance(edits, dict):
+        return jsonify({'success': False, 'error': 'edits deve mapear número do batch -> texto'}), 400
+
+    batch_numbers = {b['batch_number'] for b in job.get('batches', [])}
+    for batch_number, text in edits.items():
+        if not str(batch_number).isdigit() or int(batch_number) not in batch_numbers:
+            return jsonify({'success': False, 'error': f'Batch {batch_number} não existe neste job'}), 400
+        if not isinstance(text, str) or not text.strip():
+            return jsonify({'success': False, 'error': f'Texto do batch {batch_number} está vazio'}), 400
+
+    if draft and not edits:
+        return jsonify({'success': False, 'error': 'Nenhuma edição fornecida'}), 400
+
+    metadata = job.get('metadata', {})
+    payload = {
+        'job_id': job_id,
+        'provider': metadata.get('provider', 'elevenlabs'),
+        'max_workers': data.get('max_workers', metadata.get('max_workers', 3)),
+        'edits': {int(number): text for number, text in edits.items()},
+        'draft': draft,
+        'client_ref': data.get('client_ref')
+    }
+
+    # Aprovar e revisar ao mesmo tempo (ou aprovar duas vezes) submeteria os renders em dobro
+    if not db.transition_job(job_id, 'draft_ready', {'status': 'processing', 'error': None}):
+        return jsonify({'success': False, 'error': 'O rascunho já foi aprovado ou está sendo revisado'}), 409
+    bus.publish(job_id, 'created', status='processing', job_type='single_video',
+                percent=50, client_ref=payload['client_ref'])
+
+    return _dispatch('review_draft', payload)
+
+@app.route('/api/jobs/<job_id>/approve', methods=['POST'])
+def approve_draft(job_id):
+    """
+    Aprova o rascunho de um vídeo único e inicia os renders finais
+
+    Aceita edits ({número do batch: texto}) opcionais: só os batches
+    editados ganham áudio novo; o resto dos textos e áudios é reaproveitado.
+    """
+    try:
+        return _review_draft(job_id, draft=False)
+    except Exception as e:
+        logger.error(f"Erro ao aprovar rascunho: {e}")
+        return jsonify({'success': False, 'error': str(e), 'job_id': job_id}), 500
+
+@app.route('/api/jobs/<job_id>/draft', methods=['POST'])
+def revise_draft(job_id):
+    """Aplica edits ({número do batch: texto}) e gera um novo rascunho, sem renders"""
+    try:
+        return _review_draft(job_id, draft=True)
+    except Exception as e:
+        logger.error(f"Erro ao revisar rascunho: {e}")
+        return jsonify({'success': False, 'error': str(e), 'job_id': job_id}), 500
+
+@app.route('/api/jobs/<job_id>/trace', methods=['GET'])
+def get_job_trace(job_id):
+    """
+    Retorna o trace (waterfall de spans) de um job, ao vivo ou do arquivo
+
+    Query params:
+        run: Execução do job (1 = primeira; padrão: a mais recente)
+    """
+    try:
+        trace_files = tracing.run_files(Config.TEMP_FOLDER / f'job_{secure_filename(job_id)}' / 'trace.json')
+        run = request.args.get('run', type=int) or len(trace_files)
+
+        trace = tracing.get_active(job_id)
+        if trace and trace.run == run:
+            return jsonify({'success': True, 'running': True, 'runs': len(trace_files), 'trace': trace.to_waterfall()})
+
+        # Outro processo (modo queue) executa o job: o arquivo é atualizado a cada etapa
+        if not 1 <= run <= len(trace_files):
+            return jsonify({'success': False, 'error': 'Trace não encontrado'}), 404
+
+        with open(trace_files[run - 1], 'r', encoding='utf-8') as f:
+            trace_data = json.load(f)
+
+        return jsonify({
+            'success': True,
+            'running': trace_data.get('running', False),
+            'runs': len(trace_files),
+            'trace': trace_data
+        })
+    except Exception as e:
+        logger.error(f"Erro ao obter trace: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/api/jobs/<job_id>/preview/<path:filename>', methods=['GET'])
+def get_job_preview(job_id, filename):
+    """Prévia HLS ao vivo do job (playlist index.m3u8 e segmentos .ts)"""
+    try:
+        preview_dir = Config.TEMP_FOLDER / f'job_{secure_filename(job_id)}' / 'preview'
+        if not (preview_dir / secure_filename(filename)).is_file():
+            return jsonify({'success': False, 'error': 'Prévia não encontrada'}), 404
+
+        if filename.endswith('.m3u8'):
+            # A playlist cresce durante o job: o player deve sempre revalidar
+            response = send_from_directory(preview_dir.resolve(), secure_filename(filename),
+                                           mimetype='application/vnd.apple.mpegurl', max_age=0)
+            response.headers['Cache-Control'] = 'no-cache, no-store'
+            return response
+
+        # Segmentos nunca mudam depois de criados
+        response = send_from_directory(preview_dir.resolve(), secure_filename(filename),
+                                       mimetype='video/mp2t', max_age=86400)
+        response.headers['Cache-Control'] = 'public, max-age=86400, immutable'
+        return response
+    except Exception as e:
+        logger.error(f"Erro ao obter prévia: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
 # ============================================================================
 # API - TAGS
 # ============================================================================
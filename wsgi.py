@@ -0,0 +1,34 @@
+"""
+Ponto de entrada WSGI para produção
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Com PIPELINE_MODE=queue os jobs são executados por pipeline_worker.py em
+processos separados, e os workers HTTP só atendem a API.
+"""
+import os
+
+from config import Config
+from client_registry import registry
+from event_bus import bus
+import metrics
+from web_server import app, thumbnails
+
+# Vários processos HTTP: os eventos de um job (publicados no processo que o
+# executa) precisam chegar aos streams SSE abertos em qualquer processo
+bus.enable_shared_log(Config.EVENT_LOG_FOLDER)
+
+# Idem para as métricas: o /metrics de qualquer processo soma os snapshots de todos
+metrics.enable_shared()
+
+# Cada processo HTTP tem o seu pool de miniaturas: THUMBNAIL_WORKERS vale para o servidor todo
+thumbnails.max_workers = max(1, Config.THUMBNAIL_WORKERS // int(os.getenv('WEB_WORKERS', 1)))
+
+
+@app.before_request
+def _reload_api_keys():
+    """Keys salvas pela interface em outro processo valem a partir da próxima requisição"""
+    registry.reload_api_keys()
+
+
+__all__ = ['app']